@@ -0,0 +1,79 @@
+"""Load benchmark: requests per second one worker sustains against a stub model.
+
+The stub blocks for ``--latency`` seconds per call, the same way the real Gemini SDK blocks inside
+``generate_content``. Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_async_throughput --requests 200 --concurrency 50 --latency 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import httpx
+
+from src.api import api
+
+
+def _stub_model(latency: float):
+    payload = json.dumps({"demand_level": "High", "top_skills": [], "emerging_roles": [], "market_commentary": ""})
+
+    def _respond(prompt: str, **options) -> str:
+        time.sleep(latency)
+        return payload
+
+    return _respond
+
+
+async def _drive(total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=api.app)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(idx: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/career/job-market",
+                    json={"target_role": f"Role {idx}", "location": "Remote"},
+                )
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(idx) for idx in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.25)
+    args = parser.parse_args()
+
+    with patch.object(api, "get_gemini_response", _stub_model(args.latency)):
+        report = asyncio.run(_drive(args.requests, args.concurrency))
+    report["stub_latency_s"] = args.latency
+    report["model_pool"] = api.model_client.max_concurrency
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""End-to-end latency and throughput benchmark of every API endpoint against a stub model.
+
+Model calls go to :class:`benchmarks.stub_llm.StubLLM`, so no API key or network is needed and
+runs are reproducible. Each scenario (an endpoint plus a payload variant, for example ``/analyze``
+with 1-, 8- and 40-page PDFs) is driven in-process at each requested concurrency level. Request
+payloads differ per request so the response cache does not hide the model path. The JSON report
+records the git commit, the stub settings and per-scenario latency percentiles. Compare two
+reports with ``python -m benchmarks.compare``.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_endpoints --requests 40 --concurrency 1,8,32 --latency-ms 150
+    python -m benchmarks.bench_endpoints --only analyze,recruiter --error-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.stub_llm import LATENCY_DISTRIBUTIONS, StubLLM
+from src.api import api
+
+_run_offsets = itertools.count(0, 1_000_000)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+JOB = (
+    "Senior Backend Engineer\n\nRequirements:\n- 5+ years of Python\n- FastAPI or Django\n"
+    "- PostgreSQL and Redis\n- Kubernetes, Docker and AWS\n- CI/CD and observability"
+)
+RESUME_LINES = [
+    "Led migration of a monolith to Python microservices on Kubernetes",
+    "Cut p95 API latency by 40% with Redis caching and query tuning",
+    "Built CI/CD pipelines in GitHub Actions deploying to AWS EKS",
+    "Mentored four engineers and ran the backend guild",
+    "Designed PostgreSQL schemas serving 10k requests per second",
+]
+
+
+def resume_text(index: int, lines: int = 12) -> str:
+    body = "\n".join(f"- {RESUME_LINES[line % len(RESUME_LINES)]} (project {line + 1})" for line in range(lines))
+    return f"Candidate {index}\nSenior Software Engineer\n\nEXPERIENCE\n{body}\n\nSKILLS\nPython, FastAPI, AWS"
+
+
+def make_pdf(pages: int, lines_per_page: int = 30, seed: int = 0) -> bytes:
+    """Minimal uncompressed PDF with ``lines_per_page`` lines of Helvetica text on each page."""
+
+    objects: List[Optional[str]] = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        lines = " ".join(
+            f"({RESUME_LINES[(seed + page + line) % len(RESUME_LINES)]} p{page + 1}) Tj 0 -14 Td"
+            for line in range(lines_per_page)
+        )
+        stream = f"BT /F1 10 Tf 50 760 Td (Candidate {seed}) Tj 0 -14 Td {lines} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: str
+    # request index -> keyword arguments for ``httpx.AsyncClient.request``
+    build: Callable[[int], Dict[str, Any]]
+    # Optional async setup ``(client, first_index, count)`` run before each measured run.
+    setup: Optional[Callable[[httpx.AsyncClient, int, int], Any]] = None
+
+
+def _pair(index: int) -> Dict[str, Any]:
+    return {"resume_text": resume_text(index), "job_description": f"{JOB}\nTeam {index}"}
+
+
+def _analyze(pages: int, mode: str = "llm") -> Callable[[int], Dict[str, Any]]:
+    # One PDF per request index keeps uploads distinct without regenerating them on the hot path.
+    cache: Dict[int, bytes] = {}
+
+    def build(index: int) -> Dict[str, Any]:
+        if index not in cache:
+            cache[index] = make_pdf(pages, seed=index)
+        return {
+            "data": {"job_description": JOB, "mode": mode},
+            "files": {"resume": (f"resume-{index}.pdf", cache[index], "application/pdf")},
+        }
+
+    return build
+
+
+async def _index_for_search(client: httpx.AsyncClient, first: int, count: int) -> None:
+    resumes = [{"resume_id": f"bench-{index}", "resume_text": resume_text(index)} for index in range(50)]
+    (await client.post("/recruiter/index", json={"resumes": resumes})).raise_for_status()
+
+
+async def _index_for_delete(client: httpx.AsyncClient, first: int, count: int) -> None:
+    resumes = [
+        {"resume_id": f"delete-{index}", "resume_text": resume_text(index)} for index in range(first, first + count)
+    ]
+    (await client.post("/recruiter/index", json={"resumes": resumes})).raise_for_status()
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("root", "GET", "/", lambda i: {}),
+    Scenario("stats", "GET", "/stats", lambda i: {}),
+    Scenario("metrics", "GET", "/metrics", lambda i: {}),
+    Scenario("analyze[pdf=1p]", "POST", "/analyze", _analyze(1)),
+    Scenario("analyze[pdf=8p]", "POST", "/analyze", _analyze(8)),
+    Scenario("analyze[pdf=40p]", "POST", "/analyze", _analyze(40)),
+    Scenario("analyze[pdf=8p,mode=fast]", "POST", "/analyze", _analyze(8, "fast")),
+    Scenario(
+        "resume/rewrite",
+        "POST",
+        "/resume/rewrite",
+        lambda i: {"json": {**_pair(i), "focus_role": "Staff Engineer"}},
+    ),
+    Scenario(
+        "resume/rewrite/stream",
+        "POST",
+        "/resume/rewrite/stream",
+        lambda i: {"json": {**_pair(i), "focus_role": "Staff Engineer"}},
+    ),
+    Scenario("resume/skill-gap", "POST", "/resume/skill-gap", lambda i: {"json": _pair(i)}),
+    Scenario(
+        "resume/achievements", "POST", "/resume/achievements", lambda i: {"json": {"resume_text": resume_text(i)}}
+    ),
+    Scenario("resume/role-fit", "POST", "/resume/role-fit", lambda i: {"json": _pair(i)}),
+    Scenario("resume/cover-letter", "POST", "/resume/cover-letter", lambda i: {"json": _pair(i)}),
+    Scenario("resume/cover-letter/stream", "POST", "/resume/cover-letter/stream", lambda i: {"json": _pair(i)}),
+    Scenario(
+        "career/coach",
+        "POST",
+        "/career/coach",
+        lambda i: {"json": {"message_history": [{"role": "user", "content": f"How do I reach staff level? ({i})"}]}},
+    ),
+    Scenario("career/path", "POST", "/career/path", lambda i: {"json": {"resume_text": resume_text(i)}}),
+    Scenario(
+        "career/job-market",
+        "POST",
+        "/career/job-market",
+        lambda i: {"json": {"target_role": f"Backend Engineer {i}", "location": "Remote"}},
+    ),
+    Scenario("jobs/parse", "POST", "/jobs/parse", lambda i: {"json": _pair(i)}),
+    Scenario("jobs/ats-check", "POST", "/jobs/ats-check", lambda i: {"json": _pair(i)}),
+    Scenario(
+        "jobs/ats-check[mode=fast]", "POST", "/jobs/ats-check", lambda i: {"json": _pair(i), "params": {"mode": "fast"}}
+    ),
+    Scenario("jobs/one-click-optimize", "POST", "/jobs/one-click-optimize", lambda i: {"json": _pair(i)}),
+    Scenario(
+        "jobs/alerts",
+        "POST",
+        "/jobs/alerts",
+        lambda i: {"json": {"resume_text": resume_text(i), "target_role": "Backend Engineer", "location": "Remote"}},
+    ),
+    Scenario("visualizations/summary", "POST", "/visualizations/summary", lambda i: {"json": _pair(i)}),
+    Scenario(
+        "recruiter/bulk-score[single]",
+        "POST",
+        "/recruiter/bulk-score",
+        lambda i: {"json": {"resumes": [resume_text(i * 10 + k) for k in range(10)], "job_description": JOB}},
+    ),
+    Scenario(
+        "recruiter/bulk-score[parallel]",
+        "POST",
+        "/recruiter/bulk-score",
+        lambda i: {
+            "json": {
+                "resumes": [resume_text(i * 10 + k) for k in range(10)],
+                "job_description": JOB,
+                "mode": "parallel",
+                "chunk_size": 2,
+            }
+        },
+    ),
+    Scenario(
+        "recruiter/bulk-score/stream",
+        "POST",
+        "/recruiter/bulk-score/stream",
+        lambda i: {"json": {"resumes": [resume_text(i * 10 + k) for k in range(10)], "job_description": JOB}},
+    ),
+    Scenario(
+        "recruiter/index",
+        "POST",
+        "/recruiter/index",
+        lambda i: {"json": {"resumes": [{"resume_id": f"add-{i}", "resume_text": resume_text(i)}]}},
+    ),
+    Scenario(
+        "recruiter/index/{resume_id}",
+        "DELETE",
+        "/recruiter/index/delete-{index}",
+        lambda i: {},
+        setup=_index_for_delete,
+    ),
+    Scenario(
+        "recruiter/search",
+        "POST",
+        "/recruiter/search",
+        lambda i: {"json": {"job_description": f"{JOB}\nteam {i}", "top_k": 10}},
+        setup=_index_for_search,
+    ),
+    Scenario(
+        "recruiter/search[score]",
+        "POST",
+        "/recruiter/search",
+        lambda i: {"json": {"job_description": f"{JOB}\nteam {i}", "top_k": 5, "score": True}},
+        setup=_index_for_search,
+    ),
+    Scenario(
+        "analytics/orchestration",
+        "POST",
+        "/analytics/orchestration",
+        lambda i: {"json": {"objective": f"Hire 3 engineers ({i})", "context": "Series B startup"}},
+    ),
+    Scenario("analytics/embeddings", "POST", "/analytics/embeddings", lambda i: {"json": _pair(i)}),
+    Scenario(
+        "analytics/embeddings[explain]",
+        "POST",
+        "/analytics/embeddings",
+        lambda i: {"json": _pair(i), "params": {"explain": "true"}},
+    ),
+    Scenario(
+        "analytics/knowledge-graph",
+        "POST",
+        "/analytics/knowledge-graph",
+        lambda i: {"json": {"resume_text": resume_text(i)}},
+    ),
+    Scenario(
+        "analytics/ocr-diagnostics",
+        "POST",
+        "/analytics/ocr-diagnostics",
+        lambda i: {"json": {"ocr_text": resume_text(i)}},
+    ),
+    Scenario("portfolio/generate", "POST", "/portfolio/generate", lambda i: {"json": {"resume_text": resume_text(i)}}),
+    Scenario(
+        "portfolio/generate/stream",
+        "POST",
+        "/portfolio/generate/stream",
+        lambda i: {"json": {"resume_text": resume_text(i)}},
+    ),
+    Scenario("interview/readiness", "POST", "/interview/readiness", lambda i: {"json": _pair(i)}),
+    Scenario(
+        "salary/benchmark",
+        "POST",
+        "/salary/benchmark",
+        lambda i: {"json": {"role": "Backend Engineer", "location": f"Berlin {i}", "experience_years": 3 + i % 10}},
+    ),
+    Scenario(
+        "career/progress-tracker",
+        "POST",
+        "/career/progress-tracker",
+        lambda i: {"json": {"resume_text": resume_text(i), "certifications": ["CKA"]}},
+    ),
+    Scenario(
+        "tasks/resume/rewrite[submit]",
+        "POST",
+        "/tasks/resume/rewrite",
+        lambda i: {"json": {**_pair(i), "focus_role": "Staff Engineer"}},
+    ),
+    Scenario(
+        "batch",
+        "POST",
+        "/batch",
+        lambda i: {"json": {**_pair(i), "features": ["role_fit", "skill_gap", "ats_check", "career_path"]}},
+    ),
+]
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000, 2)
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    payload_bytes = 0
+    # Every run uses fresh request indexes so payloads never repeat (and never hit the response cache).
+    offset = next(_run_offsets)
+    if scenario.setup is not None:
+        await scenario.setup(client, offset, requests)
+
+    async def one(index: int) -> None:
+        nonlocal payload_bytes
+        kwargs = scenario.build(index)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(scenario.method, scenario.path.format(index=index), **kwargs)
+            body = await response.aread()
+            latencies.append(time.perf_counter() - started)
+        payload_bytes += len(body)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(offset + index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "scenario": scenario.name,
+        "method": scenario.method,
+        "path": scenario.path,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "statuses": statuses,
+        "elapsed_s": round(elapsed, 4),
+        "requests_per_s": round(requests / elapsed, 2) if elapsed else None,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "max_ms": _percentile(latencies, 1.0),
+        "avg_response_bytes": round(payload_bytes / requests, 1) if requests else 0.0,
+    }
+
+
+async def _drive(scenarios: List[Scenario], requests: int, levels: List[int], warmup: int) -> List[Dict[str, Any]]:
+    transport = httpx.ASGITransport(app=api.app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for scenario in scenarios:
+            if warmup:
+                await _run_scenario(client, scenario, warmup, 1)
+            for concurrency in levels:
+                result = await _run_scenario(client, scenario, requests, concurrency)
+                results.append(result)
+                print(
+                    f"{scenario.name:<36} c={concurrency:<4} {result['requests_per_s']:>9} req/s  "
+                    f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms errors={result['errors']}",
+                    flush=True,
+                )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured sequential requests per scenario")
+    parser.add_argument("--only", default="", help="comma-separated substrings selecting scenarios")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="median stub model latency")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal shape (tail heaviness)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub calls failing with 503")
+    parser.add_argument("--response-tokens", type=int, default=200)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="stub streaming speed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="report path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    args = parser.parse_args()
+
+    filters = [term.strip() for term in args.only.split(",") if term.strip()]
+    scenarios = [scenario for scenario in SCENARIOS if not filters or any(term in scenario.name for term in filters)]
+    if args.list:
+        for scenario in scenarios:
+            print(f"{scenario.name:<36} {scenario.method:<6} {scenario.path}")
+        return
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    stub = StubLLM(
+        latency_ms=args.latency_ms,
+        distribution=args.distribution,
+        sigma=args.sigma,
+        error_rate=args.error_rate,
+        response_tokens=args.response_tokens,
+        tokens_per_second=args.tokens_per_second,
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as state_dir, patch.object(
+        api, "get_gemini_response", stub.get_response
+    ), patch.object(api, "stream_gemini_response", stub.stream_response), patch.dict(
+        api.config,
+        {"resume_index_path": state_dir, "task_db_path": os.path.join(state_dir, "tasks.sqlite")},
+    ), patch.object(api, "resume_index", None), patch.object(api, "task_queue", None):
+        api.response_cache.clear()
+        results = asyncio.run(_drive(scenarios, args.requests, levels, args.warmup))
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": levels,
+            "model_max_concurrency": api.config["model_max_concurrency"],
+        },
+        "stub": stub.stats(),
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'report'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Benchmark bytes sent per model request with and without static-prefix caching.
+
+Routes real prompts through ``get_gemini_response`` against a stub provider that records the
+request payload size and simulates prefill latency proportional to it. Each prefix strategy is
+run over the same prompts:
+
+* ``inline``: the whole prompt is sent on every request (previous behaviour)
+* ``system``: the static prefix travels as a system instruction
+* ``cached``: the static prefix is stored once as provider-side cached context
+
+The ``cached`` strategy is only taken for prefixes that reach the model family's minimum cacheable
+size (``CONTEXT_CACHE_MIN_TOKENS``). None of the current prompt prefixes does, so with the real
+minimums ``cached`` falls back to a system instruction; the report lists the prefix sizes next to
+the minimum. ``--min-tokens`` overrides the minimum to exercise the cached path, and the report
+then marks the threshold as synthetic: those savings are not reachable in production. The app's
+default ``gemini-pro`` sends every prefix inline regardless.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_prefix_cache --requests 300
+    python -m benchmarks.bench_prefix_cache --min-tokens 0   # synthetic: force the cached path
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from typing import Optional, Tuple
+from unittest.mock import patch
+
+from src.models import gemini
+from src.utils import prompts
+from src.utils.compaction import estimate_tokens
+
+RESUME = "\n".join(
+    f"- Led project {idx}: shipped Python services on Kubernetes, cutting p95 latency by {idx * 3}%"
+    for idx in range(1, 25)
+)
+JOB = "Senior backend engineer. Python, FastAPI, PostgreSQL, Kubernetes and AWS experience required."
+
+PROMPT_BUILDERS = [
+    lambda resume, job: prompts.get_skill_gap_prompt(resume, job),
+    lambda resume, job: prompts.get_role_fit_prompt(resume, job),
+    lambda resume, job: prompts.get_ats_check_prompt(resume, job),
+    lambda resume, job: prompts.get_interview_readiness_prompt(job, resume),
+    lambda resume, job: prompts.get_visualization_prompt(resume, job),
+]
+
+
+class _StubProvider:
+    """Stands in for the SDK: counts request bytes and sleeps ``seconds_per_kb`` per KiB sent."""
+
+    def __init__(self, seconds_per_kb: float) -> None:
+        self.seconds_per_kb = seconds_per_kb
+        self.request_bytes = 0
+        self.cache_bytes = 0
+        self.requests = 0
+
+    def _send(self, payload_bytes: int) -> None:
+        self.request_bytes += payload_bytes
+        self.requests += 1
+        time.sleep(self.seconds_per_kb * payload_bytes / 1024)
+
+    def model_class(self):
+        provider = self
+
+        class StubModel:
+            def __init__(self, model_name, generation_config=None, system_instruction=None, cached=False):
+                self.system_bytes = 0 if cached else len((system_instruction or "").encode("utf-8"))
+
+            @classmethod
+            def from_cached_content(cls, cached_content, generation_config=None):
+                return cls("cached", cached=True)
+
+            def generate_content(self, contents, stream=False):
+                provider._send(self.system_bytes + len(contents.encode("utf-8")))
+                return type("Response", (), {"text": "{}"})()
+
+        return StubModel
+
+    def create_cache(self, model, system_instruction=None, ttl=None):
+        self.cache_bytes += len(system_instruction.encode("utf-8"))
+        return object()
+
+
+def _prompt(index: int) -> Tuple[Optional[str], str]:
+    builder = PROMPT_BUILDERS[index % len(PROMPT_BUILDERS)]
+    return prompts.split_prompt(builder(f"{RESUME}\nCandidate {index}", JOB))
+
+
+def _run(mode: str, total_requests: int, seconds_per_kb: float, model: str, min_tokens: Optional[int]) -> dict:
+    provider = _StubProvider(seconds_per_kb)
+    registry = gemini.ModelRegistry(
+        default_model=model,
+        prefix_cache={"inline": "off", "system": "system", "cached": "auto"}[mode],
+    )
+    if min_tokens is not None:
+        registry.context_cache_min_tokens = {model: min_tokens}
+
+    with patch.object(gemini, "model_registry", registry), patch.object(
+        gemini.genai, "GenerativeModel", provider.model_class()
+    ), patch.object(gemini.genai.caching.CachedContent, "create", provider.create_cache):
+        start = time.perf_counter()
+        for index in range(total_requests):
+            static_prefix, model_input = _prompt(index)
+            gemini.get_gemini_response(model_input, system_instruction=static_prefix)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "bytes_per_request": round(provider.request_bytes / provider.requests, 1),
+        "one_time_cache_bytes": provider.cache_bytes,
+        "ms_per_request": round(elapsed / provider.requests * 1000, 3),
+        "strategies": registry.stats()["prefix_strategies"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--ms-per-kb", type=float, default=0.5, help="simulated prefill cost per KiB sent")
+    parser.add_argument("--model", default="gemini-2.5-flash", help="model id (decides the cache minimum)")
+    parser.add_argument(
+        "--min-tokens", type=int, help="synthetic minimum cacheable prefix size; default is the configured one"
+    )
+    args = parser.parse_args()
+
+    configured = gemini.ModelRegistry()._context_cache_min_tokens(args.model)
+    prefix_tokens = sorted({estimate_tokens(_prompt(index)[0] or "") for index in range(len(PROMPT_BUILDERS))})
+    report = {
+        mode: _run(mode, args.requests, args.ms_per_kb / 1000, args.model, args.min_tokens)
+        for mode in ("inline", "system", "cached")
+    }
+    inline = report["inline"]["bytes_per_request"]
+    for mode in ("system", "cached"):
+        report[mode]["bytes_saved_pct"] = round(100 * (1 - report[mode]["bytes_per_request"] / inline), 1)
+    threshold = {
+        "model": args.model,
+        "configured_min_tokens": configured,
+        "min_tokens_used": args.min_tokens if args.min_tokens is not None else configured,
+        "synthetic": args.min_tokens is not None,
+        "prefix_tokens": prefix_tokens,
+    }
+    print(json.dumps({"requests": args.requests, "context_cache_threshold": threshold, **report}, indent=2))
+    if args.min_tokens is not None:
+        print(
+            f"note: synthetic cache threshold ({args.min_tokens} tokens instead of {configured}); the cached "
+            "savings above are not reachable in production",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark recruiter search latency over the persistent resume index.
+
+Builds an index of synthetic resumes in a temporary directory and reports top-K query latency
+for exact (untrained) and IVF search. Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_resume_index --resumes 20000 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from src.utils.embeddings import HashingEmbedder
+from src.utils.vector_index import ResumeIndex
+
+VOCABULARY = (
+    "python java rust go docker kubernetes aws gcp azure react vue sql postgres spark kafka airflow "
+    "pytorch tensorflow nlp llm fastapi django flask terraform linux security devops figma sales "
+    "marketing finance excel tableau scala swift kotlin android ios graphql redis mongodb"
+).split()
+
+
+def _synthetic_resumes(count: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(VOCABULARY, 60)) for _ in range(count)]
+
+
+def _measure(index: ResumeIndex, queries: np.ndarray, top_k: int) -> dict:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    embedder = HashingEmbedder()
+    texts = _synthetic_resumes(args.resumes)
+    vectors = embedder.embed(texts)
+    queries = embedder.embed(_synthetic_resumes(args.queries, seed=1))
+
+    report = {"resumes": args.resumes, "top_k": args.top_k}
+    with tempfile.TemporaryDirectory() as directory:
+        index = ResumeIndex(directory, embedder.dim, train_threshold=args.resumes + 1)
+        start = time.perf_counter()
+        index.add([(f"r{idx}", text) for idx, text in enumerate(texts)], vectors)
+        report["build_s"] = round(time.perf_counter() - start, 3)
+        report["exact"] = _measure(index, queries, args.top_k)
+
+        start = time.perf_counter()
+        index.train()
+        report["train_s"] = round(time.perf_counter() - start, 3)
+        report["ivf"] = _measure(index, queries, args.top_k)
+        index.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark local skill extraction throughput.
+
+Compiles the built-in skill taxonomy and extracts skills from synthetic resumes, reporting
+compile time, resumes per second and per-resume latency. Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_skill_extraction --resumes 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.utils.skills import DEFAULT_TAXONOMY, SkillTaxonomy
+
+FILLER = (
+    "designed built shipped owned improved reduced latency revenue customers platform service team "
+    "pipeline feature launch migration reliability dashboard quarterly roadmap delivered"
+).split()
+
+
+def _synthetic_resumes(count: int, words: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    surfaces = [
+        surface
+        for skills in DEFAULT_TAXONOMY.values()
+        for name, aliases in skills.items()
+        for surface in (name, *aliases)
+    ]
+    vocabulary = FILLER * 4 + surfaces
+    return [" ".join(rng.choice(vocabulary, words)) for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=400)
+    args = parser.parse_args()
+
+    resumes = _synthetic_resumes(args.resumes, args.words)
+
+    start = time.perf_counter()
+    taxonomy = SkillTaxonomy(DEFAULT_TAXONOMY)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    skills_found = 0
+    start = time.perf_counter()
+    for text in resumes:
+        began = time.perf_counter()
+        skills_found += len(taxonomy.extract(text))
+        latencies.append((time.perf_counter() - began) * 1000)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    print(
+        json.dumps(
+            {
+                "resumes": args.resumes,
+                "words_per_resume": args.words,
+                "taxonomy_skills": len(taxonomy),
+                "compile_ms": round(compile_ms, 3),
+                "total_s": round(elapsed, 3),
+                "resumes_per_s": round(args.resumes / elapsed, 1),
+                "p50_ms": round(latencies[len(latencies) // 2], 3),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+                "avg_skills_per_resume": round(skills_found / args.resumes, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Cold-start profile of the API: import-time breakdown and time until the first healthy response.
+
+Every sample is a fresh interpreter, as on a newly scheduled instance. Two measurements are made:
+
+* ``python -X importtime -c "import src.api.api"``. The per-module self/cumulative microseconds
+  are averaged over the runs, and the slowest modules and top-level packages are reported.
+* A child process that imports the app, runs its lifespan startup and answers ``GET /``. Its
+  wall-clock time from spawn to the answer is the time a health check waits, measured for each
+  ``STARTUP_WARMUP`` mode. The child also reports how long the background warm-up took.
+
+The exit status is 1 when the median time-to-healthy of the default ``background`` mode exceeds
+``--budget-ms``, so the script can gate CI. Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 1500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.bench_endpoints import _git_commit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WARMUP_MODES = ("off", "background", "blocking")
+_HEALTH_CHECK = """
+import json, time
+started = time.perf_counter()
+from src.api.api import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    assert client.get("/").status_code == 200
+    ready = time.perf_counter()
+    print("READY", flush=True)
+    deadline = time.monotonic() + 60
+    while "{mode}" != "off" and time.monotonic() < deadline:
+        if client.get("/stats").json()["startup"]["warmup_seconds"] is not None:
+            break
+        time.sleep(0.01)
+    startup = client.get("/stats").json()["startup"]
+print(json.dumps({{"import_s": imported - started, "ready_s": ready - started, "startup": startup}}))
+"""
+
+
+def _child_env(mode: str) -> Dict[str, str]:
+    return {**os.environ, "STARTUP_WARMUP": mode, "TASK_WORKERS": "0", "PYTHONWARNINGS": "ignore"}
+
+
+def import_profile(runs: int) -> Dict[str, Any]:
+    """Average ``-X importtime`` figures (microseconds) across ``runs`` fresh interpreters."""
+
+    self_us: Dict[str, List[int]] = defaultdict(list)
+    cumulative_us: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import src.api.api"],
+            cwd=BACKEND_DIR,
+            env=_child_env("off"),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, total, name = line[len("import time:") :].split("|")
+            self_us[name.strip()].append(int(own))
+            cumulative_us[name.strip()].append(int(total))
+
+    packages: Dict[str, float] = defaultdict(float)
+    for name, samples in self_us.items():
+        packages[name.split(".")[0]] += statistics.mean(samples)
+    modules = sorted(cumulative_us, key=lambda name: -statistics.mean(cumulative_us[name]))
+    return {
+        "app_import_ms": round(statistics.mean(cumulative_us["src.api.api"]) / 1000, 1),
+        "slowest_modules_ms": {
+            name: round(statistics.mean(cumulative_us[name]) / 1000, 1) for name in modules[:15]
+        },
+        "packages_self_ms": {
+            name: round(total / 1000, 1) for name, total in sorted(packages.items(), key=lambda item: -item[1])[:10]
+        },
+    }
+
+
+def time_to_healthy(mode: str) -> Dict[str, Any]:
+    """Spawn a fresh interpreter with ``STARTUP_WARMUP=mode`` and time it until ``GET /`` answers."""
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", _HEALTH_CHECK.format(mode=mode)],
+        cwd=BACKEND_DIR,
+        env=_child_env(mode),
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert process.stdout is not None
+    first_line = process.stdout.readline()
+    healthy = time.perf_counter() - started
+    remainder, _ = process.communicate(timeout=120)
+    if process.returncode or first_line.strip() != "READY":
+        raise RuntimeError(f"health check child failed in mode {mode!r} (status {process.returncode})")
+    report = json.loads(remainder.strip().splitlines()[-1])
+    return {
+        "healthy_s": healthy,
+        "import_s": report["import_s"],
+        "warmup_s": report["startup"]["warmup_seconds"],
+        "sdk_loaded_after_warmup": report["startup"]["sdk_loaded"],
+    }
+
+
+def _median(samples: List[Dict[str, Any]], key: str) -> Any:
+    values = [sample[key] for sample in samples if sample[key] is not None]
+    return round(statistics.median(values) * 1000, 1) if values else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--modes", default=",".join(WARMUP_MODES), help="STARTUP_WARMUP modes to time")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="max median time-to-healthy (background)")
+    parser.add_argument("--output", help="also write the JSON report to this path")
+    args = parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    cold_start = {}
+    for mode in modes:
+        samples = [time_to_healthy(mode) for _ in range(args.runs)]
+        cold_start[mode] = {
+            "healthy_ms": _median(samples, "healthy_s"),
+            "app_import_ms": _median(samples, "import_s"),
+            "warmup_ms": _median(samples, "warmup_s"),
+            "sdk_loaded_after_warmup": all(sample["sdk_loaded_after_warmup"] for sample in samples),
+        }
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "runs": args.runs,
+            "budget_ms": args.budget_ms,
+        },
+        "imports": import_profile(args.runs),
+        "cold_start": cold_start,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+    print(text)
+    healthy = cold_start.get("background", {}).get("healthy_ms")
+    if healthy is not None and healthy > args.budget_ms:
+        print(f"cold start {healthy} ms exceeds the {args.budget_ms:.0f} ms budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
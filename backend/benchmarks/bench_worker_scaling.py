@@ -0,0 +1,176 @@
+"""Throughput of the multi-worker server as the number of worker processes grows.
+
+For each worker count the script starts ``python -m src.serve`` with the stub model app
+(:mod:`benchmarks.stub_app`), waits for it to answer ``/``, drives the selected scenarios from
+:mod:`benchmarks.bench_endpoints` over real HTTP and shuts it down. Every run gets a fresh shared
+state directory. The report gives requests per second, p95 latency, and the speedup and parallel
+efficiency relative to one worker. CPU-bound scenarios (PDF parsing in ``/analyze``) should scale
+with cores; model-bound ones mostly measure overhead, because the stub sleeps instead of computing.
+
+Run from the ``backend`` directory (uvicorn must be installed)::
+
+    python -m benchmarks.bench_worker_scaling --workers 1,2,4 --requests 200 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_endpoints import SCENARIOS, Scenario, _git_commit, _run_scenario
+from src.utils.cpus import available_cpus
+
+DEFAULT_SCENARIOS = "analyze[pdf=8p,mode=fast],analyze[pdf=40p],resume/role-fit"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(workers: int, port: int, state_dir: str, stub_env: Dict[str, str]) -> subprocess.Popen:
+    command = [
+        sys.executable,
+        "-m",
+        "src.serve",
+        "--app",
+        "benchmarks.stub_app:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--workers",
+        str(workers),
+        "--state-dir",
+        state_dir,
+        "--log-level",
+        "warning",
+    ]
+    env = {**os.environ, **stub_env, "TASK_WORKERS": "0"}
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)
+
+
+async def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with status {process.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def _stop_server(process: subprocess.Popen) -> None:
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def _measure(
+    base_url: str, scenarios: List[Scenario], requests: int, concurrency: int, warmup: int
+) -> List[Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as client:
+        for scenario in scenarios:
+            if warmup:
+                # Concurrent warm-up so every worker process has served a request before measuring.
+                await _run_scenario(client, scenario, warmup, concurrency)
+            results.append(await _run_scenario(client, scenario, requests, concurrency))
+    return results
+
+
+def _with_scaling(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    baseline = {row["scenario"]: row["requests_per_s"] for row in rows if row["workers"] == 1}
+    for row in rows:
+        base = baseline.get(row["scenario"])
+        speedup = row["requests_per_s"] / base if base and row["requests_per_s"] else None
+        row["speedup"] = round(speedup, 2) if speedup is not None else None
+        row["efficiency"] = round(speedup / row["workers"], 2) if speedup is not None else None
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="", help="comma-separated worker counts (default: 1,2,4.. up to CPUs)")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario and worker count")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--warmup", type=int, default=32, help="unmeasured requests per scenario")
+    parser.add_argument("--only", default=DEFAULT_SCENARIOS, help="comma-separated scenario names")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="median stub model latency")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="also write the JSON report to this path")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    if args.workers:
+        counts = [int(count) for count in args.workers.split(",") if count.strip()]
+    else:
+        counts = sorted({1, cpus} | {2**power for power in range(cpus.bit_length()) if 2**power <= cpus})
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    scenarios = [scenario for scenario in SCENARIOS if scenario.name in names]
+    stub_env = {"BENCH_STUB_LATENCY_MS": str(args.latency_ms)}
+
+    rows: List[Dict[str, Any]] = []
+    for workers in counts:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        with tempfile.TemporaryDirectory() as state_dir:
+            process = _start_server(workers, port, state_dir, stub_env)
+            try:
+                asyncio.run(_wait_ready(base_url, process, args.startup_timeout))
+                results = asyncio.run(_measure(base_url, scenarios, args.requests, args.concurrency, args.warmup))
+            finally:
+                _stop_server(process)
+        for result in results:
+            rows.append({"workers": workers, **result})
+            print(
+                f"workers={workers:<3} {result['scenario']:<32} {result['requests_per_s']:>9} req/s  "
+                f"p95={result['p95_ms']}ms errors={result['errors']}",
+                flush=True,
+            )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": cpus,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "stub_latency_ms": args.latency_ms,
+        },
+        "results": _with_scaling(rows),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Compare two ``bench_endpoints`` reports and flag latency/throughput regressions.
+
+Rows are matched on (scenario, concurrency). A row regresses when its p95 latency grows or its
+throughput drops by more than ``--threshold`` (relative), or its error rate rises. The exit status
+is 1 when any row regressed, so the script can gate CI. Run from the ``backend`` directory::
+
+    python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+Key = Tuple[str, int]
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _rows(report: Dict[str, Any]) -> Dict[Key, Dict[str, Any]]:
+    return {(row["scenario"], row["concurrency"]): row for row in report["results"]}
+
+
+def _change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if not before or after is None:
+        return None
+    return (after - before) / before
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-row deltas between ``base`` and ``head`` with a ``regression`` reason list."""
+
+    base_rows, head_rows = _rows(base), _rows(head)
+    comparison = []
+    for key in sorted(base_rows.keys() & head_rows.keys()):
+        before, after = base_rows[key], head_rows[key]
+        p95_change = _change(before["p95_ms"], after["p95_ms"])
+        rps_change = _change(before["requests_per_s"], after["requests_per_s"])
+        reasons = []
+        if p95_change is not None and p95_change > threshold:
+            reasons.append("p95")
+        if rps_change is not None and rps_change < -threshold:
+            reasons.append("throughput")
+        if after["error_rate"] > before["error_rate"]:
+            reasons.append("errors")
+        comparison.append(
+            {
+                "scenario": key[0],
+                "concurrency": key[1],
+                "p95_ms": (before["p95_ms"], after["p95_ms"]),
+                "p95_change": p95_change,
+                "requests_per_s": (before["requests_per_s"], after["requests_per_s"]),
+                "rps_change": rps_change,
+                "error_rate": (before["error_rate"], after["error_rate"]),
+                "regression": reasons,
+            }
+        )
+    return comparison
+
+
+def _pct(change: Optional[float]) -> str:
+    return "n/a" if change is None else f"{change * 100:+.1f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", help="report of the baseline commit")
+    parser.add_argument("head", help="report of the commit under test")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change tolerated (0.10 = 10%%)")
+    parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args()
+
+    base, head = _load(args.base), _load(args.head)
+    comparison = compare(base, head, args.threshold)
+    regressions = [row for row in comparison if row["regression"]]
+    if args.json:
+        print(json.dumps({"base": base["meta"], "head": head["meta"], "rows": comparison}, indent=2))
+    else:
+        print(f"base {base['meta'].get('commit')}  ->  head {head['meta'].get('commit')}")
+        print(f"{'scenario':<36} {'c':>4} {'p95 ms (base -> head)':>26} {'p95':>8} {'req/s':>8}  flags")
+        for row in comparison:
+            before, after = row["p95_ms"]
+            print(
+                f"{row['scenario']:<36} {row['concurrency']:>4} {f'{before} -> {after}':>26} "
+                f"{_pct(row['p95_change']):>8} {_pct(row['rps_change']):>8}  {','.join(row['regression'])}"
+            )
+        print(f"{len(regressions)} regression(s) at threshold {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""The API application with model calls routed to :class:`benchmarks.stub_llm.StubLLM`.
+
+Used as ``--app benchmarks.stub_app:app`` when benchmarking real server processes, where the stub
+cannot be patched in from the outside. Each worker process imports this module and builds its own
+stub from ``BENCH_STUB_*`` environment variables.
+"""
+
+from __future__ import annotations
+
+import os
+
+from benchmarks.stub_llm import StubLLM
+from src.api import api
+
+stub = StubLLM(
+    latency_ms=float(os.getenv("BENCH_STUB_LATENCY_MS", "150")),
+    distribution=os.getenv("BENCH_STUB_DISTRIBUTION", "lognormal"),
+    sigma=float(os.getenv("BENCH_STUB_SIGMA", "0.5")),
+    error_rate=float(os.getenv("BENCH_STUB_ERROR_RATE", "0")),
+    response_tokens=int(os.getenv("BENCH_STUB_RESPONSE_TOKENS", "200")),
+    seed=int(os.getenv("BENCH_STUB_SEED", "0")),
+)
+api.get_gemini_response = stub.get_response
+api.stream_gemini_response = stub.stream_response
+app = api.app
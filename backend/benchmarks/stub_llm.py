@@ -0,0 +1,159 @@
+"""Deterministic stand-in for the Gemini calls used by the benchmarks.
+
+:class:`StubLLM` replaces ``get_gemini_response`` and ``stream_gemini_response`` with functions of
+the same signature. Each call blocks for a latency drawn from a configurable distribution (as the
+SDK blocks inside ``generate_content``), fails with a transient upstream error at a configurable
+rate, and answers with a JSON document that satisfies every endpoint's response shape. Streaming
+calls wait the sampled time-to-first-token and then emit the document in small fragments at
+``tokens_per_second``.
+
+Randomness is derived from ``(seed, prompt, n-th call with that prompt)``. Thread scheduling
+therefore cannot change which calls fail or how long they take, and two runs with the same
+arguments put the same load on the app.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+_CANDIDATE_LABEL = re.compile(r"^(Resume_\d+):", re.MULTILINE)
+_CHARS_PER_TOKEN = 4
+
+
+class StubUpstreamError(Exception):
+    """Transient provider failure; ``code`` marks it retryable like ``google.api_core`` errors."""
+
+    def __init__(self, code: int = 503) -> None:
+        super().__init__(f"stub upstream error {code}")
+        self.code = code
+
+
+class StubLLM:
+    """Configurable fake model provider with per-call latency, error and streaming behaviour."""
+
+    def __init__(
+        self,
+        *,
+        latency_ms: float = 200.0,
+        distribution: str = "lognormal",
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        error_code: int = 503,
+        response_tokens: int = 200,
+        tokens_per_second: float = 400.0,
+        seed: int = 0,
+    ) -> None:
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {LATENCY_DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.response_tokens = response_tokens
+        self.tokens_per_second = tokens_per_second
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._counters = {"calls": 0, "stream_calls": 0, "errors": 0, "prompt_chars": 0, "response_chars": 0}
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            occurrence = self._seen.get(digest, 0)
+            self._seen[digest] = occurrence + 1
+        return random.Random(f"{self.seed}:{digest}:{occurrence}")
+
+    def _latency(self, rng: random.Random) -> float:
+        mean = self.latency_ms / 1000
+        if self.distribution == "fixed":
+            return mean
+        if self.distribution == "uniform":
+            return rng.uniform(0, 2 * mean)
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / mean) if mean > 0 else 0.0
+        # Lognormal with the requested median: most calls near it, with a long slow tail.
+        return mean * rng.lognormvariate(0, self.sigma)
+
+    def _begin(self, prompt: str, system_instruction: Optional[str], counter: str) -> random.Random:
+        full_prompt = (system_instruction or "") + prompt
+        rng = self._rng(full_prompt)
+        with self._lock:
+            self._counters[counter] += 1
+            self._counters["prompt_chars"] += len(full_prompt)
+        time.sleep(self._latency(rng))
+        if rng.random() < self.error_rate:
+            with self._lock:
+                self._counters["errors"] += 1
+            raise StubUpstreamError(self.error_code)
+        return rng
+
+    def document(self, prompt: str) -> str:
+        """JSON answer covering the fields every endpoint reads, padded to ``response_tokens``."""
+
+        labels = _CANDIDATE_LABEL.findall(prompt)
+        body: Dict[str, Any] = {
+            "jd_match": "78%",
+            "missing_keywords": ["kubernetes", "terraform"],
+            "profile_summary": "Backend engineer with strong Python and API design experience.",
+            "rewritten_resume": "# Candidate\n- Shipped Python services used by 2M users",
+            "key_adjustments": ["Quantified impact"],
+            "keyword_alignment_score": "88%",
+            "cover_letter": "Dear hiring manager, I am excited to apply.",
+            "overall_fit": "80%",
+            "scores": {"workday": "82%", "lever": "79%", "greenhouse": "85%"},
+            "explanation": "Strong overlap on core backend skills.",
+            "recommendations": ["Highlight cloud experience"],
+            "candidate_rankings": [
+                {"candidate_id": label, "overall_score": 90 - index % 40, "strengths": [], "risks": []}
+                for index, label in enumerate(labels)
+            ],
+            "skill_matrix": [{"skill": "Python", "coverage": "85%"}] if labels else [],
+        }
+        padding_chars = max(0, self.response_tokens * _CHARS_PER_TOKEN - len(json.dumps(body)))
+        body["notes"] = ("lorem ipsum " * (padding_chars // 12 + 1))[:padding_chars]
+        return json.dumps(body)
+
+    def get_response(self, input_prompt, model_name=None, generation_config=None, system_instruction=None):
+        """Drop-in replacement for :func:`src.models.gemini.get_gemini_response`."""
+
+        self._begin(input_prompt, system_instruction, "calls")
+        text = self.document(input_prompt)
+        with self._lock:
+            self._counters["response_chars"] += len(text)
+        return text
+
+    def stream_response(
+        self, input_prompt, model_name=None, generation_config=None, system_instruction=None
+    ) -> Iterator[str]:
+        """Drop-in replacement for :func:`src.models.gemini.stream_gemini_response`."""
+
+        self._begin(input_prompt, system_instruction, "stream_calls")
+        text = self.document(input_prompt)
+        fragment_chars = 4 * _CHARS_PER_TOKEN
+        delay = 4 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for start in range(0, len(text), fragment_chars):
+            if delay:
+                time.sleep(delay)
+            with self._lock:
+                self._counters["response_chars"] += len(text[start : start + fragment_chars])
+            yield text[start : start + fragment_chars]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "latency_ms": self.latency_ms,
+                "distribution": self.distribution,
+                "error_rate": self.error_rate,
+                "response_tokens": self.response_tokens,
+                "tokens_per_second": self.tokens_per_second,
+                "seed": self.seed,
+            }
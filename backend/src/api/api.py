@@ -1,17 +1,88 @@
 from __future__ import annotations
 
-import io
+import asyncio
+import copy
 import json
-from typing import Any, Dict, List
-
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Tuple, Type
+
+from fastapi import FastAPI, File, Form, Header, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.routing import Match
 
 from src.config.config import load_config
-from src.models.gemini import configure_gemini, get_gemini_response
+from src.models.client import AsyncModelClient
+from src.models.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ModelDeadlineExceeded,
+    ResilientCaller,
+    is_rate_limited,
+    is_transient,
+)
+from src.models.scheduler import BULK, INTERACTIVE, STANDARD, ModelScheduler
+from src.models.gemini import (
+    configure_gemini,
+    get_gemini_response,
+    json_generation_config,
+    model_registry,
+    sdk_loaded,
+    stream_gemini_response,
+)
 from src.utils import prompts
-from src.utils.pdf_utils import extract_text_from_pdf
+from src.utils.bulk_scoring import BulkScoreAggregator, candidate_label, chunk_resumes
+from src.utils.cache import build_tiered_cache, make_cache_key
+from src.utils.compaction import compact_inputs, estimate_tokens, input_token_budget
+from src.utils.embeddings import get_embedder, semantic_similarity
+from src.utils.json_stream import JsonFieldStreamer
+from src.utils.keywords import get_keyword_matcher
+from src.utils.metrics import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    MODEL_COST,
+    MODEL_PROMPT_BYTES,
+    MODEL_RESPONSE_BYTES,
+    MODEL_TOKENS,
+    PROMETHEUS_CONTENT_TYPE,
+    REGISTRY,
+    RESPONSE_CACHE_LOOKUPS,
+    STAGE_SECONDS,
+    Sample,
+    current_route,
+    span,
+)
+from src.utils.pdf_utils import PDFLimitError, configure_pool, extract_text_from_pdf, load_pdf_library
+from src.utils.singleflight import SingleFlight
+from src.utils.skills import load_skill_taxonomy
+from src.utils.streaming import SSE_MEDIA_TYPE, STREAM_FORMATS, format_sse
+from src.utils.structured_output import CLEAN, TRUNCATED, JSONRepairError, ParseStats, parse_model_json, response_schema
+from src.utils.task_queue import (
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    IdempotencyConflict,
+    TaskContext,
+    TaskQueue,
+    TaskStore,
+    WebhookRejected,
+    check_webhook_url,
+    public_view,
+)
+from src.utils.uploads import (
+    MULTIPART_OVERHEAD_BYTES,
+    RequestSizeLimitMiddleware,
+    SpooledUpload,
+    UploadTooLargeError,
+    spool_upload,
+)
+from src.utils.vector_index import ResumeIndex
 
 
 class ATSResponse(BaseModel):
@@ -30,6 +101,9 @@ class ATSResponse(BaseModel):
     }
 
 
+ScoringMode = Literal["fast", "llm", "hybrid"]
+
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -49,6 +123,10 @@ class CoverLetterRequest(ResumeAndJobRequest):
     applicant_context: Dict[str, str] = Field(default_factory=dict)
 
 
+class BatchAnalysisRequest(ResumeAndJobRequest):
+    features: List[str] = Field(min_length=1, max_length=16)
+
+
 class ResumeOnlyRequest(BaseModel):
     resume_text: str
 
@@ -71,6 +149,26 @@ class JobAlertsRequest(BaseModel):
 class RecruiterBulkRequest(BaseModel):
     resumes: List[str]
     job_description: str
+    mode: Literal["single", "parallel"] = "single"
+    chunk_size: int = Field(default=1, ge=1, le=25)
+    max_concurrency: Optional[int] = Field(default=None, ge=1, le=64)
+
+
+class IndexedResume(BaseModel):
+    resume_id: str
+    resume_text: str
+
+
+class ResumeIndexRequest(BaseModel):
+    resumes: List[IndexedResume]
+
+
+class RecruiterSearchRequest(BaseModel):
+    job_description: str
+    top_k: int = Field(default=10, ge=1, le=200)
+    score: bool = False
+    chunk_size: int = Field(default=1, ge=1, le=25)
+    max_concurrency: Optional[int] = Field(default=None, ge=1, le=64)
 
 
 class OrchestrationRequest(BaseModel):
@@ -102,12 +200,293 @@ def _coalesce(payload: Dict[str, Any], keys: List[str], default: Any = None) ->
     return default
 
 
-def _invoke_model(prompt: str) -> Any:
-    raw_response = get_gemini_response(prompt)
+def _split_for_model(prompt: str) -> Tuple[str, Dict[str, Any]]:
+    """Model input plus keyword arguments that hand the prompt's static prefix over separately."""
+
+    static_prefix, model_input = prompts.split_prompt(prompt)
+    if static_prefix is None:
+        return prompt, {}
+    return model_input, {"system_instruction": static_prefix}
+
+
+def _estimated_prompt_tokens(model_input: str, options: Dict[str, Any]) -> int:
+    return estimate_tokens(model_input) + estimate_tokens(options.get("system_instruction") or "")
+
+
+def _model_slot(endpoint: Optional[str], model_input: str, options: Dict[str, Any]) -> Any:
+    """Scheduler slot for one upstream call, sized by the estimated prompt tokens it sends."""
+
+    tokens = _estimated_prompt_tokens(model_input, options)
+    return model_scheduler.slot(endpoint, ENDPOINT_PRIORITIES.get(endpoint or "", STANDARD), tokens)
+
+
+async def _run_model(endpoint: Optional[str], model_input: str, options: Dict[str, Any]) -> str:
+    with span("model_call"):
+        raw_response = await model_client.run(get_gemini_response, model_input, **options)
+    _record_model_usage(endpoint, model_input, options, raw_response, getattr(raw_response, "usage", None))
+    return raw_response
+
+
+def _record_model_usage(
+    endpoint: Optional[str],
+    model_input: str,
+    options: Dict[str, Any],
+    response: Any,
+    usage: Optional[Dict[str, int]] = None,
+) -> None:
+    """Record prompt/response sizes, token usage and cost of one model call.
+
+    Token counts are the ones the provider reported in ``usage`` when present, else estimated from
+    the text. The scheduler's token budget is then settled against them.
+    """
+
+    route = endpoint or "none"
+    prompt_text = (options.get("system_instruction") or "") + model_input
+    response_text = response if isinstance(response, str) else ""
+    MODEL_PROMPT_BYTES.observe(len(prompt_text.encode("utf-8")), route=route)
+    MODEL_RESPONSE_BYTES.observe(len(response_text.encode("utf-8")), route=route)
+    if usage is not None:
+        prompt_tokens, response_tokens = usage["prompt_tokens"], usage["response_tokens"]
+    else:
+        prompt_tokens, response_tokens = estimate_tokens(prompt_text), estimate_tokens(response_text)
+    model_scheduler.settle_tokens(_estimated_prompt_tokens(model_input, options), prompt_tokens + response_tokens)
+    MODEL_TOKENS.inc(prompt_tokens, route=route, direction="prompt")
+    MODEL_TOKENS.inc(response_tokens, route=route, direction="response")
+    MODEL_COST.inc(
+        (prompt_tokens * config["model_input_cost_per_1k"] + response_tokens * config["model_output_cost_per_1k"])
+        / 1000,
+        route=route,
+    )
+
+
+async def _resilient_model_call(operation: Callable[[], Any], endpoint: Optional[str]) -> str:
+    """Run an upstream call under the endpoint's deadline, retry policy and circuit breaker.
+
+    Upstream trouble becomes a client-facing status instead of a generic 500: an open circuit or
+    exhausted transient retries map to 503, provider rate limiting to 429 and deadlines to 504.
+    """
+
+    deadline = config["model_endpoint_deadlines"].get(endpoint or "", config["model_deadline_seconds"])
+    try:
+        return await model_resilience.call(operation, deadline=deadline)
+    except CircuitOpenError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Model provider is unavailable",
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        ) from exc
+    except ModelDeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail="Model call timed out") from exc
+    except Exception as exc:
+        if is_rate_limited(exc):
+            raise HTTPException(
+                status_code=429, detail="Model provider rate limit reached", headers={"Retry-After": "5"}
+            ) from exc
+        if is_transient(exc):
+            raise HTTPException(status_code=503, detail="Model provider error") from exc
+        raise
+
+
+async def _call_model(
+    prompt: str,
+    cache_key: Optional[str],
+    response_model: Optional[Type[BaseModel]] = None,
+) -> Any:
+    """Call the model in JSON mode and decode its output.
+
+    Output that fails a strict parse goes through the local repair pass; only output that is still
+    unusable triggers another model call (up to ``model_parse_retries``) before a 500.
+    """
+
+    model_input, options = _split_for_model(prompt)
+    schema = response_schema(response_model) if response_model is not None else None
+    if sdk_loaded():
+        generation_config = json_generation_config(response_schema=schema)
+    else:
+        # JSON-mode support depends on the SDK version; until the warm-up has imported it, that
+        # import happens in the thread pool instead of blocking the event loop.
+        generation_config = await run_in_threadpool(json_generation_config, None, schema)
+    if generation_config is not None:
+        options["generation_config"] = generation_config
+    endpoint = current_route.get()
+    retries = config["model_parse_retries"]
+    for attempt in range(retries + 1):
+        # The scheduler slot is held outside the resilient call: time spent queued behind the RPM/TPM
+        # buckets is not provider latency and must not count against the deadline or the breaker.
+        async with _model_slot(endpoint, model_input, options):
+            raw_response = await _resilient_model_call(lambda: _run_model(endpoint, model_input, options), endpoint)
+        try:
+            with span("json_decode"):
+                result, outcome = parse_model_json(raw_response)
+        except JSONRepairError as exc:
+            if attempt < retries:
+                parse_stats.record(endpoint, "retried")
+                continue
+            parse_stats.record(endpoint, "failed")
+            raise HTTPException(status_code=500, detail="Failed to parse model response") from exc
+        parse_stats.record(endpoint, outcome)
+        break
+    # Output rebuilt from a cut-off response is served once but never cached as the answer.
+    if cache_key is not None and outcome != TRUNCATED:
+        await response_cache.aset(cache_key, json.dumps(result) if outcome != CLEAN else raw_response)
+    return result
+
+
+async def _invoke_model(
+    prompt: str,
+    *,
+    use_cache: bool = True,
+    response_model: Optional[Type[BaseModel]] = None,
+) -> Any:
+    """Resolve a prompt to parsed JSON via the response cache and single-flight dedup.
+
+    Endpoints whose output should never be reused (e.g. the career coach) pass ``use_cache=False``
+    to skip both the cache and in-flight coalescing. ``response_model`` constrains generation to
+    that model's schema where the provider supports it.
+    """
+
+    if not use_cache:
+        return await _call_model(prompt, None, response_model)
+
+    cache_key = make_cache_key(model_registry.default_model, prompt)
+    cached = await response_cache.aget(cache_key)
+    RESPONSE_CACHE_LOOKUPS.inc(route=current_route.get() or "none", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return json.loads(cached)
+
+    result, _ = await model_flights.do(cache_key, lambda: _call_model(prompt, cache_key, response_model))
+    # Every caller, the leader included, gets its own copy: endpoints such as the hybrid ATS check
+    # modify the result, and the leader may resume before the followers have read it.
+    return copy.deepcopy(result)
+
+
+def _stream_model(
+    prompt: str,
+    *,
+    field: Optional[str] = None,
+    shape: Callable[[Any], Any] = lambda result: result,
+) -> StreamingResponse:
+    """Stream a model completion over SSE.
+
+    Emits ``delta`` events with newly decoded text of ``field`` as tokens arrive (or raw ``token``
+    events when no field is given), then a ``result`` event carrying the same structured object the
+    non-streaming endpoint returns. Successful completions populate the response cache. Output that
+    fails to decode is repaired locally but never retried, since its deltas were already sent.
+    """
+
+    async def events() -> AsyncIterator[str]:
+        cache_key = make_cache_key(model_registry.default_model, prompt)
+        cached = await response_cache.aget(cache_key)
+        RESPONSE_CACHE_LOOKUPS.inc(route=endpoint or "none", result="miss" if cached is None else "hit")
+        if cached is not None:
+            result = shape(json.loads(cached))
+            if field is not None and isinstance(result, dict) and isinstance(result.get(field), str):
+                yield format_sse("delta", {"field": field, "text": result[field]})
+            yield format_sse("result", result)
+            return
+
+        streamer = JsonFieldStreamer(field) if field is not None else None
+        fragments: List[str] = []
+        # The provider's running token counts arrive on the fragments; the last report wins.
+        usage: Optional[Dict[str, int]] = None
+        admitted = False
+        # True once the provider answered, False on a transient failure, None if the stream was abandoned.
+        provider_ok: Optional[bool] = None
+        try:
+            # Partially streamed output cannot be retried, but the circuit breaker still applies.
+            model_resilience.breaker.before_call()
+            admitted = True
+            model_input, options = _split_for_model(prompt)
+            async with _model_slot(endpoint, model_input, options):
+                with STAGE_SECONDS.time(route=endpoint or "none", stage="model_stream"):
+                    async for fragment in model_client.stream(stream_gemini_response, model_input, **options):
+                        usage = getattr(fragment, "usage", None) or usage
+                        if not fragment:
+                            continue
+                        fragments.append(fragment)
+                        if streamer is None:
+                            yield format_sse("token", {"text": fragment})
+                            continue
+                        delta = streamer.feed(fragment)
+                        if delta:
+                            yield format_sse("delta", {"field": field, "text": delta})
+            provider_ok = True
+        except CircuitOpenError:
+            yield format_sse("error", {"detail": "Model provider is unavailable", "status_code": 503})
+            return
+        except Exception as exc:
+            provider_ok = not is_transient(exc)
+            yield format_sse("error", {"detail": str(exc)})
+            return
+        finally:
+            # Every exit, including a client disconnecting mid-stream, settles the breaker so a
+            # half-open probe is never left claimed.
+            if admitted:
+                if provider_ok is None:
+                    model_resilience.breaker.release_probe()
+                elif provider_ok:
+                    model_resilience.breaker.record_success()
+                else:
+                    model_resilience.breaker.record_failure()
+
+        raw_response = "".join(fragments)
+        _record_model_usage(endpoint, model_input, options, raw_response, usage)
+        try:
+            with STAGE_SECONDS.time(route=endpoint or "none", stage="json_decode"):
+                result, outcome = parse_model_json(raw_response)
+        except JSONRepairError:
+            parse_stats.record(endpoint, "failed")
+            yield format_sse("error", {"detail": "Failed to parse model response"})
+            return
+        parse_stats.record(endpoint, outcome)
+        if outcome != TRUNCATED:
+            await response_cache.aset(cache_key, json.dumps(result) if outcome != CLEAN else raw_response)
+        yield format_sse("result", shape(result))
+
+    endpoint = current_route.get()
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE)
+
+
+def _warm_up() -> None:
+    """Import the model SDK and PDF library, configure the provider and build the default model.
+
+    This also resolves the SDK's JSON-mode support, so ``_call_model`` never imports the SDK itself.
+    """
+
+    started = time.perf_counter()
+    try:
+        model_registry.warm_up()
+        json_generation_config()
+        load_pdf_library()
+    except Exception as exc:
+        # A failed warm-up only costs the first request its latency; that request reports the error.
+        startup_stats["warmup_error"] = str(exc)
+    startup_stats["warmup_seconds"] = round(time.perf_counter() - started, 4)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up the model provider and run the background task workers for the life of the process.
+
+    ``STARTUP_WARMUP`` decides when the heavy imports and provider setup happen: ``background``
+    (default) right after startup without holding back the first health check, ``blocking``
+    before the server accepts requests, and ``off`` on the first request that needs them.
+    """
+
+    warm_up: Optional["asyncio.Future[None]"] = None
+    if config["startup_warmup"] == "blocking":
+        await run_in_threadpool(_warm_up)
+    elif config["startup_warmup"] != "off":
+        warm_up = asyncio.ensure_future(run_in_threadpool(_warm_up))
+    if config["task_workers"] > 0:
+        await _get_task_queue().start()
     try:
-        return json.loads(raw_response)
-    except json.JSONDecodeError as exc:
-        raise HTTPException(status_code=500, detail="Failed to parse model response") from exc
+        yield
+    finally:
+        if task_queue is not None:
+            await task_queue.stop()
+        if warm_up is not None:
+            await asyncio.gather(warm_up, return_exceptions=True)
 
 
 # Initialize FastAPI app
@@ -115,6 +494,7 @@ app = FastAPI(
     title="AI Career Copilot API",
     description="AI-driven resume intelligence, career guidance, and recruiter tooling",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -126,9 +506,153 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """Path template of the route ``scope`` resolves to, or ``"unmatched"``.
+
+    Resolved before routing so stage metrics recorded inside the handler carry the same label as
+    the request metrics. A route matching only the path (wrong method) still names the template.
+    """
+
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, "path", None)
+    return partial or "unmatched"
+
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next: Callable[[Request], Any]) -> Response:
+    """Record per-route request metrics and expose prompt token counts for compacted requests.
+
+    Both share one middleware so each request pays for a single wrapping layer. Durations cover the
+    time until the response starts, which for streaming endpoints is the time to the first byte.
+    """
+
+    metadata: Dict[str, int] = {}
+    token = _prompt_metadata.set(metadata)
+    # The route template keeps label cardinality bounded (``/recruiter/index/{resume_id}``).
+    route = _route_template(request.scope)
+    endpoint_token = current_route.set(route)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        current_route.reset(endpoint_token)
+        _prompt_metadata.reset(token)
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route)
+        HTTP_REQUESTS.inc(route=route, method=request.method, status=status_code)
+    if metadata:
+        response.headers["X-Input-Tokens"] = str(metadata["input_tokens"])
+        response.headers["X-Compacted-Tokens"] = str(metadata["compacted_tokens"])
+        response.headers["X-Trimmed-Sections"] = str(metadata["trimmed_sections"])
+    return response
+
+
 # Load configuration
 config = load_config()
-configure_gemini(config["api_key"])
+# The SDK is imported and configured on first use or by the lifespan warm-up, not at import time.
+configure_gemini(config["api_key"], defer=True)
+model_registry.default_model = config["model_name"]
+model_registry.prefix_cache = config["prompt_prefix_cache"]
+model_registry.context_cache_ttl = config["context_cache_ttl"]
+configure_pool(config["pdf_pool_workers"])
+# Uploads are rejected before Starlette buffers the multipart body, not after.
+app.add_middleware(RequestSizeLimitMiddleware, max_bytes=config["pdf_max_bytes"] + MULTIPART_OVERHEAD_BYTES)
+startup_stats: Dict[str, Any] = {"warmup": config["startup_warmup"], "warmup_seconds": None, "warmup_error": None}
+model_client = AsyncModelClient(max_concurrency=config["model_max_concurrency"])
+response_cache = build_tiered_cache(
+    max_entries=config["response_cache_max_entries"],
+    max_bytes=config["response_cache_max_bytes"],
+    ttl=config["response_cache_ttl"],
+    disk_path=config["response_cache_path"],
+    disk_max_rows=config["response_cache_disk_max_rows"],
+)
+model_flights = SingleFlight()
+model_scheduler = ModelScheduler(
+    config["model_max_concurrency"],
+    requests_per_minute=config["model_requests_per_minute"],
+    tokens_per_minute=config["model_tokens_per_minute"],
+    shared_state_path=config["rate_limit_state_path"],
+)
+# Scheduling class per endpoint path; anything not listed is STANDARD. Users waiting on a chat reply
+# or a token stream go first, recruiter-scale scoring goes last.
+ENDPOINT_PRIORITIES: Dict[str, int] = {
+    "/analyze": INTERACTIVE,
+    "/career/coach": INTERACTIVE,
+    "/resume/rewrite/stream": INTERACTIVE,
+    "/resume/cover-letter/stream": INTERACTIVE,
+    "/portfolio/generate/stream": INTERACTIVE,
+    "/recruiter/bulk-score": BULK,
+    "/recruiter/bulk-score/stream": BULK,
+    "/recruiter/search": BULK,
+    "/tasks/recruiter/bulk-score": BULK,
+    "/batch": BULK,
+}
+model_resilience = ResilientCaller(
+    CircuitBreaker(
+        failure_threshold=config["circuit_failure_threshold"],
+        recovery_timeout=config["circuit_recovery_seconds"],
+    ),
+    max_attempts=config["model_max_attempts"],
+    base_delay=config["model_retry_base_delay"],
+    hedge=config["model_hedging"],
+)
+pdf_text_cache = build_tiered_cache(
+    max_entries=config["pdf_text_cache_max_entries"],
+    max_bytes=config["pdf_text_cache_max_bytes"],
+    ttl=config["pdf_text_cache_ttl"],
+    disk_path=config["pdf_text_cache_path"],
+    disk_max_rows=config["pdf_text_cache_disk_max_rows"],
+)
+pdf_parse_totals = {"parses": 0, "parse_seconds": 0.0}
+parse_stats = ParseStats()
+_prompt_metadata: ContextVar[Optional[Dict[str, int]]] = ContextVar("prompt_metadata", default=None)
+# Built on first use: loading a sentence-transformers model is slow and must not delay startup.
+embedder: Optional[Any] = None
+_embedder_lock = threading.Lock()
+skill_taxonomy = load_skill_taxonomy(config["skill_taxonomy_path"])
+resume_index: Optional[ResumeIndex] = None
+task_queue: Optional[TaskQueue] = None
+
+
+def _pdf_text_cache_stats() -> Dict[str, Any]:
+    stats = pdf_text_cache.stats()
+    parses = pdf_parse_totals["parses"]
+    average = pdf_parse_totals["parse_seconds"] / parses if parses else 0.0
+    hits = stats["memory_hits"] + stats["disk_hits"]
+    stats.update(
+        parses=parses,
+        parse_seconds=round(pdf_parse_totals["parse_seconds"], 4),
+        estimated_parse_seconds_saved=round(hits * average, 4),
+    )
+    return stats
+
+
+async def _extract_resume_text(upload: SpooledUpload) -> str:
+    """Extract PDF text, reusing earlier results for byte-identical uploads."""
+
+    cached = await pdf_text_cache.aget(upload.digest)
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
+    with span("pdf_extract"):
+        resume_text = await run_in_threadpool(
+            extract_text_from_pdf,
+            upload.source,
+            max_pages=config["pdf_max_pages"],
+            max_bytes=config["pdf_max_bytes"],
+        )
+    pdf_parse_totals["parses"] += 1
+    pdf_parse_totals["parse_seconds"] += time.perf_counter() - started
+    await pdf_text_cache.aset(upload.digest, resume_text)
+    return resume_text
 
 
 @app.get("/")
@@ -136,17 +660,156 @@ async def root() -> Dict[str, str]:
     return {"message": "Welcome to AI Career Copilot API"}
 
 
+def _compact_request(payload: Any) -> Any:
+    """Return ``payload`` with its resume/job text compacted to fit the model's input budget.
+
+    The estimated token counts before and after compaction are recorded for the response headers.
+    """
+
+    with span("compaction"):
+        resume_text, job_description, report = compact_inputs(
+            getattr(payload, "resume_text", None),
+            getattr(payload, "job_description", None),
+            input_token_budget(model_registry.default_model, config["prompt_token_budget"]),
+        )
+    metadata = _prompt_metadata.get()
+    if metadata is not None:
+        for key in ("input_tokens", "compacted_tokens", "trimmed_sections"):
+            metadata[key] = metadata.get(key, 0) + report[key]
+    updates = {"resume_text": resume_text, "job_description": job_description}
+    return payload.model_copy(update={key: value for key, value in updates.items() if value is not None})
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, Any]:
+    # The cache and task stats count rows in SQLite, so they run off the event loop.
+    response_cache_stats = await run_in_threadpool(response_cache.stats)
+    pdf_text_cache_stats = await run_in_threadpool(_pdf_text_cache_stats)
+    task_stats = await run_in_threadpool(task_queue.store.stats) if task_queue is not None else {}
+    return {
+        "model_client": model_client.stats(),
+        "model_registry": model_registry.stats(),
+        "response_cache": response_cache_stats,
+        "model_flights": model_flights.stats(),
+        "model_resilience": model_resilience.stats(),
+        "model_scheduler": model_scheduler.stats(),
+        "pdf_text_cache": pdf_text_cache_stats,
+        "model_output": parse_stats.stats(),
+        "tasks": task_stats,
+        "latency": {"http": HTTP_REQUEST_SECONDS.summary(), "stages": STAGE_SECONDS.summary()},
+        "startup": {**startup_stats, "sdk_loaded": sdk_loaded()},
+    }
+
+
+def _collect_component_metrics() -> List[Sample]:
+    """Scrape-time view of counters and gauges owned by other components."""
+
+    breaker = model_resilience.breaker.stats()
+    scheduler = model_scheduler.stats()
+    return [
+        (
+            "model_output_parse_total",
+            "counter",
+            "Model outputs by route and decode outcome (clean, repaired, truncated, retried, failed).",
+            [
+                ({"route": route, "outcome": outcome}, counts[outcome])
+                for route, counts in parse_stats.stats().items()
+                for outcome in ParseStats.OUTCOMES
+            ],
+        ),
+        (
+            "model_circuit_state",
+            "gauge",
+            "Model provider circuit breaker state (0 closed, 1 half-open, 2 open).",
+            [({}, breaker["state_value"])],
+        ),
+        ("model_circuit_opened_total", "counter", "Times the circuit breaker opened.", [({}, breaker["opened_total"])]),
+        (
+            "tasks",
+            "gauge",
+            "Background tasks by status.",
+            [({"status": status}, count) for status, count in _scraped_task_stats.items()],
+        ),
+        ("model_in_flight", "gauge", "Upstream model calls in flight.", [({}, scheduler["in_flight"])]),
+        (
+            "model_queue_depth",
+            "gauge",
+            "Model calls waiting for a scheduler slot by route.",
+            [({"route": route}, entry["queue_depth"]) for route, entry in scheduler["endpoints"].items()],
+        ),
+        ("response_cache_entries", "gauge", "In-memory response cache entries.", [({}, len(response_cache.memory))]),
+        (
+            "response_cache_bytes",
+            "gauge",
+            "In-memory response cache size in bytes.",
+            [({}, response_cache.memory.size_bytes)],
+        ),
+    ]
+
+
+# Task counts as of the current scrape, filled in by ``/metrics`` before rendering.
+_scraped_task_stats: Dict[str, int] = {}
+REGISTRY.register_collector(_collect_component_metrics)
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """Prometheus text exposition of request, stage, model usage and component metrics."""
+
+    # Collectors run synchronously; the task counts come from SQLite, so they are read beforehand in
+    # the thread pool.
+    counts = await run_in_threadpool(task_queue.store.stats) if task_queue is not None else {}
+    _scraped_task_stats.clear()
+    _scraped_task_stats.update(counts)
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _keyword_summary(keywords: Dict[str, Any]) -> str:
+    matched = len(keywords["matched_keywords"])
+    total = matched + len(keywords["missing_keywords"])
+    return f"Resume covers {matched} of {total} key job description terms ({keywords['jd_match']} weighted match)."
+
+
 @app.post("/analyze", response_model=ATSResponse)
 async def analyze_resume(
     job_description: str = Form(...),
     resume: UploadFile = File(...),
+    mode: ScoringMode = Form("llm"),
 ) -> ATSResponse:
+    """Score a resume PDF against a job description.
+
+    ``mode=fast`` computes keyword coverage locally without a model call, ``hybrid`` uses the local
+    ``jd_match``/``missing_keywords`` alongside the model's profile summary, and ``llm`` (default)
+    returns the model's evaluation as-is.
+    """
+
     try:
-        contents = await resume.read()
-        pdf_file = io.BytesIO(contents)
-        resume_text = extract_text_from_pdf(pdf_file)
-        prompt = prompts.get_ats_evaluation_prompt(resume_text, job_description)
-        response_json = _invoke_model(prompt)
+        with await spool_upload(
+            resume,
+            max_bytes=config["pdf_max_bytes"],
+            memory_threshold=config["upload_spool_threshold"],
+        ) as upload:
+            resume_text = await _extract_resume_text(upload)
+        compacted = _compact_request(ResumeAndJobRequest(resume_text=resume_text, job_description=job_description))
+        resume_text, job_description = compacted.resume_text, compacted.job_description
+        keywords = None
+        if mode != "llm":
+            keywords = get_keyword_matcher().score(resume_text, job_description)
+        if mode == "fast":
+            return ATSResponse(
+                jd_match=keywords["jd_match"],
+                missing_keywords=keywords["missing_keywords"],
+                profile_summary=_keyword_summary(keywords),
+            )
+        with span("prompt_build"):
+            prompt = prompts.get_ats_evaluation_prompt(resume_text, job_description)
+        response_json = await _invoke_model(prompt, response_model=ATSResponse)
+        if keywords is not None:
+            return ATSResponse(
+                jd_match=keywords["jd_match"],
+                missing_keywords=keywords["missing_keywords"],
+                profile_summary=_coalesce(response_json, ["profile_summary", "Profile Summary"], ""),
+            )
         return ATSResponse(
             jd_match=_coalesce(response_json, ["jd_match", "JD Match"], "0%"),
             missing_keywords=_coalesce(response_json, ["missing_keywords", "MissingKeywords"], []),
@@ -154,19 +817,23 @@ async def analyze_resume(
         )
     except HTTPException:
         raise
+    except (PDFLimitError, UploadTooLargeError) as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
-@app.post("/resume/rewrite")
-async def rewrite_resume(payload: ResumeRewriteRequest) -> Dict[str, Any]:
-    prompt = prompts.get_resume_rewrite_prompt(
-        payload.resume_text,
-        payload.job_description,
-        tone=payload.tone,
-        focus_role=payload.focus_role,
-    )
-    result = _invoke_model(prompt)
+def _rewrite_prompt(payload: ResumeRewriteRequest) -> str:
+    with span("prompt_build"):
+        return prompts.get_resume_rewrite_prompt(
+            payload.resume_text,
+            payload.job_description,
+            tone=payload.tone,
+            focus_role=payload.focus_role,
+        )
+
+
+def _shape_rewrite_result(result: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "rewritten_resume": _coalesce(result, ["rewritten_resume", "RewrittenResume"], ""),
         "key_adjustments": _coalesce(result, ["key_adjustments", "KeyAdjustments"], []),
@@ -174,138 +841,628 @@ async def rewrite_resume(payload: ResumeRewriteRequest) -> Dict[str, Any]:
     }
 
 
+@app.post("/resume/rewrite")
+async def rewrite_resume(payload: ResumeRewriteRequest) -> Dict[str, Any]:
+    payload = _compact_request(payload)
+    result = await _invoke_model(_rewrite_prompt(payload))
+    return _shape_rewrite_result(result)
+
+
+@app.post("/resume/rewrite/stream")
+async def rewrite_resume_stream(payload: ResumeRewriteRequest) -> StreamingResponse:
+    payload = _compact_request(payload)
+    return _stream_model(_rewrite_prompt(payload), field="rewritten_resume", shape=_shape_rewrite_result)
+
+
 @app.post("/resume/skill-gap")
 async def skill_gap_analysis(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_skill_gap_prompt(payload.resume_text, payload.job_description)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    known_skills = skill_taxonomy.compare(payload.resume_text, payload.job_description)
+    with span("prompt_build"):
+        prompt = prompts.get_skill_gap_prompt(payload.resume_text, payload.job_description, known_skills=known_skills)
+    return await _invoke_model(prompt)
 
 
 @app.post("/resume/achievements")
 async def quantify_achievements(payload: ResumeOnlyRequest) -> Dict[str, Any]:
-    prompt = prompts.get_achievement_quantifier_prompt(payload.resume_text)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_achievement_quantifier_prompt(payload.resume_text)
+    return await _invoke_model(prompt)
 
 
 @app.post("/resume/role-fit")
 async def role_fit(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_role_fit_prompt(payload.resume_text, payload.job_description)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_role_fit_prompt(payload.resume_text, payload.job_description)
+    return await _invoke_model(prompt)
+
+
+def _cover_letter_prompt(payload: CoverLetterRequest) -> str:
+    with span("prompt_build"):
+        return prompts.get_cover_letter_prompt(
+            payload.resume_text,
+            payload.job_description,
+            applicant_context=payload.applicant_context,
+        )
 
 
 @app.post("/resume/cover-letter")
 async def cover_letter(payload: CoverLetterRequest) -> Dict[str, Any]:
-    prompt = prompts.get_cover_letter_prompt(
-        payload.resume_text,
-        payload.job_description,
-        applicant_context=payload.applicant_context,
-    )
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    return await _invoke_model(_cover_letter_prompt(payload))
+
+
+@app.post("/resume/cover-letter/stream")
+async def cover_letter_stream(payload: CoverLetterRequest) -> StreamingResponse:
+    payload = _compact_request(payload)
+    return _stream_model(_cover_letter_prompt(payload), field="cover_letter")
 
 
 @app.post("/career/coach")
 async def career_coach(payload: CareerCoachRequest) -> Dict[str, Any]:
-    prompt = prompts.get_career_coach_prompt(payload.message_history)
-    return _invoke_model(prompt)
+    with span("prompt_build"):
+        prompt = prompts.get_career_coach_prompt([message.model_dump() for message in payload.message_history])
+    return await _invoke_model(prompt, use_cache=False)
 
 
 @app.post("/career/path")
 async def career_path(payload: ResumeOnlyRequest) -> Dict[str, Any]:
-    prompt = prompts.get_career_path_prompt(payload.resume_text)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_career_path_prompt(payload.resume_text)
+    return await _invoke_model(prompt)
 
 
 @app.post("/career/job-market")
 async def job_market(payload: JobMarketRequest) -> Dict[str, Any]:
-    prompt = prompts.get_job_market_prompt(payload.target_role, payload.location)
-    return _invoke_model(prompt)
+    with span("prompt_build"):
+        prompt = prompts.get_job_market_prompt(payload.target_role, payload.location)
+    return await _invoke_model(prompt)
 
 
 @app.post("/jobs/parse")
 async def job_description_parser(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_job_parser_prompt(payload.job_description)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_job_parser_prompt(payload.job_description)
+    return await _invoke_model(prompt)
 
 
 @app.post("/jobs/ats-check")
-async def ats_check(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_ats_check_prompt(payload.resume_text, payload.job_description)
-    return _invoke_model(prompt)
+async def ats_check(payload: ResumeAndJobRequest, mode: ScoringMode = "llm") -> Dict[str, Any]:
+    """Simulate ATS screening; ``mode`` selects local keyword scoring, the model, or both."""
+
+    payload = _compact_request(payload)
+    if mode == "llm":
+        with span("prompt_build"):
+            prompt = prompts.get_ats_check_prompt(payload.resume_text, payload.job_description)
+        return await _invoke_model(prompt)
+
+    keywords = get_keyword_matcher().score(payload.resume_text, payload.job_description)
+    if mode == "fast":
+        return {
+            "scores": {"keyword_match": keywords["jd_match"]},
+            "formatting_issues": [],
+            "recommendations": [f"Add evidence of {keyword}" for keyword in keywords["missing_keywords"][:5]],
+            "matched_keywords": keywords["matched_keywords"],
+            "missing_keywords": keywords["missing_keywords"],
+        }
+    with span("prompt_build"):
+        prompt = prompts.get_ats_check_prompt(payload.resume_text, payload.job_description)
+    result = await _invoke_model(prompt)
+    if isinstance(result, dict):
+        scores = result.get("scores")
+        result["scores"] = {**scores, "keyword_match": keywords["jd_match"]} if isinstance(scores, dict) else {
+            "keyword_match": keywords["jd_match"]
+        }
+        result["matched_keywords"] = keywords["matched_keywords"]
+        result["missing_keywords"] = keywords["missing_keywords"]
+    return result
 
 
 @app.post("/jobs/one-click-optimize")
 async def one_click_optimize(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_one_click_optimization_prompt(payload.resume_text, payload.job_description)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_one_click_optimization_prompt(payload.resume_text, payload.job_description)
+    return await _invoke_model(prompt)
 
 
 @app.post("/jobs/alerts")
 async def job_alerts(payload: JobAlertsRequest) -> Dict[str, Any]:
-    prompt = prompts.get_job_alerts_prompt(payload.resume_text, payload.target_role, payload.location)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_job_alerts_prompt(payload.resume_text, payload.target_role, payload.location)
+    return await _invoke_model(prompt)
 
 
 @app.post("/visualizations/summary")
 async def visualization_summary(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_visualization_prompt(payload.resume_text, payload.job_description)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    known_skills = skill_taxonomy.compare(payload.resume_text, payload.job_description)
+    with span("prompt_build"):
+        prompt = prompts.get_visualization_prompt(
+            payload.resume_text, payload.job_description, known_skills=known_skills
+        )
+    return await _invoke_model(prompt)
+
+
+async def _iter_scored_chunks(
+    payload: RecruiterBulkRequest,
+) -> AsyncIterator[Tuple[int, int, Any, Optional[str]]]:
+    """Score each chunk of resumes as its own model call.
+
+    Yields ``(start, size, result, error)`` per chunk as soon as its call settles, so a failing chunk
+    is reported for the candidates it contained instead of failing the whole batch.
+    """
+
+    semaphore = asyncio.Semaphore(payload.max_concurrency or config["bulk_score_concurrency"])
+
+    async def score_chunk(start: int, chunk: List[str]) -> Tuple[int, int, Any, Optional[str]]:
+        with span("prompt_build"):
+            prompt = prompts.get_recruiter_api_prompt(chunk, payload.job_description, start_index=start)
+        async with semaphore:
+            try:
+                return start, len(chunk), await _invoke_model(prompt), None
+            except HTTPException as exc:
+                return start, len(chunk), None, str(exc.detail)
+            except Exception as exc:
+                return start, len(chunk), None, str(exc)
+
+    tasks = [
+        asyncio.ensure_future(score_chunk(start, chunk))
+        for start, chunk in chunk_resumes(payload.resumes, payload.chunk_size)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _score_in_parallel(
+    payload: RecruiterBulkRequest,
+    progress: Optional[Callable[[float, str], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    aggregator = BulkScoreAggregator(total=len(payload.resumes))
+    scored = 0
+    async for start, size, result, error in _iter_scored_chunks(payload):
+        if error is None:
+            aggregator.add_chunk(start, size, result)
+        else:
+            aggregator.add_error(start, size, error)
+        scored += size
+        if progress is not None:
+            await progress(scored / len(payload.resumes), f"Scored {scored} of {len(payload.resumes)} resumes")
+    return aggregator.result()
 
 
 @app.post("/recruiter/bulk-score")
 async def recruiter_bulk_score(payload: RecruiterBulkRequest) -> Dict[str, Any]:
-    prompt = prompts.get_recruiter_api_prompt(payload.resumes, payload.job_description)
-    return _invoke_model(prompt)
+    if payload.mode == "parallel":
+        return await _score_in_parallel(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_recruiter_api_prompt(payload.resumes, payload.job_description)
+    return await _invoke_model(prompt)
+
+
+@app.post("/recruiter/bulk-score/stream")
+async def recruiter_bulk_score_stream(
+    payload: RecruiterBulkRequest,
+    format: Literal["ndjson", "sse"] = "ndjson",
+) -> StreamingResponse:
+    """Stream each candidate's score as it completes, then a final aggregate ``summary`` event."""
+
+    encode, media_type = STREAM_FORMATS[format]
+
+    async def events() -> AsyncIterator[str]:
+        aggregator = BulkScoreAggregator(total=len(payload.resumes), keep_details=False)
+        async for start, size, result, error in _iter_scored_chunks(payload):
+            if error is None:
+                rankings, errors = aggregator.add_chunk(start, size, result)
+            else:
+                rankings, errors = [], aggregator.add_error(start, size, error)
+            for ranking in rankings:
+                yield encode("candidate", ranking)
+            for candidate_error in errors:
+                yield encode("error", candidate_error)
+        yield encode("summary", aggregator.result())
+
+    return StreamingResponse(events(), media_type=media_type)
+
+
+def _get_embedder() -> Any:
+    """The configured embedder; may load a model, so call it from the thread pool."""
+
+    global embedder
+    if embedder is None:
+        with _embedder_lock:
+            if embedder is None:
+                embedder = get_embedder(config["embedding_model"], fallback=config["embedding_fallback"])
+    return embedder
+
+
+def _get_resume_index() -> ResumeIndex:
+    global resume_index
+    if resume_index is None:
+        resume_index = ResumeIndex(config["resume_index_path"], dim=_get_embedder().dim)
+    return resume_index
+
+
+def _index_resumes(resumes: List[IndexedResume]) -> Dict[str, Any]:
+    index = _get_resume_index()
+    vectors = _get_embedder().embed([resume.resume_text for resume in resumes])
+    index.add([(resume.resume_id, resume.resume_text) for resume in resumes], vectors)
+    return {"indexed": len(resumes), "index": index.stats()}
+
+
+@app.post("/recruiter/index")
+async def recruiter_index_add(payload: ResumeIndexRequest) -> Dict[str, Any]:
+    """Add or replace resumes in the persistent recruiter search index."""
+
+    return await run_in_threadpool(_index_resumes, payload.resumes)
+
+
+def _delete_from_index(resume_id: str) -> Optional[Dict[str, Any]]:
+    """Delete ``resume_id`` and return the index stats afterwards, or ``None`` if it was not indexed."""
+
+    index = _get_resume_index()
+    return index.stats() if index.delete(resume_id) else None
+
+
+@app.delete("/recruiter/index/{resume_id}")
+async def recruiter_index_delete(resume_id: str) -> Dict[str, Any]:
+    stats = await run_in_threadpool(_delete_from_index, resume_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Resume not found in index")
+    return {"deleted": resume_id, "index": stats}
+
+
+def _search_index(job_description: str, top_k: int) -> List[Tuple[str, float]]:
+    index = _get_resume_index()
+    query = _get_embedder().embed([job_description])[0]
+    return index.search(query, top_k)
+
+
+@app.post("/recruiter/search")
+async def recruiter_search(payload: RecruiterSearchRequest) -> Dict[str, Any]:
+    """Return the top-K indexed resumes for a job description.
+
+    With ``score=true`` only that shortlist is sent through the parallel LLM scoring path, and the
+    rankings are reported against the indexed resume ids.
+    """
+
+    started = time.perf_counter()
+    matches = await run_in_threadpool(_search_index, payload.job_description, payload.top_k)
+    response: Dict[str, Any] = {
+        "candidates": [{"resume_id": resume_id, "similarity": round(score, 4)} for resume_id, score in matches],
+        "search_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    if not payload.score or not matches:
+        return response
+
+    shortlist = [resume_id for resume_id, _ in matches]
+    texts = await run_in_threadpool(_get_resume_index().get_texts, shortlist)
+    scoring = await _score_in_parallel(
+        RecruiterBulkRequest(
+            resumes=[texts[resume_id] for resume_id in shortlist],
+            job_description=payload.job_description,
+            mode="parallel",
+            chunk_size=payload.chunk_size,
+            max_concurrency=payload.max_concurrency,
+        )
+    )
+    labels = {candidate_label(position): resume_id for position, resume_id in enumerate(shortlist)}
+    for entry in scoring["candidate_rankings"] + scoring["errors"]:
+        entry["candidate_id"] = labels.get(entry["candidate_id"], entry["candidate_id"])
+    response["scoring"] = scoring
+    return response
 
 
 @app.post("/analytics/orchestration")
 async def orchestration_plan(payload: OrchestrationRequest) -> Dict[str, Any]:
-    prompt = prompts.get_orchestration_prompt(payload.objective, payload.context)
-    return _invoke_model(prompt)
+    with span("prompt_build"):
+        prompt = prompts.get_orchestration_prompt(payload.objective, payload.context)
+    return await _invoke_model(prompt)
 
 
 @app.post("/analytics/embeddings")
-async def embeddings_analysis(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_embeddings_prompt(payload.resume_text, payload.job_description)
-    return _invoke_model(prompt)
+async def embeddings_analysis(payload: ResumeAndJobRequest, explain: bool = False) -> Dict[str, Any]:
+    """Score semantic similarity locally; ``explain=true`` adds an LLM narrative of the result."""
+
+    payload = _compact_request(payload)
+    report = await run_in_threadpool(
+        lambda: semantic_similarity(payload.resume_text, payload.job_description, _get_embedder())
+    )
+    if explain:
+        with span("prompt_build"):
+            prompt = prompts.get_embeddings_prompt(
+                payload.resume_text, payload.job_description, similarity_report=report
+            )
+        narrative = await _invoke_model(prompt)
+        report["explanation"] = _coalesce(narrative, ["explanation"], "")
+        report["recommendations"] = _coalesce(narrative, ["recommendations"], [])
+    return report
 
 
 @app.post("/analytics/knowledge-graph")
 async def knowledge_graph(payload: ResumeOnlyRequest) -> Dict[str, Any]:
-    prompt = prompts.get_knowledge_graph_prompt(payload.resume_text)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_knowledge_graph_prompt(
+            payload.resume_text, resume_skills=skill_taxonomy.extract(payload.resume_text)
+        )
+    return await _invoke_model(prompt)
 
 
 @app.post("/analytics/ocr-diagnostics")
 async def ocr_diagnostics(payload: OCRDiagnosticsRequest) -> Dict[str, Any]:
-    prompt = prompts.get_ocr_prompt(payload.ocr_text)
-    return _invoke_model(prompt)
+    with span("prompt_build"):
+        prompt = prompts.get_ocr_prompt(payload.ocr_text)
+    return await _invoke_model(prompt)
 
 
 @app.post("/portfolio/generate")
 async def portfolio_generate(payload: ResumeOnlyRequest) -> Dict[str, Any]:
-    prompt = prompts.get_portfolio_prompt(payload.resume_text)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_portfolio_prompt(payload.resume_text)
+    return await _invoke_model(prompt)
+
+
+@app.post("/portfolio/generate/stream")
+async def portfolio_generate_stream(payload: ResumeOnlyRequest) -> StreamingResponse:
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_portfolio_prompt(payload.resume_text)
+    return _stream_model(prompt)
 
 
 @app.post("/interview/readiness")
 async def interview_readiness(payload: ResumeAndJobRequest) -> Dict[str, Any]:
-    prompt = prompts.get_interview_readiness_prompt(payload.job_description, payload.resume_text)
-    return _invoke_model(prompt)
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_interview_readiness_prompt(payload.job_description, payload.resume_text)
+    return await _invoke_model(prompt)
 
 
 @app.post("/salary/benchmark")
 async def salary_benchmark(payload: SalaryBenchmarkRequest) -> Dict[str, Any]:
-    prompt = prompts.get_salary_benchmark_prompt(
-        payload.role, payload.location, payload.experience_years
-    )
-    return _invoke_model(prompt)
+    with span("prompt_build"):
+        prompt = prompts.get_salary_benchmark_prompt(
+            payload.role, payload.location, payload.experience_years
+        )
+    return await _invoke_model(prompt)
 
 
 @app.post("/career/progress-tracker")
 async def career_progress_tracker(payload: CareerProgressRequest) -> Dict[str, Any]:
-    prompt = prompts.get_career_progress_tracker_prompt(
-        payload.resume_text,
-        payload.certifications,
-        payload.skills_acquired,
-        payload.job_applications,
+    payload = _compact_request(payload)
+    with span("prompt_build"):
+        prompt = prompts.get_career_progress_tracker_prompt(
+            payload.resume_text,
+            payload.certifications,
+            payload.skills_acquired,
+            payload.job_applications,
+        )
+    return await _invoke_model(prompt)
+
+
+# Feature name (the prompt builder's name in ``src.utils.prompts``) -> prompt for a resume/job pair.
+# Builders receive the taxonomy comparison computed once per batch and produce the same prompts as
+# the single-feature endpoints, so batch and single calls share cached responses.
+BATCH_FEATURES: Dict[str, Callable[[ResumeAndJobRequest, Dict[str, List[str]]], str]] = {
+    "ats_evaluation": lambda p, skills: prompts.get_ats_evaluation_prompt(p.resume_text, p.job_description),
+    "skill_gap": lambda p, skills: prompts.get_skill_gap_prompt(p.resume_text, p.job_description, known_skills=skills),
+    "achievement_quantifier": lambda p, skills: prompts.get_achievement_quantifier_prompt(p.resume_text),
+    "role_fit": lambda p, skills: prompts.get_role_fit_prompt(p.resume_text, p.job_description),
+    "career_path": lambda p, skills: prompts.get_career_path_prompt(p.resume_text),
+    "job_parser": lambda p, skills: prompts.get_job_parser_prompt(p.job_description),
+    "ats_check": lambda p, skills: prompts.get_ats_check_prompt(p.resume_text, p.job_description),
+    "one_click_optimization": lambda p, skills: prompts.get_one_click_optimization_prompt(
+        p.resume_text, p.job_description
+    ),
+    "visualization": lambda p, skills: prompts.get_visualization_prompt(
+        p.resume_text, p.job_description, known_skills=skills
+    ),
+    "knowledge_graph": lambda p, skills: prompts.get_knowledge_graph_prompt(
+        p.resume_text, resume_skills=skills["resume_skills"]
+    ),
+    "portfolio": lambda p, skills: prompts.get_portfolio_prompt(p.resume_text),
+    "interview_readiness": lambda p, skills: prompts.get_interview_readiness_prompt(p.job_description, p.resume_text),
+    "chrome_extension": lambda p, skills: prompts.get_chrome_extension_prompt(
+        p.job_description, p.resume_text, known_skills=skills
+    ),
+}
+
+
+async def _run_batch_feature(prompt: str) -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
+    try:
+        return await _invoke_model(prompt), None
+    except HTTPException as exc:
+        return None, {"status_code": exc.status_code, "detail": exc.detail}
+    except Exception as exc:
+        return None, {"status_code": 500, "detail": str(exc)}
+
+
+@app.post("/batch")
+async def batch_analysis(payload: BatchAnalysisRequest) -> Dict[str, Any]:
+    """Run several resume/job analyses concurrently in one request.
+
+    Returns ``results`` and ``errors`` keyed by feature name; a failing feature does not fail the
+    batch. Duplicate feature names are run once.
+    """
+
+    payload = _compact_request(payload)
+    features = list(dict.fromkeys(payload.features))
+    unknown = [feature for feature in features if feature not in BATCH_FEATURES]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail={"unknown_features": unknown, "available_features": sorted(BATCH_FEATURES)},
+        )
+
+    known_skills = skill_taxonomy.compare(payload.resume_text, payload.job_description)
+    with span("prompt_build"):
+        feature_prompts = [BATCH_FEATURES[feature](payload, known_skills) for feature in features]
+    outcomes = await asyncio.gather(*(_run_batch_feature(prompt) for prompt in feature_prompts))
+    results: Dict[str, Any] = {}
+    errors: Dict[str, Any] = {}
+    for feature, (result, error) in zip(features, outcomes):
+        if error is None:
+            results[feature] = result
+        else:
+            errors[feature] = error
+    return {"results": results, "errors": errors}
+
+
+def _task_handler(route: str, run: Callable[[Dict[str, Any], TaskContext], Any]) -> Any:
+    """Adapt an endpoint to a background task handler attributed to ``route`` in metrics and scheduling."""
+
+    async def handler(payload: Dict[str, Any], context: TaskContext) -> Any:
+        token = current_route.set(route)
+        try:
+            await context.progress(0.0, "Started")
+            return await run(payload, context)
+        finally:
+            current_route.reset(token)
+
+    return handler
+
+
+async def _bulk_score_task(payload: Dict[str, Any], context: TaskContext) -> Dict[str, Any]:
+    request = RecruiterBulkRequest(**payload)
+    if request.mode == "parallel":
+        return await _score_in_parallel(request, progress=context.progress)
+    return await recruiter_bulk_score(request)
+
+
+# Task kind -> handler; each kind is also its submission path under ``/tasks``.
+TASK_HANDLERS: Dict[str, Any] = {
+    "recruiter/bulk-score": _task_handler("/tasks/recruiter/bulk-score", _bulk_score_task),
+    "resume/rewrite": _task_handler(
+        "/tasks/resume/rewrite", lambda payload, context: rewrite_resume(ResumeRewriteRequest(**payload))
+    ),
+    "portfolio/generate": _task_handler(
+        "/tasks/portfolio/generate", lambda payload, context: portfolio_generate(ResumeOnlyRequest(**payload))
+    ),
+}
+
+
+def _get_task_queue() -> TaskQueue:
+    global task_queue
+    if task_queue is None:
+        store = TaskStore(
+            config["task_db_path"],
+            result_ttl=config["task_result_ttl"],
+            lease_seconds=config["task_lease_seconds"],
+            max_attempts=config["task_max_attempts"],
+        )
+        task_queue = TaskQueue(
+            store,
+            TASK_HANDLERS,
+            workers=config["task_workers"],
+            poll_interval=config["task_poll_interval"],
+            webhook_allowed_hosts=config["webhook_allowed_hosts"],
+        )
+    return task_queue
+
+
+async def _submit_task(
+    kind: str, payload: BaseModel, webhook_url: Optional[str], idempotency_key: Optional[str] = None
+) -> Response:
+    """Queue a task; a repeated ``Idempotency-Key`` returns the task the first submission created."""
+
+    if webhook_url is not None:
+        # Resolves the host, so it runs in the thread pool; delivery checks again against rebinding.
+        try:
+            await run_in_threadpool(check_webhook_url, webhook_url, config["webhook_allowed_hosts"])
+        except WebhookRejected as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+    try:
+        record = await _get_task_queue().submit(kind, payload.model_dump(), webhook_url, idempotency_key)
+    except IdempotencyConflict as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    location = f"/tasks/{record['id']}"
+    return Response(
+        content=json.dumps({**public_view(record), "status_url": location, "result_url": f"{location}/result"}),
+        status_code=202,
+        media_type="application/json",
+        headers={"Location": location},
     )
-    return _invoke_model(prompt)
+
+
+@app.post("/tasks/recruiter/bulk-score", status_code=202)
+async def submit_bulk_score_task(
+    payload: RecruiterBulkRequest,
+    webhook_url: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> Response:
+    """Queue ``/recruiter/bulk-score`` as a background task and return its id immediately."""
+
+    return await _submit_task("recruiter/bulk-score", payload, webhook_url, idempotency_key)
+
+
+@app.post("/tasks/resume/rewrite", status_code=202)
+async def submit_rewrite_task(
+    payload: ResumeRewriteRequest,
+    webhook_url: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> Response:
+    """Queue ``/resume/rewrite`` as a background task and return its id immediately."""
+
+    return await _submit_task("resume/rewrite", payload, webhook_url, idempotency_key)
+
+
+@app.post("/tasks/portfolio/generate", status_code=202)
+async def submit_portfolio_task(
+    payload: ResumeOnlyRequest,
+    webhook_url: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> Response:
+    """Queue ``/portfolio/generate`` as a background task and return its id immediately."""
+
+    return await _submit_task("portfolio/generate", payload, webhook_url, idempotency_key)
+
+
+async def _find_task(task_id: str) -> Dict[str, Any]:
+    record = await run_in_threadpool(_get_task_queue().store.get, task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Task not found or expired")
+    return record
+
+
+@app.get("/tasks/{task_id}")
+async def task_status(task_id: str) -> Dict[str, Any]:
+    return public_view(await _find_task(task_id))
+
+
+@app.get("/tasks/{task_id}/result")
+async def task_result(task_id: str) -> Any:
+    """The task's result once it succeeded; 202 while pending, 409 if it failed or was cancelled."""
+
+    record = await _find_task(task_id)
+    if record["status"] == SUCCEEDED:
+        return json.loads(record["result"])
+    if record["status"] in (QUEUED, RUNNING):
+        return Response(
+            content=json.dumps(public_view(record)),
+            status_code=202,
+            media_type="application/json",
+            headers={"Retry-After": "2"},
+        )
+    raise HTTPException(status_code=409, detail=public_view(record))
+
+
+@app.delete("/tasks/{task_id}")
+async def cancel_task(task_id: str) -> Dict[str, Any]:
+    """Cancel a queued or running task; finished tasks are returned unchanged."""
+
+    await _find_task(task_id)
+    record = await _get_task_queue().cancel(task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Task not found or expired")
+    return public_view(record)
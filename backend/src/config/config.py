@@ -1,9 +1,88 @@
 import os
 from dotenv import load_dotenv
 
+
+def _get_int(name, default):
+    """Read an integer environment variable, falling back to ``default`` when unset or invalid."""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _get_float(name, default):
+    """Read a float environment variable, falling back to ``default`` when unset or invalid."""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _get_float_map(name):
+    """Parse ``key=value,key=value`` into a dict of floats, skipping malformed entries."""
+    parsed = {}
+    for entry in (os.getenv(name) or "").split(","):
+        key, separator, value = entry.partition("=")
+        try:
+            if separator:
+                parsed[key.strip()] = float(value)
+        except ValueError:
+            continue
+    return parsed
+
+
 def load_config():
     """Load environment variables from .env file"""
     load_dotenv()
     return {
-        "api_key": os.getenv("GOOGLE_API_KEY")
+        "api_key": os.getenv("GOOGLE_API_KEY"),
+        "model_name": os.getenv("GEMINI_MODEL", "gemini-pro"),
+        "model_max_concurrency": _get_int("MODEL_MAX_CONCURRENCY", 32),
+        "bulk_score_concurrency": _get_int("BULK_SCORE_CONCURRENCY", 8),
+        "pdf_max_pages": _get_int("PDF_MAX_PAGES", 120),
+        "pdf_max_bytes": _get_int("PDF_MAX_BYTES", 15 * 1024 * 1024),
+        "pdf_pool_workers": _get_int("PDF_POOL_WORKERS", 0),
+        "upload_spool_threshold": _get_int("UPLOAD_SPOOL_THRESHOLD", 1024 * 1024),
+        "pdf_text_cache_ttl": _get_int("PDF_TEXT_CACHE_TTL", 86400),
+        "pdf_text_cache_max_entries": _get_int("PDF_TEXT_CACHE_MAX_ENTRIES", 256),
+        "pdf_text_cache_max_bytes": _get_int("PDF_TEXT_CACHE_MAX_BYTES", 16 * 1024 * 1024),
+        "pdf_text_cache_path": os.getenv("PDF_TEXT_CACHE_PATH") or None,
+        "pdf_text_cache_disk_max_rows": _get_int("PDF_TEXT_CACHE_DISK_MAX_ROWS", 10000),
+        "embedding_model": os.getenv("EMBEDDING_MODEL", "hashing"),
+        "embedding_fallback": os.getenv("EMBEDDING_FALLBACK", "false").lower() in ("1", "true", "yes"),
+        "resume_index_path": os.getenv("RESUME_INDEX_PATH", ".resume_index"),
+        "model_deadline_seconds": _get_float("MODEL_DEADLINE_SECONDS", 60.0),
+        "model_endpoint_deadlines": _get_float_map("MODEL_ENDPOINT_DEADLINES"),
+        "model_max_attempts": _get_int("MODEL_MAX_ATTEMPTS", 3),
+        "model_retry_base_delay": _get_float("MODEL_RETRY_BASE_DELAY", 0.25),
+        "model_hedging": os.getenv("MODEL_HEDGING", "false").lower() in ("1", "true", "yes"),
+        "circuit_failure_threshold": _get_int("CIRCUIT_FAILURE_THRESHOLD", 5),
+        "circuit_recovery_seconds": _get_float("CIRCUIT_RECOVERY_SECONDS", 30.0),
+        "model_requests_per_minute": _get_float("MODEL_RPM", 0),
+        "model_tokens_per_minute": _get_float("MODEL_TPM", 0),
+        "rate_limit_state_path": os.getenv("RATE_LIMIT_STATE_PATH") or None,
+        "model_input_cost_per_1k": _get_float("MODEL_INPUT_COST_PER_1K", 0.0),
+        "model_output_cost_per_1k": _get_float("MODEL_OUTPUT_COST_PER_1K", 0.0),
+        "model_parse_retries": _get_int("MODEL_PARSE_RETRIES", 1),
+        "prompt_prefix_cache": os.getenv("PROMPT_PREFIX_CACHE", "auto"),
+        "context_cache_ttl": _get_int("CONTEXT_CACHE_TTL", 3600),
+        "prompt_token_budget": _get_int("PROMPT_TOKEN_BUDGET", 0),
+        "skill_taxonomy_path": os.getenv("SKILL_TAXONOMY_PATH") or None,
+        "task_db_path": os.getenv("TASK_DB_PATH", ".tasks.sqlite"),
+        "task_workers": _get_int("TASK_WORKERS", 2),
+        "task_result_ttl": _get_int("TASK_RESULT_TTL", 86400),
+        "task_lease_seconds": _get_float("TASK_LEASE_SECONDS", 30.0),
+        "task_max_attempts": _get_int("TASK_MAX_ATTEMPTS", 3),
+        "task_poll_interval": _get_float("TASK_POLL_INTERVAL", 1.0),
+        "webhook_allowed_hosts": [
+            host.strip() for host in os.getenv("WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+        ],
+        "response_cache_ttl": _get_int("RESPONSE_CACHE_TTL", 3600),
+        "response_cache_max_entries": _get_int("RESPONSE_CACHE_MAX_ENTRIES", 1024),
+        "response_cache_max_bytes": _get_int("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+        "response_cache_path": os.getenv("RESPONSE_CACHE_PATH") or None,
+        "response_cache_disk_max_rows": _get_int("RESPONSE_CACHE_DISK_MAX_ROWS", 100000),
+        "web_concurrency": _get_int("WEB_CONCURRENCY", 0),
+        "startup_warmup": os.getenv("STARTUP_WARMUP", "background").lower(),
+        "shared_state_dir": os.getenv("SHARED_STATE_DIR", ".state"),
     }
@@ -0,0 +1,102 @@
+"""Async client layer that keeps blocking model SDK calls off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncModelClient:
+    """Run blocking model calls on a bounded thread pool.
+
+    The Gemini SDK only exposes a synchronous ``generate_content`` in the versions we pin, so every
+    call is offloaded to a dedicated executor. The pool size caps how many upstream calls a single
+    worker keeps in flight; callers beyond that limit wait on the executor queue instead of blocking
+    the event loop.
+    """
+
+    def __init__(self, max_concurrency: int = 32) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._completed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="model-client",
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Execute ``fn(*args, **kwargs)`` on the model thread pool and await its result."""
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        self._in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), call)
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+
+    async def stream(self, fn: Callable[..., Iterator[T]], *args: Any, **kwargs: Any) -> AsyncIterator[T]:
+        """Drain the blocking iterator returned by ``fn`` on the pool, yielding items as they arrive.
+
+        If the consumer stops early the producer thread is told to stop at the next item boundary.
+        """
+
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue[tuple[str, Any]]" = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce() -> None:
+            try:
+                for item in fn(*args, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, ("item", item))
+            except Exception as exc:  # Re-raised on the event loop side.
+                loop.call_soon_threadsafe(queue.put_nowait, ("error", exc))
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, ("done", None))
+
+        self._in_flight += 1
+        loop.run_in_executor(self._get_executor(), produce)
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    break
+        finally:
+            stop.set()
+            self._in_flight -= 1
+            self._completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return current pool utilisation counters."""
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Tear down the executor; a new one is created lazily on next use."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
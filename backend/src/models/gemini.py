@@ -1,22 +1,369 @@
-import google.generativeai as genai
+import datetime
+import inspect
+import json
+import threading
+import time
 
-def configure_gemini(api_key):
+from src.utils.compaction import estimate_tokens
+
+DEFAULT_MODEL = "gemini-pro"
+
+# First-generation models reject system instructions and context caching.
+LEGACY_MODEL_PREFIXES = ("gemini-pro", "gemini-1.0")
+
+# Smallest prefix (in tokens) each model family accepts for explicit context caching.
+CONTEXT_CACHE_MIN_TOKENS = {
+    "gemini-1.5": 32768,
+    "gemini-2.0": 4096,
+    "gemini-2.5-pro": 4096,
+    "gemini-2.5-flash": 1024,
+}
+
+PREFIX_CACHE_MODES = ("auto", "system", "off")
+
+# ``google.generativeai`` pulls in gRPC and the protobuf stubs and dominates the app's import time,
+# so it is imported on first use (see ``_genai``) rather than at module level.
+_sdk = None
+_sdk_lock = threading.Lock()
+_sdk_features = {}
+_deferred_api_key = None
+
+
+def _genai():
+    """Import ``google.generativeai`` on first use and apply any deferred configuration
+
+    Returns:
+        module: The ``google.generativeai`` module
+    """
+    global _sdk
+    if _sdk is None:
+        with _sdk_lock:
+            if _sdk is None:
+                import google.generativeai as genai
+
+                # google-generativeai added system instructions in 0.5 and context caching in 0.7;
+                # older SDKs (the last ones installable on Python 3.8) get the prefix inline.
+                _sdk_features.update(
+                    system_instruction="system_instruction" in inspect.signature(genai.GenerativeModel).parameters,
+                    context_cache=hasattr(genai, "caching"),
+                    generation_config_fields=frozenset(getattr(genai.GenerationConfig, "__dataclass_fields__", {})),
+                )
+                if _deferred_api_key is not None:
+                    genai.configure(api_key=_deferred_api_key)
+                _sdk = genai
+    return _sdk
+
+
+def _sdk_feature(name):
+    _genai()
+    return _sdk_features[name]
+
+
+def sdk_loaded():
+    """Whether the Gemini SDK has been imported in this process"""
+    return _sdk is not None
+
+
+def __getattr__(name):
+    # Keeps ``gemini.genai`` and the SDK capability flags available (tests patch through
+    # ``src.models.gemini.genai``) while deferring the import until they are first read.
+    if name == "genai":
+        return _genai()
+    if name == "SDK_SUPPORTS_SYSTEM_INSTRUCTION":
+        return _sdk_feature("system_instruction")
+    if name == "SDK_SUPPORTS_CONTEXT_CACHE":
+        return _sdk_feature("context_cache")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ModelRegistry:
+    """Cache of ``GenerativeModel`` instances shared across requests
+
+    Models are keyed by model name, generation config and system instruction. Each instance keeps
+    its own SDK client, so reusing the instance also reuses the underlying gRPC channel instead of
+    paying for object setup and a fresh transport on every request.
+
+    The registry also decides how a prompt's static prefix reaches the provider (see
+    :meth:`resolve`): as an explicit cached context when the model supports caching and the
+    prefix is large enough, as a system instruction, or inline in front of the input.
+    """
+
+    def __init__(self, default_model=DEFAULT_MODEL, prefix_cache="auto", context_cache_ttl=3600):
+        self.default_model = default_model
+        self.prefix_cache = prefix_cache
+        self.context_cache_ttl = context_cache_ttl
+        self.context_cache_min_tokens = dict(CONTEXT_CACHE_MIN_TOKENS)
+        self._models = {}
+        self._cached_models = {}
+        self._cache_creating = set()
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._reuses = 0
+        self._cache_creations = 0
+        self._prefix_strategies = {"inline": 0, "system_instruction": 0, "cached_content": 0}
+
+    @staticmethod
+    def _key(model_name, generation_config, system_instruction=None):
+        config_key = json.dumps(generation_config, sort_keys=True, default=str) if generation_config else ""
+        return model_name, config_key, system_instruction or ""
+
+    def _get_or_build(self, model_name, generation_config, system_instruction=None):
+        key = self._key(model_name, generation_config, system_instruction)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model, False
+            genai = _genai()
+            if system_instruction:
+                model = genai.GenerativeModel(
+                    model_name, generation_config=generation_config, system_instruction=system_instruction
+                )
+            else:
+                model = genai.GenerativeModel(model_name, generation_config=generation_config)
+            self._models[key] = model
+            self._builds += 1
+            return model, True
+
+    def get(self, model_name=None, generation_config=None, system_instruction=None):
+        """Return a shared model instance, building it on first use
+
+        Args:
+            model_name: The Gemini model id; defaults to ``default_model``
+            generation_config: Optional generation config dict
+            system_instruction: Optional system instruction baked into the instance
+
+        Returns:
+            genai.GenerativeModel: The pooled model instance
+        """
+        model, built = self._get_or_build(model_name or self.default_model, generation_config, system_instruction)
+        if not built:
+            with self._lock:
+                self._reuses += 1
+        return model
+
+    def _context_cache_min_tokens(self, model_name):
+        for prefix, min_tokens in self.context_cache_min_tokens.items():
+            if model_name.startswith(prefix):
+                return min_tokens
+        return None
+
+    def _get_cached(self, model_name, generation_config, system_instruction):
+        """Model bound to a provider-side cached context holding ``system_instruction``
+
+        Returns ``None`` when the cache cannot be created, or while another thread is creating it,
+        so callers fall back to a system instruction. Caches are recreated shortly before their TTL
+        runs out. The create call is a network round trip and runs outside the registry lock.
+        """
+        key = self._key(model_name, generation_config, system_instruction)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cached_models.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+            if key in self._cache_creating:
+                return None
+            self._cache_creating.add(key)
+        try:
+            genai = _genai()
+            cached_content = genai.caching.CachedContent.create(
+                model=model_name,
+                system_instruction=system_instruction,
+                ttl=datetime.timedelta(seconds=self.context_cache_ttl),
+            )
+            model = genai.GenerativeModel.from_cached_content(
+                cached_content=cached_content, generation_config=generation_config
+            )
+        except Exception:
+            model = None
+        with self._lock:
+            self._cache_creating.discard(key)
+            if model is not None:
+                self._cache_creations += 1
+            # Refresh a little early so requests never reference an expired cache; failures are
+            # retried after the same interval rather than on every request.
+            self._cached_models[key] = (model, now + self.context_cache_ttl * 0.9)
+        return model
+
+    def resolve(self, input_prompt, model_name=None, generation_config=None, system_instruction=None):
+        """Pick the model instance and request contents for a prompt with an optional static prefix
+
+        Args:
+            input_prompt: The request-specific part of the prompt
+            model_name: The Gemini model id; defaults to ``default_model``
+            generation_config: Optional generation config dict
+            system_instruction: Static prompt prefix shared by many requests
+
+        Returns:
+            tuple: ``(model, contents)`` to pass to ``generate_content``
+        """
+        model_name = model_name or self.default_model
+        if not system_instruction:
+            return self.get(model_name, generation_config), input_prompt
+
+        strategy = "inline"
+        model = None
+        if (
+            self.prefix_cache != "off"
+            and _sdk_feature("system_instruction")
+            and not model_name.startswith(LEGACY_MODEL_PREFIXES)
+        ):
+            min_tokens = self._context_cache_min_tokens(model_name)
+            if (
+                self.prefix_cache == "auto"
+                and _sdk_feature("context_cache")
+                and min_tokens is not None
+                and estimate_tokens(system_instruction) >= min_tokens
+            ):
+                model = self._get_cached(model_name, generation_config, system_instruction)
+                strategy = "cached_content"
+            if model is None:
+                model = self.get(model_name, generation_config, system_instruction)
+                strategy = "system_instruction"
+        with self._lock:
+            self._prefix_strategies[strategy] += 1
+        if model is None:
+            return self.get(model_name, generation_config), f"{system_instruction}\n\n{input_prompt}"
+        return model, input_prompt
+
+    def warm_up(self, model_names=None):
+        """Build models ahead of the first request
+
+        Args:
+            model_names: Model ids to build; defaults to ``[default_model]``
+        """
+        for model_name in model_names or [self.default_model]:
+            self._get_or_build(model_name, None)
+
+    def clear(self):
+        """Drop every pooled model and reset the counters"""
+        with self._lock:
+            self._models.clear()
+            self._cached_models.clear()
+            self._builds = 0
+            self._reuses = 0
+            self._cache_creations = 0
+            self._prefix_strategies = dict.fromkeys(self._prefix_strategies, 0)
+
+    def stats(self):
+        """Return pool size and build/reuse counters"""
+        with self._lock:
+            return {
+                "pool_size": len(self._models),
+                "builds": self._builds,
+                "reuses": self._reuses,
+                "models": sorted({name for name, _, _ in self._models}),
+                "prefix_cache": self.prefix_cache,
+                "prefix_strategies": dict(self._prefix_strategies),
+                "context_caches": sum(1 for model, _ in self._cached_models.values() if model is not None),
+                "context_cache_creations": self._cache_creations,
+            }
+
+
+model_registry = ModelRegistry()
+
+
+def json_generation_config(model_name=None, response_schema=None):
+    """Generation config that asks the model for JSON output, when the model and SDK support it
+
+    Args:
+        model_name: The Gemini model id; defaults to the registry's default model
+        response_schema: Optional OpenAPI-style schema the output must follow
+
+    Returns:
+        dict: Generation config with ``response_mime_type`` (and ``response_schema``), or
+        ``None`` when JSON mode is unavailable and the prompt's own instructions must suffice
+    """
+    model_name = model_name or model_registry.default_model
+    if model_name.startswith(LEGACY_MODEL_PREFIXES):
+        return None
+    fields = _sdk_feature("generation_config_fields")
+    if "response_mime_type" not in fields:
+        return None
+    config = {"response_mime_type": "application/json"}
+    if response_schema is not None and "response_schema" in fields:
+        config["response_schema"] = response_schema
+    return config
+
+
+def configure_gemini(api_key, defer=False):
     """Configure the Gemini API with the provided API key
-    
+
     Args:
         api_key: The API key for Gemini
+        defer: Keep the key and apply it when the SDK is first imported instead of importing the
+            SDK now; has no effect once the SDK is loaded
     """
-    genai.configure(api_key=api_key)
+    global _deferred_api_key
+    with _sdk_lock:
+        if defer and _sdk is None:
+            _deferred_api_key = api_key
+            return
+    _genai().configure(api_key=api_key)
 
-def get_gemini_response(input_prompt):
+class ModelText(str):
+    """Model output text that also carries the token counts the provider reported
+
+    ``usage`` is ``{"prompt_tokens": int, "response_tokens": int}``, or ``None`` when the response
+    had no usage metadata (older SDKs, stubs).
+    """
+
+    def __new__(cls, text, usage=None):
+        value = super().__new__(cls, text)
+        value.usage = usage
+        return value
+
+
+def _usage_of(response):
+    """Prompt and candidate token counts from a response's ``usage_metadata``, if it has them"""
+    metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(metadata, "prompt_token_count", None)
+    response_tokens = getattr(metadata, "candidates_token_count", None)
+    if not isinstance(prompt_tokens, int):
+        return None
+    return {
+        "prompt_tokens": prompt_tokens,
+        "response_tokens": response_tokens if isinstance(response_tokens, int) else 0,
+    }
+
+
+def get_gemini_response(input_prompt, model_name=None, generation_config=None, system_instruction=None):
     """Get response from Gemini model
-    
+
     Args:
         input_prompt: The prompt to send to the model
-        
+        model_name: Optional model id; defaults to the registry's default model
+        generation_config: Optional generation config dict
+        system_instruction: Optional static prompt prefix, sent as a cached context or system
+            instruction where the model supports it
+
     Returns:
-        str: The response text from the model
+        ModelText: The response text from the model, with the reported token usage
+    """
+    model, contents = model_registry.resolve(input_prompt, model_name, generation_config, system_instruction)
+    response = model.generate_content(contents)
+    return ModelText(response.text, _usage_of(response))
+
+
+def stream_gemini_response(input_prompt, model_name=None, generation_config=None, system_instruction=None):
+    """Stream response text from Gemini model as it is generated
+
+    Args:
+        input_prompt: The prompt to send to the model
+        model_name: Optional model id; defaults to the registry's default model
+        generation_config: Optional generation config dict
+        system_instruction: Optional static prompt prefix (see ``get_gemini_response``)
+
+    Yields:
+        ModelText: Successive text fragments of the response. The usage reported so far rides on
+        the fragment it arrived with; a final chunk carrying only usage yields an empty fragment.
     """
-    model = genai.GenerativeModel('gemini-pro')
-    response = model.generate_content(input_prompt)
-    return response.text
+    model, contents = model_registry.resolve(input_prompt, model_name, generation_config, system_instruction)
+    for chunk in model.generate_content(contents, stream=True):
+        usage = _usage_of(chunk)
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. the final safety/usage chunk) carry no text.
+            text = ""
+        if text or usage is not None:
+            yield ModelText(text, usage)
@@ -0,0 +1,274 @@
+"""Deadlines, retries, hedging and circuit breaking around upstream model calls."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# HTTP statuses (``google.api_core`` exceptions expose them as ``code``) worth retrying.
+TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Model provider circuit is open")
+        self.retry_after = retry_after
+
+
+class ModelDeadlineExceeded(TimeoutError):
+    """Raised when a model call (including retries) does not finish within its deadline."""
+
+
+def status_code_of(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether ``exc`` looks like a temporary upstream failure worth retrying."""
+
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    return status_code_of(exc) in TRANSIENT_STATUS_CODES
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return status_code_of(exc) == 429
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` transient failures in a row the circuit opens and calls fail fast
+    for ``recovery_timeout`` seconds. Then a single probe call is let through (half-open): success
+    closes the circuit, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._opened_total = 0
+        self._rejected_total = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise :class:`CircuitOpenError` unless a call may proceed."""
+
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self._rejected_total += 1
+            retry_after = max(self.recovery_timeout - (self._clock() - self._opened_at), 1.0)
+            raise CircuitOpenError(retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe whose call ended without an outcome (cancelled or abandoned)."""
+
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._opened_total += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "state_value": self.STATE_VALUES[state],
+                "consecutive_failures": self._consecutive_failures,
+                "opened_total": self._opened_total,
+                "rejected_total": self._rejected_total,
+            }
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 256) -> None:
+        self._samples: Deque[float] = collections.deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class ResilientCaller:
+    """Wrap an async operation with a deadline, jittered retries, optional hedging and a breaker.
+
+    Retries use "full jitter" exponential backoff (a random delay up to ``base_delay * 2**n``,
+    capped at ``max_delay``) and only apply to transient errors. With ``hedge`` enabled, once
+    ``hedge_min_samples`` latencies have been observed, an attempt still running after the p95
+    latency gets a duplicate request and the first to succeed wins.
+    """
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+    ) -> None:
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self._counters = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    async def _attempt(self, operation: Callable[[], Awaitable[T]]) -> T:
+        hedge_delay = self._hedge_delay()
+        primary = asyncio.ensure_future(operation())
+        if hedge_delay is None:
+            return await primary
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            self._counters["hedges"] += 1
+            hedge = asyncio.ensure_future(operation())
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            # On every exit, including the caller being cancelled mid-hedge, stop the losers and wait
+            # for them: each may hold a scheduler slot, and an unawaited failure would be logged as
+            # "exception was never retrieved".
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def call(self, operation: Callable[[], Awaitable[T]], *, deadline: float) -> T:
+        """Run ``operation`` (a zero-argument coroutine factory) within ``deadline`` seconds."""
+
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline
+        self._counters["calls"] += 1
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            remaining = deadline_at - loop.time()
+            if remaining <= 0:
+                self._counters["deadline_exceeded"] += 1
+                raise ModelDeadlineExceeded(f"Model call exceeded its {deadline:g}s deadline")
+            started = loop.time()
+            try:
+                result = await asyncio.wait_for(self._attempt(operation), remaining)
+            except asyncio.TimeoutError as exc:
+                self.breaker.record_failure()
+                self._counters["deadline_exceeded"] += 1
+                raise ModelDeadlineExceeded(f"Model call exceeded its {deadline:g}s deadline") from exc
+            except Exception as exc:
+                if not is_transient(exc):
+                    # The provider answered; the request itself was bad.
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                delay = self._backoff(attempt)
+                if attempt + 1 >= self.max_attempts or loop.time() + delay >= deadline_at:
+                    raise
+                self._counters["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled: no outcome to record, but a half-open probe must not stay claimed forever.
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            self.latency.record(loop.time() - started)
+            return result
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(0.95)
+        return {
+            **self._counters,
+            "hedging": self.hedge,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "circuit_breaker": self.breaker.stats(),
+        }
@@ -0,0 +1,403 @@
+"""Priority scheduling and client-side rate limiting for upstream model calls.
+
+Every upstream request takes a slot from :class:`ModelScheduler` first. A slot is granted when a
+concurrency slot is free and the requests-per-minute and tokens-per-minute buckets can cover it.
+Waiting requests are served strictly by priority class (interactive before standard before bulk)
+and round-robin across endpoints within a class. One busy endpoint therefore cannot monopolise its
+class, and bulk scoring never delays an interactive user. When several worker processes serve the
+API, the RPM/TPM buckets can live in a shared SQLite file so the workers draw from one budget;
+each worker leases budget from it in chunks, in a thread, so the event loop never waits on the file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Union
+
+INTERACTIVE = 0
+STANDARD = 1
+BULK = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", STANDARD: "standard", BULK: "bulk"}
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute of budget; a rate of 0 is unlimited."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` (capped at capacity) is available; ``0`` if it is now."""
+
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self._level
+        return 0.0 if missing <= 0 else missing * 60.0 / self.per_minute
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+
+    def try_take(self, amount: float) -> float:
+        """Take ``amount`` and return ``0`` if it is available, else the seconds to wait (taking nothing)."""
+
+        wait = self.delay(amount)
+        if wait == 0:
+            self.take(amount)
+        return wait
+
+    def refund(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self._level = min(self.capacity, self._level + min(amount, self.capacity))
+
+    @property
+    def level(self) -> Optional[float]:
+        if self.unlimited:
+            return None
+        self._refill()
+        return round(self._level, 1)
+
+
+class SharedTokenBucket:
+    """:class:`TokenBucket` whose level is a row in a SQLite file shared by several processes.
+
+    Each process spends from a local lease and only touches the file to lease another chunk
+    (``lease_fraction`` of the per-minute budget, or the amount asked for if larger). Leasing runs
+    in one ``BEGIN IMMEDIATE`` transaction, so concurrent workers cannot both spend the same budget,
+    and it is the only blocking call: :meth:`try_take` and :meth:`refund` work on the lease alone,
+    and :meth:`refill` is meant to run in a thread. Timestamps are wall-clock because they are
+    compared across processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str,
+        per_minute: float,
+        clock: Callable[[], float] = time.time,
+        lease_fraction: float = 0.05,
+    ) -> None:
+        self.path = path
+        self.name = name
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.lease_size = self.capacity * lease_fraction
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._leased = 0.0
+        # Shared level and time of the last refill, for reporting without touching the file.
+        self._observed = (self.capacity, clock())
+        if not self.unlimited:
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10.0, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO buckets (name, level, updated) VALUES (?, ?, ?)", (name, self.capacity, clock())
+            )
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def _update(self, change: Callable[[float], float]) -> float:
+        """Refill the shared level, store ``change(level)`` and return the refilled level."""
+
+        assert self._conn is not None
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored, updated = self._conn.execute(
+                "SELECT level, updated FROM buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = self._clock()
+            level = min(self.capacity, stored + max(0.0, now - updated) * self.per_minute / 60.0)
+            remaining = change(level)
+            self._conn.execute("UPDATE buckets SET level = ?, updated = ? WHERE name = ?", (remaining, now, self.name))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._observed = (remaining, now)
+        return level
+
+    def try_take(self, amount: float) -> Optional[float]:
+        """Take ``amount`` from the local lease and return ``0``, or ``None`` if the lease must be refilled."""
+
+        if self.unlimited:
+            return 0.0
+        needed = min(amount, self.capacity)
+        with self._lock:
+            if self._leased < needed:
+                return None
+            self._leased -= needed
+        return 0.0
+
+    def refill(self, amount: float) -> float:
+        """Lease enough shared budget to cover ``amount``; return ``0`` or the seconds until it is available.
+
+        Blocks on the SQLite file; call it from a worker thread, not the event loop.
+        """
+
+        if self.unlimited:
+            return 0.0
+        needed = min(amount, self.capacity)
+        with self._lock:
+            shortfall = needed - self._leased
+            if shortfall <= 0:
+                return 0.0
+            granted = 0.0
+
+            def lease(level: float) -> float:
+                nonlocal granted
+                if level >= shortfall:
+                    granted = min(level, max(shortfall, self.lease_size))
+                return level - granted
+
+            level = self._update(lease)
+            self._leased += granted
+        return 0.0 if granted else (shortfall - level) * 60.0 / self.per_minute
+
+    def refund(self, amount: float) -> None:
+        if not self.unlimited:
+            with self._lock:
+                self._leased += min(amount, self.capacity)
+
+    def take(self, amount: float) -> None:
+        """Spend ``amount`` even if the lease runs negative; the next refill leases the debt back."""
+
+        if not self.unlimited:
+            with self._lock:
+                self._leased -= min(amount, self.capacity)
+
+    @property
+    def level(self) -> Optional[float]:
+        """Budget left as of the last refill, including the local lease; read-only, no file access."""
+
+        if self.unlimited:
+            return None
+        stored, updated = self._observed
+        refilled = min(self.capacity, stored + max(0.0, self._clock() - updated) * self.per_minute / 60.0)
+        return round(refilled + self._leased, 1)
+
+    def close(self) -> None:
+        """Return the unspent lease to the shared budget and close the file."""
+
+        if self._conn is not None:
+            with self._lock:
+                if self._leased:
+                    leased, self._leased = self._leased, 0.0
+                    self._update(lambda level: min(self.capacity, level + leased))
+                self._conn.close()
+                self._conn = None
+
+
+class _Waiter:
+    __slots__ = ("endpoint", "priority", "tokens", "future", "enqueued_at")
+
+    def __init__(self, endpoint: str, priority: int, tokens: int, future: "asyncio.Future[None]", enqueued_at: float):
+        self.endpoint = endpoint
+        self.priority = priority
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class ModelScheduler:
+    """Admission control for model calls: concurrency slots, RPM/TPM buckets and a fair queue."""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        *,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        shared_state_path: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self._clock = clock
+        self._requests: Union[TokenBucket, SharedTokenBucket]
+        self._tokens: Union[TokenBucket, SharedTokenBucket]
+        if shared_state_path:
+            # Concurrency slots stay per process; only the provider quotas are global.
+            self._requests = SharedTokenBucket(shared_state_path, "model_requests", requests_per_minute)
+            self._tokens = SharedTokenBucket(shared_state_path, "model_tokens", tokens_per_minute)
+        else:
+            self._requests = TokenBucket(requests_per_minute, clock)
+            self._tokens = TokenBucket(tokens_per_minute, clock)
+        # priority -> endpoint -> FIFO of waiters; endpoint order rotates for round-robin service.
+        self._queues: Dict[int, "collections.OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: collections.OrderedDict() for priority in PRIORITY_NAMES
+        }
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._refilling: Optional["asyncio.Future[float]"] = None
+        self._endpoint_stats: Dict[str, Dict[str, Any]] = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, endpoint: Optional[str], priority: int = STANDARD, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold an upstream call slot for the duration of the ``async with`` block."""
+
+        await self.acquire(endpoint, priority, tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, endpoint: Optional[str], priority: int = STANDARD, tokens: int = 0) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(endpoint or "unknown", priority, tokens, loop.create_future(), self._clock())
+        self._queues[priority].setdefault(waiter.endpoint, collections.deque()).append(waiter)
+        self._stats_for(waiter.endpoint)["queued"] += 1
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def settle_tokens(self, reserved: int, used: int) -> None:
+        """Correct the token budget once a call's real usage is known.
+
+        Admission takes an estimate of the prompt tokens; the difference to what the provider
+        reported (prompt and response) is refunded or charged, so the TPM bucket tracks real usage.
+        """
+
+        if used < reserved:
+            self._tokens.refund(reserved - used)
+            self._dispatch()
+        elif used > reserved:
+            self._tokens.take(used - reserved)
+
+    def _stats_for(self, endpoint: str) -> Dict[str, Any]:
+        return self._endpoint_stats.setdefault(
+            endpoint, {"queued": 0, "admitted": 0, "wait_seconds_total": 0.0, "max_wait_seconds": 0.0}
+        )
+
+    def _remove(self, waiter: _Waiter) -> None:
+        queue = self._queues[waiter.priority].get(waiter.endpoint)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._stats_for(waiter.endpoint)["queued"] -= 1
+            if not queue:
+                del self._queues[waiter.priority][waiter.endpoint]
+
+    def _peek(self) -> Optional[_Waiter]:
+        for priority in sorted(self._queues):
+            endpoints = self._queues[priority]
+            if endpoints:
+                return endpoints[next(iter(endpoints))][0]
+        return None
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_in_flight:
+            waiter = self._peek()
+            if waiter is None:
+                return
+            bucket: Union[TokenBucket, SharedTokenBucket] = self._requests
+            amount = 1
+            wait = self._requests.try_take(amount)
+            if wait == 0:
+                bucket, amount = self._tokens, waiter.tokens
+                wait = self._tokens.try_take(amount)
+                if wait != 0:
+                    self._requests.refund(1)
+            if wait is None:
+                # A shared bucket's local lease ran out; lease more off the event loop.
+                assert isinstance(bucket, SharedTokenBucket)
+                self._refill(bucket, amount)
+                return
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._on_timer)
+                return
+            endpoints = self._queues[waiter.priority]
+            queue = endpoints[waiter.endpoint]
+            queue.popleft()
+            if queue:
+                endpoints.move_to_end(waiter.endpoint)
+            else:
+                del endpoints[waiter.endpoint]
+            self._in_flight += 1
+            waited = self._clock() - waiter.enqueued_at
+            stats = self._stats_for(waiter.endpoint)
+            stats["queued"] -= 1
+            stats["admitted"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+            waiter.future.set_result(None)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _refill(self, bucket: SharedTokenBucket, amount: int) -> None:
+        if self._refilling is None:
+            self._refilling = asyncio.get_running_loop().run_in_executor(None, bucket.refill, amount)
+            self._refilling.add_done_callback(self._on_refilled)
+
+    def _on_refilled(self, future: "asyncio.Future[float]") -> None:
+        self._refilling = None
+        if future.cancelled():
+            return
+        # A failed lease (locked or unreadable file) is retried after a second rather than dropped.
+        wait = 1.0 if future.exception() is not None else future.result()
+        if wait > 0:
+            if self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._on_timer)
+            return
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        endpoints: Dict[str, Any] = {}
+        for endpoint, stats in sorted(self._endpoint_stats.items()):
+            admitted = stats["admitted"]
+            endpoints[endpoint] = {
+                "queue_depth": stats["queued"],
+                "admitted": admitted,
+                "avg_wait_ms": round(stats["wait_seconds_total"] / admitted * 1000, 2) if admitted else 0.0,
+                "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 2),
+            }
+        queued_by_priority: List[int] = [
+            sum(len(queue) for queue in self._queues[priority].values()) for priority in sorted(PRIORITY_NAMES)
+        ]
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": dict(zip((PRIORITY_NAMES[p] for p in sorted(PRIORITY_NAMES)), queued_by_priority)),
+            "requests_per_minute": self._requests.per_minute or None,
+            "tokens_per_minute": self._tokens.per_minute or None,
+            "request_budget_left": self._requests.level,
+            "token_budget_left": self._tokens.level,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,108 @@
+"""Production entry point: serve the API from several uvicorn worker processes.
+
+Run from the ``backend`` directory::
+
+    python -m src.serve                      # one worker per available CPU, or $WEB_CONCURRENCY
+    python -m src.serve --workers 4 --port 8080
+
+Each worker is a separate process with its own event loop and thread pool, so PDF parsing and JSON
+handling use every core instead of one. State that the workers must agree on lives in SQLite files
+(WAL mode) under ``--state-dir``: the response and PDF text cache disk tiers, the model RPM/TPM
+buckets, the background task queue with its idempotency keys, and the resume index. Paths already
+set in the environment or ``.env`` take precedence. In-memory cache tiers, metrics and the concurrency
+limits (``MODEL_MAX_CONCURRENCY``, ``TASK_WORKERS``) remain per worker.
+
+CPUs are counted from the affinity mask and cgroup quota (:func:`src.utils.cpus.available_cpus`),
+not the host, and each worker's PDF page-extraction pool gets ``CPUs // workers`` processes unless
+``PDF_POOL_WORKERS`` is set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from typing import Dict, List, Mapping, Optional
+
+from src.config.config import load_config
+from src.utils.cpus import available_cpus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_APP = "src.api.api:app"
+# Environment variable -> file name inside the shared state directory.
+SHARED_STATE_FILES = {
+    "RESPONSE_CACHE_PATH": "response_cache.sqlite",
+    "PDF_TEXT_CACHE_PATH": "pdf_text_cache.sqlite",
+    "RATE_LIMIT_STATE_PATH": "rate_limits.sqlite",
+    "TASK_DB_PATH": "tasks.sqlite",
+    "RESUME_INDEX_PATH": "resume_index",
+}
+
+
+def worker_count(requested: int = 0, cpu_count: Optional[int] = None) -> int:
+    """``requested`` if positive, otherwise one worker per available CPU."""
+
+    if requested > 0:
+        return requested
+    return max(1, cpu_count if cpu_count is not None else available_cpus())
+
+
+def pdf_pool_size(workers: int, cpu_count: Optional[int] = None) -> int:
+    """PDF extraction processes per worker so that all workers together use about one per CPU."""
+
+    cpus = cpu_count if cpu_count is not None else available_cpus()
+    return max(1, cpus // max(1, workers))
+
+
+def shared_state_env(state_dir: str, environ: Mapping[str, str]) -> Dict[str, str]:
+    """Environment defaults pointing every shared store into ``state_dir``; explicit settings win."""
+
+    return {
+        name: os.path.join(state_dir, filename)
+        for name, filename in SHARED_STATE_FILES.items()
+        if not environ.get(name)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    config = load_config()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=config["web_concurrency"], help="0 = one per available CPU")
+    parser.add_argument("--state-dir", default=config["shared_state_dir"], help="directory for shared SQLite state")
+    parser.add_argument("--app", default=DEFAULT_APP, help="ASGI application import string")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     %(message)s")
+    workers = worker_count(args.workers)
+    os.makedirs(args.state_dir, exist_ok=True)
+    # Workers import the app in fresh processes and inherit this environment.
+    os.environ.update(shared_state_env(args.state_dir, os.environ))
+    pdf_workers = config["pdf_pool_workers"] or pdf_pool_size(workers)
+    os.environ["PDF_POOL_WORKERS"] = str(pdf_workers)
+    logger.info(
+        "serving %s on %s:%s with %d worker(s), %s PDF process(es) each, state in %s",
+        args.app,
+        args.host,
+        args.port,
+        workers,
+        pdf_workers,
+        args.state_dir,
+    )
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
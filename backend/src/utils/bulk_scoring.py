@@ -0,0 +1,151 @@
+"""Helpers for fanning recruiter bulk scoring out into per-chunk model calls."""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def chunk_resumes(resumes: Sequence[str], chunk_size: int) -> Iterator[Tuple[int, List[str]]]:
+    """Yield ``(start_index, chunk)`` pairs covering ``resumes`` in order."""
+
+    for start in range(0, len(resumes), chunk_size):
+        yield start, list(resumes[start : start + chunk_size])
+
+
+def candidate_label(index: int) -> str:
+    """Label used for the resume at zero-based ``index`` in the recruiter prompt."""
+
+    return f"Resume_{index + 1}"
+
+
+def parse_score(value: Any) -> Optional[float]:
+    """Best-effort conversion of model scores such as ``"85%"``, ``85`` or ``"8.5/10"`` to 0-100."""
+
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        match = _NUMBER_PATTERN.search(value)
+        if match is None:
+            return None
+        number = float(match.group())
+        if "/10" in value and "/100" not in value:
+            number *= 10
+    else:
+        return None
+    return max(0.0, min(100.0, number))
+
+
+def _skill_entry(entry: Any) -> Optional[Tuple[str, float]]:
+    if not isinstance(entry, dict):
+        return None
+    skill = entry.get("skill") or entry.get("name")
+    coverage = None
+    for key in ("coverage", "coverage_percentage", "coverage_percent", "percentage"):
+        if key in entry:
+            coverage = parse_score(entry[key])
+            break
+    if skill is None or coverage is None:
+        # Fall back to the ``{"Python": "80%"}`` shape.
+        if len(entry) == 1:
+            skill, raw = next(iter(entry.items()))
+            coverage = parse_score(raw)
+    if not isinstance(skill, str) or coverage is None:
+        return None
+    return skill, coverage
+
+
+class BulkScoreAggregator:
+    """Merge per-chunk recruiter results into the single-prompt response shape.
+
+    Rankings are re-sorted by ``overall_score`` across chunks, and ``skill_matrix`` coverage is
+    averaged across chunks weighted by how many resumes each chunk contained. With
+    ``keep_details=False`` only each candidate's id and score are retained, which is what streaming
+    callers use after forwarding the full ranking downstream.
+    """
+
+    def __init__(self, total: int, *, keep_details: bool = True) -> None:
+        self.total = total
+        self.keep_details = keep_details
+        self.rankings: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, str]] = []
+        self._skill_totals: Dict[str, List[float]] = {}
+
+    def add_chunk(
+        self, start: int, size: int, result: Any
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """Fold one chunk's model output in and return the rankings and errors it contributed."""
+
+        rankings = result.get("candidate_rankings") if isinstance(result, dict) else None
+        if not isinstance(rankings, list):
+            return [], self.add_error(start, size, "Model response did not include candidate_rankings")
+
+        expected = {candidate_label(start + offset) for offset in range(size)}
+        added: List[Dict[str, Any]] = []
+        for position, ranking in enumerate(rankings[:size]):
+            if not isinstance(ranking, dict):
+                continue
+            ranking = dict(ranking)
+            if ranking.get("candidate_id") not in expected:
+                fallback = candidate_label(start + position)
+                if fallback not in expected:
+                    if not expected:
+                        break
+                    fallback = min(expected, key=lambda label: int(label.split("_")[-1]))
+                ranking["candidate_id"] = fallback
+            expected.discard(ranking["candidate_id"])
+            added.append(ranking)
+        errors = [
+            {"candidate_id": missing, "detail": "Candidate missing from model response"}
+            for missing in sorted(expected)
+        ]
+        self.errors.extend(errors)
+        if self.keep_details:
+            self.rankings.extend(added)
+        else:
+            self.rankings.extend(
+                {"candidate_id": ranking["candidate_id"], "overall_score": ranking.get("overall_score")}
+                for ranking in added
+            )
+
+        for entry in result.get("skill_matrix") or []:
+            parsed = _skill_entry(entry)
+            if parsed is None:
+                continue
+            skill, coverage = parsed
+            totals = self._skill_totals.setdefault(skill, [0.0, 0.0])
+            totals[0] += coverage * size
+            totals[1] += size
+        return added, errors
+
+    def add_error(self, start: int, size: int, detail: str) -> List[Dict[str, str]]:
+        """Record a failed chunk against every candidate it contained."""
+
+        errors = [{"candidate_id": candidate_label(start + offset), "detail": detail} for offset in range(size)]
+        self.errors.extend(errors)
+        return errors
+
+    def skill_matrix(self) -> List[Dict[str, str]]:
+        return [
+            {"skill": skill, "coverage": f"{round(weighted / count)}%"}
+            for skill, (weighted, count) in sorted(self._skill_totals.items())
+            if count
+        ]
+
+    def result(self) -> Dict[str, Any]:
+        rankings = sorted(
+            self.rankings,
+            key=lambda ranking: parse_score(ranking.get("overall_score")) or 0.0,
+            reverse=True,
+        )
+        errors = sorted(self.errors, key=lambda error: int(error["candidate_id"].split("_")[-1]))
+        return {
+            "candidate_rankings": rankings,
+            "skill_matrix": self.skill_matrix(),
+            "errors": errors,
+            "summary": {"total": self.total, "scored": len(rankings), "failed": len(errors)},
+        }
@@ -0,0 +1,158 @@
+"""Prompt input compaction and context-window budgeting.
+
+Resume and job description text extracted from PDFs tends to carry repeated page headers and
+footers, page numbers and long whitespace runs. :func:`compact_text` removes that furniture, and
+:func:`compact_inputs` additionally trims the least job-relevant resume sections (and, if needed,
+the least resume-relevant job description sections) so both fit a per-model token budget.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.utils.embeddings import tokenize
+
+# Context window sizes (tokens) for known models; the input budget leaves room for the prompt
+# instructions and the model's answer.
+MODEL_CONTEXT_TOKENS: Dict[str, int] = {
+    "gemini-pro": 32_760,
+    "gemini-1.0-pro": 32_760,
+    "gemini-1.5-flash": 1_048_576,
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-2.0-flash": 1_048_576,
+}
+DEFAULT_CONTEXT_TOKENS = 32_760
+RESERVED_TOKENS = 4_096
+
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v\u00a0]+")
+_PAGE_FURNITURE = re.compile(
+    r"^(?:page\s*\d+(?:\s*(?:of|/)\s*\d+)?|\d+\s*(?:of|/)\s*\d+|[-–]?\s*\d{1,3}\s*[-–]?)$",
+    re.IGNORECASE,
+)
+_HEADING = re.compile(r"^(?:[A-Z][A-Z &/-]{2,40}|[A-Za-z][A-Za-z &/-]{2,40}:)$")
+_MAX_SECTION_LINES = 12
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English text)."""
+
+    return math.ceil(len(text) / 4)
+
+
+def input_token_budget(model_name: str, override: Optional[int] = None) -> int:
+    """Tokens available for resume and job text when prompting ``model_name``."""
+
+    if override:
+        return override
+    return MODEL_CONTEXT_TOKENS.get(model_name, DEFAULT_CONTEXT_TOKENS) - RESERVED_TOKENS
+
+
+def compact_text(text: str) -> str:
+    """Normalise whitespace and drop page numbers and repeated lines (running headers/footers)."""
+
+    seen: Set[str] = set()
+    lines: List[str] = []
+    for raw_line in text.splitlines():
+        line = _INLINE_WHITESPACE.sub(" ", raw_line).strip()
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if _PAGE_FURNITURE.match(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def split_sections(text: str) -> List[str]:
+    """Split compacted text into sections at blank lines and heading-like lines."""
+
+    sections: List[List[str]] = []
+    current: List[str] = []
+    for line in text.split("\n"):
+        boundary = not line or (_HEADING.match(line) and current) or len(current) >= _MAX_SECTION_LINES
+        if boundary and current:
+            sections.append(current)
+            current = []
+        if line:
+            current.append(line)
+    if current:
+        sections.append(current)
+    return ["\n".join(section) for section in sections]
+
+
+def trim_to_budget(text: str, budget_tokens: int, reference_text: str) -> Tuple[str, int]:
+    """Keep the sections of ``text`` most relevant to ``reference_text`` within ``budget_tokens``.
+
+    The first section (usually name and contact details) is always kept. Remaining sections are
+    ranked by the density of reference terms they contain and re-emitted in their original order.
+    Returns the trimmed text and the number of sections dropped.
+    """
+
+    if estimate_tokens(text) <= budget_tokens:
+        return text, 0
+    sections = split_sections(text)
+    reference_terms = set(tokenize(reference_text))
+
+    def density(section: str) -> float:
+        tokens = tokenize(section)
+        if not tokens:
+            return 0.0
+        return sum(token in reference_terms for token in tokens) / len(tokens)
+
+    ranked = sorted(range(1, len(sections)), key=lambda index: (-density(sections[index]), index))
+    keep = {0}
+    used = estimate_tokens(sections[0]) if sections else 0
+    for index in ranked:
+        cost = estimate_tokens(sections[index]) + 1
+        if used + cost <= budget_tokens:
+            keep.add(index)
+            used += cost
+    kept = [sections[index] for index in sorted(keep) if index < len(sections)]
+    trimmed = "\n\n".join(kept)
+    if estimate_tokens(trimmed) > budget_tokens:
+        trimmed = trimmed[: budget_tokens * 4]
+    return trimmed, len(sections) - len(kept)
+
+
+def compact_inputs(
+    resume_text: Optional[str],
+    job_description: Optional[str],
+    budget_tokens: int,
+) -> Tuple[Optional[str], Optional[str], Dict[str, int]]:
+    """Compact a resume/job pair and fit both into ``budget_tokens``.
+
+    Either text may be ``None`` for prompts that only use one of them. The job description gets at
+    most a third of the budget unless the resume leaves more room. Returns the compacted texts and a
+    report of estimated input and compacted token counts.
+    """
+
+    input_tokens = estimate_tokens(resume_text or "") + estimate_tokens(job_description or "")
+    resume = compact_text(resume_text) if resume_text is not None else None
+    job = compact_text(job_description) if job_description is not None else None
+    resume_tokens = estimate_tokens(resume or "")
+    job_tokens = estimate_tokens(job or "")
+
+    trimmed_sections = 0
+    if resume_tokens + job_tokens > budget_tokens:
+        job_budget = min(job_tokens, max(budget_tokens // 3, budget_tokens - resume_tokens))
+        if job is not None:
+            job, dropped = trim_to_budget(job, job_budget, resume or "")
+            trimmed_sections += dropped
+        if resume is not None:
+            resume, dropped = trim_to_budget(resume, budget_tokens - estimate_tokens(job or ""), job or "")
+            trimmed_sections += dropped
+
+    report = {
+        "input_tokens": input_tokens,
+        "compacted_tokens": estimate_tokens(resume or "") + estimate_tokens(job or ""),
+        "budget_tokens": budget_tokens,
+        "trimmed_sections": trimmed_sections,
+    }
+    return resume, job, report
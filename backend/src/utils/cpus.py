@@ -0,0 +1,50 @@
+"""CPU budget of the current process, honouring affinity masks and cgroup CPU quotas.
+
+``os.cpu_count()`` reports the host's CPUs. In a container limited to one or two CPUs (Render,
+Kubernetes) sizing worker pools from it oversubscribes the quota and throttles every process.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return handle.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota(root: str = CGROUP_ROOT) -> Optional[float]:
+    """CPUs granted by the cgroup CPU quota (v2 ``cpu.max`` or v1 CFS files), or ``None`` if unlimited."""
+
+    try:
+        limit = _read(os.path.join(root, "cpu.max"))
+        if limit is not None:
+            quota, period = limit.split()[:2]
+            return None if quota == "max" else int(quota) / int(period)
+        quota = _read(os.path.join(root, "cpu", "cpu.cfs_quota_us"))
+        period = _read(os.path.join(root, "cpu", "cpu.cfs_period_us"))
+        if quota is None or period is None or int(quota) <= 0:
+            return None
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> int:
+    """CPUs this process may actually use: affinity mask capped by the cgroup quota, at least 1."""
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS or Windows
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota(root)
+    if quota is not None:
+        cpus = min(cpus, int(quota))
+    return max(1, cpus)
@@ -0,0 +1,220 @@
+"""Local text embeddings and resume/job semantic similarity.
+
+The default :class:`HashingEmbedder` needs nothing beyond NumPy and works offline. A
+sentence-transformers model can be plugged in through ``get_embedder`` when that package is
+installed. If that model cannot be loaded, ``get_embedder`` raises instead of quietly switching to
+hashing, because the two produce incomparable vectors; the fallback has to be enabled explicitly.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+_SEGMENT_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+_STOPWORDS = frozenset(
+    """
+    a about above after all also an and any are as at be been being but by can could did do does
+    for from had has have having he her his i if in into is it its itself may me more most must my
+    of on or our ours over own she should so some such than that the their them then there these
+    they this those through to too under up very was we were what when where which while who will
+    with would you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed; keeps tokens such as ``c++`` and ``node.js``."""
+
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def chunk_text(text: str, max_words: int = 60, min_words: int = 4) -> List[str]:
+    """Split text into sentence/line segments of at most ``max_words`` words.
+
+    Fragments shorter than ``min_words`` (headings, lone dates) are merged into the next segment.
+    """
+
+    segments: List[str] = []
+    carry: List[str] = []
+    for piece in _SEGMENT_SPLIT.split(text):
+        words = carry + piece.split()
+        if len(words) < min_words:
+            carry = words
+            continue
+        carry = []
+        for start in range(0, len(words), max_words):
+            segments.append(" ".join(words[start : start + max_words]))
+    if carry:
+        if segments and len(segments[-1].split()) + len(carry) <= max_words:
+            segments[-1] = f"{segments[-1]} {' '.join(carry)}"
+        else:
+            segments.append(" ".join(carry))
+    return segments
+
+
+class HashingEmbedder:
+    """Signed feature-hashing embedder over unigrams and bigrams with sublinear term frequency.
+
+    Passing ``idf`` (feature -> weight, see :func:`inverse_document_frequency`) turns the vectors
+    into hashed TF-IDF, which discounts words shared by every segment of the comparison.
+    """
+
+    name = "hashing"
+    bigram_weight = 0.5
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+
+    def features(self, text: str) -> Dict[str, float]:
+        tokens = tokenize(text)
+        counts: Dict[str, float] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0.0) + 1.0
+        for left, right in zip(tokens, tokens[1:]):
+            bigram = f"{left} {right}"
+            counts[bigram] = counts.get(bigram, 0.0) + 1.0
+        return counts
+
+    def embed(self, texts: Sequence[str], idf: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Return an ``(len(texts), dim)`` float32 matrix of L2-normalised rows."""
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self.features(text).items():
+                weight = 1.0 + math.log(count)
+                if " " in feature:
+                    weight *= self.bigram_weight
+                if idf is not None:
+                    weight *= idf.get(feature, 1.0)
+                hashed = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                matrix[row, hashed % self.dim] += sign * weight
+        return normalize_rows(matrix)
+
+
+def inverse_document_frequency(embedder: HashingEmbedder, texts: Sequence[str]) -> Dict[str, float]:
+    """Smoothed IDF of each hashing feature across ``texts``."""
+
+    document_frequency: Dict[str, int] = {}
+    for text in texts:
+        for feature in embedder.features(text):
+            document_frequency[feature] = document_frequency.get(feature, 0) + 1
+    total = len(texts)
+    return {
+        feature: math.log((1 + total) / (1 + frequency)) + 1.0
+        for feature, frequency in document_frequency.items()
+    }
+
+
+class EmbedderUnavailable(RuntimeError):
+    """The configured embedding model could not be loaded and falling back to hashing is disabled."""
+
+
+class SentenceTransformerEmbedder:
+    """Adapter for a locally available sentence-transformers model."""
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self._model = SentenceTransformer(model_name)
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._model.encode(list(texts), convert_to_numpy=True, show_progress_bar=False)
+        return normalize_rows(vectors.astype(np.float32))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def get_embedder(model_name: Optional[str] = None, dim: int = 1024, fallback: bool = False) -> Any:
+    """Return the configured embedder.
+
+    A sentence-transformers model that cannot be loaded raises :class:`EmbedderUnavailable`, or,
+    with ``fallback=True``, logs a warning and returns the hashing embedder.
+    """
+
+    if model_name and model_name != HashingEmbedder.name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as exc:
+            if not fallback:
+                raise EmbedderUnavailable(f"Embedding model {model_name!r} could not be loaded: {exc}") from exc
+            logger.warning(
+                "embedding model %r could not be loaded, using hashing embeddings", model_name, exc_info=True
+            )
+    return HashingEmbedder(dim=dim)
+
+
+def semantic_similarity(
+    resume_text: str,
+    job_description: str,
+    embedder: Any,
+    *,
+    top_k: int = 5,
+    gap_threshold: float = 0.15,
+) -> Dict[str, Any]:
+    """Compare resume and job description chunk embeddings.
+
+    The score is the mean, over job description segments, of each segment's best cosine similarity
+    to any resume segment. Job segments whose best match falls below ``gap_threshold`` are reported
+    as gaps.
+    """
+
+    resume_segments = chunk_text(resume_text)
+    job_segments = chunk_text(job_description)
+    if not resume_segments or not job_segments:
+        return {
+            "semantic_similarity_score": "0%",
+            "top_matching_segments": [],
+            "gap_segments": [{"job_segment": segment, "best_similarity": 0.0} for segment in job_segments][:top_k],
+            "embedder": embedder.name,
+        }
+
+    segments = resume_segments + job_segments
+    if isinstance(embedder, HashingEmbedder):
+        vectors = embedder.embed(segments, idf=inverse_document_frequency(embedder, segments))
+    else:
+        vectors = embedder.embed(segments)
+    resume_vectors = vectors[: len(resume_segments)]
+    job_vectors = vectors[len(resume_segments) :]
+    similarity = np.clip(job_vectors @ resume_vectors.T, 0.0, 1.0)
+
+    best_resume = similarity.argmax(axis=1)
+    best_scores = similarity[np.arange(len(job_segments)), best_resume]
+    score = float(best_scores.mean()) * 100
+
+    order = np.argsort(-best_scores)
+    top_matching = [
+        {
+            "job_segment": job_segments[idx],
+            "resume_segment": resume_segments[best_resume[idx]],
+            "similarity": round(float(best_scores[idx]), 4),
+        }
+        for idx in order[:top_k]
+        if best_scores[idx] > 0
+    ]
+    gaps = [
+        {"job_segment": job_segments[idx], "best_similarity": round(float(best_scores[idx]), 4)}
+        for idx in order[::-1]
+        if best_scores[idx] < gap_threshold
+    ][:top_k]
+    return {
+        "semantic_similarity_score": f"{round(score)}%",
+        "top_matching_segments": top_matching,
+        "gap_segments": gaps,
+        "embedder": embedder.name,
+    }
@@ -0,0 +1,107 @@
+"""Incremental extraction of a string field from a JSON document arriving in fragments."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStreamer:
+    """Emit the decoded value of one top-level string field as the JSON text streams in.
+
+    Feed raw model output with :meth:`feed`; each call returns whatever new characters of the
+    target field became available. Text before the first ``{`` (such as a markdown fence) is
+    ignored. The full document should still be parsed with ``json.loads`` once the stream ends.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self._depth = 0
+        self._in_string = False
+        self._escape: Optional[str] = None
+        self._pending_high_surrogate: Optional[int] = None
+        self._expecting_key = False
+        self._string_is_key = False
+        self._current_key: List[str] = []
+        self._last_key: Optional[str] = None
+        self._capturing = False
+        self.done = False
+
+    def feed(self, fragment: str) -> str:
+        """Consume ``fragment`` and return newly decoded characters of the target field."""
+
+        out: List[str] = []
+        for char in fragment:
+            if self._in_string:
+                self._consume_string_char(char, out)
+            else:
+                self._consume_structural_char(char)
+        return "".join(out)
+
+    def _consume_structural_char(self, char: str) -> None:
+        if char == '"':
+            if self._depth == 0:
+                return
+            self._in_string = True
+            self._string_is_key = self._depth == 1 and self._expecting_key
+            self._current_key = []
+            self._capturing = (
+                not self._string_is_key
+                and self._depth == 1
+                and self._last_key == self.field
+                and not self.done
+            )
+        elif char in "{[":
+            self._depth += 1
+            self._expecting_key = char == "{" and self._depth == 1
+        elif char in "}]":
+            self._depth = max(0, self._depth - 1)
+        elif char == "," and self._depth == 1:
+            self._expecting_key = True
+            self._last_key = None
+        elif char == ":" and self._depth == 1:
+            self._expecting_key = False
+
+    def _consume_string_char(self, char: str, out: List[str]) -> None:
+        if self._escape is not None:
+            self._escape += char
+            decoded = self._decode_escape()
+            if decoded is None:
+                return
+            self._escape = None
+            self._append(decoded, out)
+            return
+        if char == "\\":
+            self._escape = ""
+            return
+        if char == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._last_key = "".join(self._current_key)
+            elif self._capturing:
+                self._capturing = False
+                self.done = True
+            return
+        self._append(char, out)
+
+    def _decode_escape(self) -> Optional[str]:
+        escape = self._escape or ""
+        if escape[0] != "u":
+            return _SIMPLE_ESCAPES.get(escape, escape)
+        if len(escape) < 5:
+            return None
+        code = int(escape[1:5], 16)
+        if 0xD800 <= code <= 0xDBFF:
+            self._pending_high_surrogate = code
+            return ""
+        if 0xDC00 <= code <= 0xDFFF and self._pending_high_surrogate is not None:
+            code = 0x10000 + ((self._pending_high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._pending_high_surrogate = None
+        return chr(code)
+
+    def _append(self, text: str, out: List[str]) -> None:
+        if self._string_is_key:
+            self._current_key.append(text)
+        elif self._capturing:
+            out.append(text)
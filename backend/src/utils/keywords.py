@@ -0,0 +1,225 @@
+"""Deterministic keyword coverage scoring between a resume and a job description.
+
+Job description terms (known skills plus salient words) are weighted by TF-IDF, where each
+sentence of the job description counts as a document. Resume coverage is then found with a single
+token-level Aho-Corasick pass that also recognises skill synonyms from the skill taxonomy.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from src.utils.embeddings import tokenize
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+# Words that show up in almost every posting and say nothing about the role's requirements.
+_BOILERPLATE = frozenset(
+    """
+    ability able applicant applicants apply benefits best candidate candidates company description
+    environment equal excellent experience experienced familiarity good great help highly hiring ideal
+    including job join knowledge looking member must new nice opportunity plus preferred proven
+    required requirements responsibilities role skills strong team teams using work working year years
+    well within across etc e.g i.e per know knows understand understanding need needs want other others
+    """.split()
+)
+# Seniority and generic job titles: they name the position rather than anything a resume should cover.
+_ROLE_WORDS = frozenset(
+    """
+    senior junior mid entry level lead principal staff head intern associate engineer engineers
+    engineering developer developers specialist position positions remote hybrid
+    """.split()
+)
+
+
+class AhoCorasick:
+    """Token-level Aho-Corasick automaton mapping token sequences to payload values."""
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, tokens: Sequence[str], value: Any) -> None:
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = nxt
+        self._outputs[state].append((len(tokens), value))
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(token, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._outputs[nxt] = self._outputs[nxt] + self._outputs[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter_matches(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` for every pattern occurrence in ``tokens``."""
+
+        if not self._built:
+            self.build()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for index, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for length, value in outputs[state]:
+                yield index - length + 1, index + 1, value
+
+    def longest_matches(self, tokens: Sequence[str]) -> List[Tuple[int, int, Any]]:
+        """Non-overlapping matches, left to right, preferring the longest pattern at each start."""
+
+        matches = sorted(self.iter_matches(tokens), key=lambda match: (match[0], match[0] - match[1]))
+        chosen: List[Tuple[int, int, Any]] = []
+        covered_until = 0
+        for start, end, value in matches:
+            if start >= covered_until:
+                chosen.append((start, end, value))
+                covered_until = end
+        return chosen
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercased, stopword-free tokens; sentence punctuation never ends a token (``docker.``)."""
+
+    return tokenize(text)
+
+
+def _alias_patterns(synonyms: Mapping[str, Iterable[str]]) -> Iterator[Tuple[Tuple[str, ...], str]]:
+    for canonical, aliases in synonyms.items():
+        for surface in (canonical, *aliases):
+            tokens = tuple(normalize_tokens(surface))
+            if tokens:
+                yield tokens, canonical
+
+
+def _is_salient_word(token: str) -> bool:
+    """Plain words only: numbers and fragments such as ``5+`` or ``2024.`` are never keywords."""
+
+    return len(token) >= 2 and token.isalpha() and token not in _BOILERPLATE and token not in _ROLE_WORDS
+
+
+class KeywordMatcher:
+    """Scores resume coverage of weighted job description keywords.
+
+    Known skills and their synonyms come from the skill taxonomy (:mod:`src.utils.skills`) unless
+    ``synonyms`` is given, so keyword scoring and skill extraction recognise the same skills.
+    """
+
+    def __init__(self, synonyms: Optional[Mapping[str, Iterable[str]]] = None, max_terms: int = 30) -> None:
+        if synonyms is None:
+            # Imported here because the skills module builds on this one's automaton.
+            from src.utils.skills import get_skill_taxonomy
+
+            synonyms = get_skill_taxonomy().aliases
+        self.synonyms = {canonical: tuple(aliases) for canonical, aliases in synonyms.items()}
+        self.max_terms = max_terms
+        self._skills = AhoCorasick()
+        for tokens, canonical in _alias_patterns(self.synonyms):
+            self._skills.add(tokens, canonical)
+        self._skills.build()
+
+    def skills_in(self, tokens: Sequence[str]) -> List[Tuple[int, int, str]]:
+        """Known-skill occurrences in ``tokens``, preferring the longest match at each position."""
+
+        return self._skills.longest_matches(tokens)
+
+    def job_terms(self, job_description: str) -> Dict[str, float]:
+        """Weighted job description terms: known skills (canonical form) plus salient words."""
+
+        sentences = [sentence for sentence in _SENTENCE_SPLIT.split(job_description) if sentence.strip()]
+        term_frequency: Dict[str, int] = {}
+        document_frequency: Dict[str, int] = {}
+        skills: Set[str] = set()
+        for sentence in sentences:
+            tokens = normalize_tokens(sentence)
+            seen: Set[str] = set()
+            skill_positions: Set[int] = set()
+            for start, end, canonical in self.skills_in(tokens):
+                skills.add(canonical)
+                seen.add(canonical)
+                term_frequency[canonical] = term_frequency.get(canonical, 0) + 1
+                skill_positions.update(range(start, end))
+            for position, token in enumerate(tokens):
+                if position in skill_positions or not _is_salient_word(token):
+                    continue
+                seen.add(token)
+                term_frequency[token] = term_frequency.get(token, 0) + 1
+            for term in seen:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+
+        total = max(len(sentences), 1)
+        weights = {
+            term: (1.0 + math.log(count)) * (math.log((1 + total) / (1 + document_frequency[term])) + 1.0)
+            * (2.0 if term in skills else 1.0)
+            for term, count in term_frequency.items()
+        }
+        ranked = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[: self.max_terms]
+        return dict(ranked)
+
+    def score(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+        """Return ``jd_match``, ``matched_keywords`` and ``missing_keywords`` for the pair."""
+
+        terms = self.job_terms(job_description)
+        if not terms:
+            return {"jd_match": "0%", "matched_keywords": [], "missing_keywords": []}
+
+        automaton = AhoCorasick()
+        for term in terms:
+            surfaces = (term, *self.synonyms.get(term, ()))
+            for surface in surfaces:
+                tokens = tuple(normalize_tokens(surface))
+                if tokens:
+                    automaton.add(tokens, term)
+        found = {term for _, _, term in automaton.build().iter_matches(normalize_tokens(resume_text))}
+
+        total_weight = sum(terms.values())
+        matched_weight = sum(weight for term, weight in terms.items() if term in found)
+        return {
+            "jd_match": f"{round(100 * matched_weight / total_weight)}%",
+            "matched_keywords": [term for term in terms if term in found],
+            "missing_keywords": [term for term in terms if term not in found],
+        }
+
+
+_default_matcher: Optional[KeywordMatcher] = None
+_default_matcher_aliases: Optional[Mapping[str, Tuple[str, ...]]] = None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Process-wide matcher for the default skill taxonomy, rebuilt only when that taxonomy is replaced."""
+
+    global _default_matcher, _default_matcher_aliases
+    from src.utils.skills import get_skill_taxonomy
+
+    aliases = get_skill_taxonomy().aliases
+    if _default_matcher is None or aliases is not _default_matcher_aliases:
+        _default_matcher = KeywordMatcher(aliases)
+        _default_matcher_aliases = aliases
+    return _default_matcher
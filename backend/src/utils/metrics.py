@@ -0,0 +1,223 @@
+"""In-process request metrics with a Prometheus text exposition.
+
+Counters and fixed-bucket histograms are kept per label set (route template, stage, outcome), so
+recording a sample costs one ``bisect`` and a few additions under a lock. Quantiles (p50/p95/p99)
+are estimated from the buckets the same way Prometheus' ``histogram_quantile`` does. Values owned
+by other components (cache statistics, circuit breaker state...) are read only when ``/metrics``
+is scraped, through registered collectors.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = tuple(float(256 * 4 ** power) for power in range(8))  # 256 B .. 4 MiB
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request path of the request being served; the route label of stage spans.
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+# (name, type, help, [(labels, value)]) as produced by collectors.
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: Iterable[Tuple[str, str]]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in key)
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Linear interpolation inside the bucket holding the requested rank."""
+
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                return lower + (self.bounds[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+
+class Counter:
+    """Monotonic counter family."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Fixed-bucket histogram family."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[LabelKey, _Buckets] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Buckets(self.buckets)
+            series.observe(value)
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series.count if series else 0
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """``{"label=value,...": {count, sum, p50, p95, p99}}`` for every series."""
+
+        report: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                entry: Dict[str, Any] = {"count": series.count, "sum": round(series.total, 6)}
+                for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+                    estimate = series.quantile(fraction)
+                    entry[name] = round(estimate, 6) if estimate is not None else None
+                report[",".join(f"{name}={value}" for name, value in key)] = entry
+        return report
+
+    def expose(self) -> List[str]:
+        lines: List[str] = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), series.counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(key + (("le", _format_value(bound)),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series.total)}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Owns metric families and scrape-time collectors and renders them for Prometheus."""
+
+    def __init__(self) -> None:
+        self._families: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._families.setdefault(name, Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._families.setdefault(name, Histogram(name, documentation, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            lines.extend(family.expose())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route template, method and status.")
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time until the response starts (headers sent) by route template.",
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_duration_seconds",
+    "Time spent in hot-path stages (pdf_extract, compaction, prompt_build, model_call, json_decode...).",
+)
+MODEL_PROMPT_BYTES = REGISTRY.histogram("model_prompt_bytes", "Prompt size sent upstream per call.", SIZE_BUCKETS)
+MODEL_RESPONSE_BYTES = REGISTRY.histogram("model_response_bytes", "Model response size per call.", SIZE_BUCKETS)
+MODEL_TOKENS = REGISTRY.counter(
+    "model_tokens_total", "Estimated model tokens by route and direction (prompt or response)."
+)
+MODEL_COST = REGISTRY.counter("model_cost_usd_total", "Estimated model spend in USD by route.")
+RESPONSE_CACHE_LOOKUPS = REGISTRY.counter(
+    "response_cache_lookups_total", "Model response cache lookups by route and result (hit or miss)."
+)
+
+
+def span(stage: str) -> Any:
+    """Time a block as ``stage`` of the current route."""
+
+    return STAGE_SECONDS.time(route=current_route.get() or "none", stage=stage)
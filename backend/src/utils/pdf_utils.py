@@ -1,17 +1,191 @@
-import PyPDF2 as pdf
+import contextlib
+import io
+import mmap
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_text_from_pdf(uploaded_file):
+from src.utils.cpus import available_cpus
+
+MAX_PDF_PAGES = 120
+MAX_PDF_BYTES = 15 * 1024 * 1024
+PARALLEL_PAGE_THRESHOLD = 24
+PAGES_PER_TASK = 8
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+class PDFLimitError(ValueError):
+    """Raised when an uploaded PDF exceeds the configured page or byte limits"""
+
+
+def load_pdf_library():
+    """Import PyPDF2 on first use so importing this module (and the API) stays cheap
+
+    Returns:
+        module: The ``PyPDF2`` module
+    """
+    import PyPDF2
+
+    return PyPDF2
+
+
+def __getattr__(name):
+    # ``pdf_utils.pdf`` remains the PyPDF2 module for callers and tests that patch through it.
+    if name == "pdf":
+        return load_pdf_library()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _source_size(uploaded_file):
+    """Best-effort byte size of a path, bytes object or file-like; ``None`` when unknown"""
+    if isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        return len(uploaded_file)
+    if isinstance(uploaded_file, str):
+        return os.path.getsize(uploaded_file)
+    if isinstance(uploaded_file, io.BytesIO):
+        return uploaded_file.getbuffer().nbytes
+    try:
+        size = os.fstat(uploaded_file.fileno()).st_size
+    except (AttributeError, OSError, TypeError, ValueError, io.UnsupportedOperation):
+        return None
+    return size if isinstance(size, int) else None
+
+
+@contextlib.contextmanager
+def _open_reader(uploaded_file, max_pages, max_bytes):
+    """Open a ``PdfReader``, memory-mapping path sources instead of reading them into memory"""
+    size = _source_size(uploaded_file)
+    if max_bytes is not None and size is not None and size > max_bytes:
+        raise PDFLimitError(f"PDF is {size} bytes; the limit is {max_bytes} bytes")
+    with contextlib.ExitStack() as stack:
+        if isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+            uploaded_file = io.BytesIO(uploaded_file)
+        elif isinstance(uploaded_file, str) and size:
+            handle = stack.enter_context(open(uploaded_file, "rb"))
+            uploaded_file = stack.enter_context(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+        reader = load_pdf_library().PdfReader(uploaded_file)
+        page_count = len(reader.pages)
+        if max_pages is not None and page_count > max_pages:
+            raise PDFLimitError(f"PDF has {page_count} pages; the limit is {max_pages} pages")
+        yield reader
+
+
+def iter_pdf_pages(uploaded_file, max_pages=MAX_PDF_PAGES, max_bytes=MAX_PDF_BYTES):
+    """Yield the text of a PDF one page at a time
+
+    Args:
+        uploaded_file: A path, bytes object or binary file-like holding the PDF
+        max_pages: Reject documents with more pages than this
+        max_bytes: Reject documents larger than this many bytes
+
+    Yields:
+        str: Extracted text of each page, in order
+
+    Raises:
+        PDFLimitError: If the document exceeds ``max_pages`` or ``max_bytes``
+    """
+    with _open_reader(uploaded_file, max_pages, max_bytes) as reader:
+        for page in reader.pages:
+            yield str(page.extract_text())
+
+
+def _extract_page_range(source, start, stop):
+    """Worker entry point: extract pages ``[start, stop)`` from a path or bytes"""
+    with _open_reader(source, None, None) as reader:
+        return [str(reader.pages[index].extract_text()) for index in range(start, stop)]
+
+
+def configure_pool(max_workers):
+    """Set the size of the page-extraction process pool; 0 sizes it to the available CPUs
+
+    Must be called before the first parallel extraction. Each server worker process owns a pool,
+    so with several workers this should be ``CPUs // workers`` to avoid workers x CPUs processes.
+
+    Args:
+        max_workers (int): Pool size, or 0 for one process per available CPU
+    """
+    global _pool_workers
+    _pool_workers = max(0, int(max_workers))
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork: extraction is requested from server threads.
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_workers or available_cpus(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+@contextlib.contextmanager
+def _parallel_source(uploaded_file):
+    """Yield a path worker processes can reopen the PDF from, or ``None`` when there is none
+
+    In-memory documents are written to a temporary file once, removed on exit, so each page-range
+    task pickles a short path instead of another copy of the whole document.
+    """
+    if isinstance(uploaded_file, str):
+        yield uploaded_file
+        return
+    if isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        data = uploaded_file
+    elif isinstance(uploaded_file, io.BytesIO):
+        data = uploaded_file.getbuffer()
+    else:
+        name = getattr(uploaded_file, "name", None)
+        yield name if isinstance(name, str) and os.path.isfile(name) else None
+        return
+    with tempfile.NamedTemporaryFile(prefix="pdf-", suffix=".pdf", delete=False) as handle:
+        handle.write(data)
+    del data  # release the BytesIO buffer export
+    try:
+        yield handle.name
+    finally:
+        os.unlink(handle.name)
+
+
+def extract_text_from_pdf(
+    uploaded_file,
+    max_pages=MAX_PDF_PAGES,
+    max_bytes=MAX_PDF_BYTES,
+    parallel_threshold=PARALLEL_PAGE_THRESHOLD,
+):
     """Extract text from a PDF file
-    
+
+    Documents with at least ``parallel_threshold`` pages are split into page ranges and extracted
+    across a process pool; smaller ones are extracted in-process.
+
     Args:
-        uploaded_file: The uploaded PDF file
-        
+        uploaded_file: The uploaded PDF file (path, bytes or binary file-like); paths are
+            memory-mapped rather than read into memory
+        max_pages: Reject documents with more pages than this
+        max_bytes: Reject documents larger than this many bytes
+        parallel_threshold: Minimum page count that triggers process-pool extraction
+
     Returns:
         str: Extracted text from the PDF
+
+    Raises:
+        PDFLimitError: If the document exceeds ``max_pages`` or ``max_bytes``
     """
-    reader = pdf.PdfReader(uploaded_file)
-    text = ""
-    for page in range(len(reader.pages)):
-        page = reader.pages[page]
-        text += str(page.extract_text())
-    return text
+    with contextlib.ExitStack() as stack:
+        reader = stack.enter_context(_open_reader(uploaded_file, max_pages, max_bytes))
+        page_count = len(reader.pages)
+        source = stack.enter_context(_parallel_source(uploaded_file)) if page_count >= parallel_threshold else None
+        if source is None:
+            return "".join(str(page.extract_text()) for page in reader.pages)
+
+        pool = _get_pool()
+        futures = [
+            pool.submit(_extract_page_range, source, start, min(start + PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PAGES_PER_TASK)
+        ]
+        return "".join(text for future in futures for text in future.result())
@@ -1,8 +1,28 @@
-"""Prompt builders for AI Career Copilot features."""
+"""Prompt builders for AI Career Copilot features.
+
+Every prompt starts with a static prefix (the shared preamble plus the feature's task instructions)
+followed by :data:`PROMPT_INPUT_MARKER` and the request-specific input. Keeping the stable part first
+lets the model layer send it once as a system instruction or provider-side cached context.
+"""
 
 from __future__ import annotations
 
-from typing import Sequence
+import json
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+PROMPT_INPUT_MARKER = "\n=== INPUT ===\n"
+
+
+def split_prompt(prompt: str) -> Tuple[Optional[str], str]:
+    """Split a prompt into its static prefix and request-specific input.
+
+    Returns ``(None, prompt)`` for prompts without an input marker.
+    """
+
+    prefix, marker, remainder = prompt.partition(PROMPT_INPUT_MARKER)
+    if not marker:
+        return None, prompt
+    return prefix.rstrip(), remainder
 
 
 def _build_system_preamble() -> str:
@@ -15,6 +35,23 @@ def _build_system_preamble() -> str:
     )
 
 
+def _known_skills_block(**skill_lists: Optional[Sequence[str]]) -> str:
+    """Render locally extracted skills so the model builds on them instead of rediscovering them."""
+
+    lines = [
+        f"{label.replace('_', ' ').capitalize()}: {', '.join(skills) if skills else 'none detected'}"
+        for label, skills in skill_lists.items()
+        if skills is not None
+    ]
+    if not lines:
+        return ""
+    return (
+        "Skills already extracted from a curated taxonomy (treat as verified; add only skills not listed):\n"
+        + "\n".join(lines)
+        + "\n"
+    )
+
+
 def get_ats_evaluation_prompt(resume_text: str, job_description: str) -> str:
     """Legacy ATS evaluation prompt used by the /analyze endpoint."""
 
@@ -24,7 +61,7 @@ def get_ats_evaluation_prompt(resume_text: str, job_description: str) -> str:
         "Task: Evaluate resume alignment with the job description. Return JSON with keys\n"
         "`jd_match` (percentage string), `missing_keywords` (array of strings), and `profile_summary`\n"
         "(concise paragraph).\n"
-        f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
     )
 
 
@@ -43,13 +80,22 @@ def get_resume_rewrite_prompt(
         "Task: Rewrite the resume to match the job description. Emphasize quantifiable achievements, ATS "
         "compliance, and cohesive narrative. Return JSON with keys `rewritten_resume` (markdown string),\n"
         "`key_adjustments` (array of strings), and `keyword_alignment_score` (percentage string).\n"
-        f"DesiredTone: {tone}\nTargetRole: {focus_role}\n"
+        f"{PROMPT_INPUT_MARKER}DesiredTone: {tone}\nTargetRole: {focus_role}\n"
         f"OriginalResume:\n{resume_text}\n\nJobDescription:\n{job_description}"
     )
 
 
-def get_skill_gap_prompt(resume_text: str, job_description: str) -> str:
-    """Prompt that surfaces skill gaps and learning resources."""
+def get_skill_gap_prompt(
+    resume_text: str,
+    job_description: str,
+    *,
+    known_skills: Optional[Dict[str, Sequence[str]]] = None,
+) -> str:
+    """Prompt that surfaces skill gaps and learning resources.
+
+    ``known_skills`` (``resume_skills``/``job_skills``/``missing_skills`` lists) seeds the prompt with
+    skills matched locally against the taxonomy.
+    """
 
     preamble = _build_system_preamble()
     return (
@@ -57,6 +103,7 @@ def get_skill_gap_prompt(resume_text: str, job_description: str) -> str:
         "Task: Identify critical hard and soft skills missing from the resume when compared with the job description.\n"
         "Include JSON keys `missing_hard_skills`, `missing_soft_skills`, and `course_recommendations` (each item "
         "having `name`, `provider`, `url`).\n"
+        f"{PROMPT_INPUT_MARKER}{_known_skills_block(**(known_skills or {}))}"
         f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
     )
 
@@ -69,7 +116,7 @@ def get_achievement_quantifier_prompt(resume_text: str) -> str:
         f"{preamble}\n\n"
         "Task: Rewrite resume bullets with measurable impact. Provide JSON with `quantified_bullets` (array of "
         "strings) and `methodology_notes` (array explaining assumptions).\n"
-        f"Resume:\n{resume_text}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}"
     )
 
 
@@ -81,7 +128,7 @@ def get_role_fit_prompt(resume_text: str, job_description: str) -> str:
         f"{preamble}\n\n"
         "Task: Compute role fit. Return JSON with `overall_fit`, `skill_alignment`, `experience_alignment`, "
         "`growth_potential` (percentage strings), and `insights` (array of strings).\n"
-        f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
     )
 
 
@@ -98,7 +145,8 @@ def get_cover_letter_prompt(
         f"{preamble}\n\n"
         "Task: Draft a compelling one-page cover letter tailored to the job description and resume."
         " Provide JSON with `cover_letter` (markdown string) and `talking_points` (array of bullets).\n"
-        f"ApplicantContext:\n{context_lines}\n\nResume:\n{resume_text}\n\nJob Description:\n{job_description}"
+        f"{PROMPT_INPUT_MARKER}ApplicantContext:\n{context_lines}\n\n"
+        f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
     )
 
 
@@ -113,7 +161,7 @@ def get_career_coach_prompt(message_history: Sequence[dict[str, str]]) -> str:
         f"{preamble}\n\n"
         "Task: Continue the coaching conversation with clear, actionable guidance. Return JSON with `reply` "
         "(string) and `suggested_next_questions` (array of strings).\n"
-        f"ConversationHistory:\n{history_block}"
+        f"{PROMPT_INPUT_MARKER}ConversationHistory:\n{history_block}"
     )
 
 
@@ -126,7 +174,7 @@ def get_career_path_prompt(resume_text: str) -> str:
         "Task: Suggest next-step career moves, salary bands, and rationale. Include JSON keys "
         "`recommended_roles` (array of objects with `title`, `salary_range`, `confidence`), `upskilling_paths` (array),"
         " and `long_term_projection`.\n"
-        f"Resume:\n{resume_text}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}"
     )
 
 
@@ -138,7 +186,7 @@ def get_job_market_prompt(target_role: str, location: str) -> str:
         f"{preamble}\n\n"
         "Task: Summarize hiring demand, trending skills, and top industries for the role and location."
         " Output JSON with `demand_level`, `top_skills`, `emerging_roles`, and `market_commentary`.\n"
-        f"Role: {target_role}\nLocation: {location}"
+        f"{PROMPT_INPUT_MARKER}Role: {target_role}\nLocation: {location}"
     )
 
 
@@ -150,7 +198,7 @@ def get_job_parser_prompt(job_description: str) -> str:
         f"{preamble}\n\n"
         "Task: Parse the job description into JSON with `title`, `company`, `employment_type`, `responsibilities` (array), "
         "`required_skills`, `preferred_skills`, and `keywords`.\n"
-        f"JobDescription:\n{job_description}"
+        f"{PROMPT_INPUT_MARKER}JobDescription:\n{job_description}"
     )
 
 
@@ -162,7 +210,7 @@ def get_ats_check_prompt(resume_text: str, job_description: str) -> str:
         f"{preamble}\n\n"
         "Task: Simulate ATS screening across Workday, Lever, and Greenhouse. Provide JSON with `scores` (object keyed by "
         "platform with percentage strings), `formatting_issues` (array), and `recommendations` (array).\n"
-        f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
     )
 
 
@@ -174,7 +222,7 @@ def get_one_click_optimization_prompt(resume_text: str, job_description: str) ->
         f"{preamble}\n\n"
         "Task: Produce optimization highlights, keyword matches, and tailored elevator pitch. Return JSON with "
         "`optimized_summary`, `priority_edits`, and `keyword_matches`.\n"
-        f"Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\n\nJob Description:\n{job_description}"
     )
 
 
@@ -186,11 +234,16 @@ def get_job_alerts_prompt(resume_text: str, target_role: str, location: str) ->
         f"{preamble}\n\n"
         "Task: Suggest three hypothetical job postings with ≥90% fit. Provide JSON array `job_alerts` containing objects "
         "with `company`, `title`, `match_score`, `reasoning`, and `apply_link_placeholder`.\n"
-        f"Resume:\n{resume_text}\nTargetRole: {target_role}\nLocation: {location}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\nTargetRole: {target_role}\nLocation: {location}"
     )
 
 
-def get_visualization_prompt(resume_text: str, job_description: str) -> str:
+def get_visualization_prompt(
+    resume_text: str,
+    job_description: str,
+    *,
+    known_skills: Optional[Dict[str, Sequence[str]]] = None,
+) -> str:
     """Prompt for generating data used in visualization widgets."""
 
     preamble = _build_system_preamble()
@@ -199,21 +252,33 @@ def get_visualization_prompt(resume_text: str, job_description: str) -> str:
         "Task: Create data for skill heatmap, keyword cloud, and progress tracker. Return JSON with `skill_heatmap` "
         "(array of {skill, proficiency, demand}), `keyword_cloud` (array of {keyword, frequency}), and "
         "`progress_tracker` (array of milestones).\n"
+        f"{PROMPT_INPUT_MARKER}{_known_skills_block(**(known_skills or {}))}"
         f"Resume:\n{resume_text}\nJob Description:\n{job_description}"
     )
 
 
-def get_recruiter_api_prompt(resume_batch: Sequence[str], job_description: str) -> str:
-    """Prompt for recruiter bulk screening workflow."""
+def get_recruiter_api_prompt(
+    resume_batch: Sequence[str],
+    job_description: str,
+    *,
+    start_index: int = 0,
+) -> str:
+    """Prompt for recruiter bulk screening workflow.
+
+    ``start_index`` offsets the resume labels so chunks of a larger batch keep globally unique ids.
+    """
 
     preamble = _build_system_preamble()
-    resumes_block = "\n\n".join(f"Resume_{idx + 1}:\n{resume}" for idx, resume in enumerate(resume_batch))
+    resumes_block = "\n\n".join(
+        f"Resume_{start_index + idx + 1}:\n{resume}" for idx, resume in enumerate(resume_batch)
+    )
     return (
         f"{preamble}\n\n"
         "Task: Score multiple resumes against the job description and produce a ranking matrix. Return JSON with\n"
-        "`candidate_rankings` (array of objects containing `candidate_id`, `overall_score`, `strengths`, `risks`) "
+        "`candidate_rankings` (array of objects containing `candidate_id` (the resume label, e.g. `Resume_1`), "
+        "`overall_score`, `strengths`, `risks`) "
         "and `skill_matrix` (array keyed by skill with coverage percentage).\n"
-        f"JobDescription:\n{job_description}\n\nResumes:\n{resumes_block}"
+        f"{PROMPT_INPUT_MARKER}JobDescription:\n{job_description}\n\nResumes:\n{resumes_block}"
     )
 
 
@@ -225,23 +290,39 @@ def get_orchestration_prompt(objective: str, context: str) -> str:
         f"{preamble}\n\n"
         "Task: Produce a step-by-step reasoning plan that references external tools when needed. Provide JSON with\n"
         "`steps` (array of strings) and `tool_calls` (array of objects containing `tool` and `purpose`).\n"
-        f"Objective:\n{objective}\nContext:\n{context}"
+        f"{PROMPT_INPUT_MARKER}Objective:\n{objective}\nContext:\n{context}"
     )
 
 
-def get_embeddings_prompt(resume_text: str, job_description: str) -> str:
-    """Prompt describing embeddings-driven semantic similarity results."""
+def get_embeddings_prompt(
+    resume_text: str,
+    job_description: str,
+    similarity_report: Optional[dict[str, Any]] = None,
+) -> str:
+    """Prompt describing embeddings-driven semantic similarity results.
+
+    When ``similarity_report`` (the locally computed similarity) is supplied, the model is asked to
+    explain it rather than to estimate a score itself.
+    """
 
     preamble = _build_system_preamble()
+    if similarity_report is None:
+        return (
+            f"{preamble}\n\n"
+            "Task: Explain semantic similarity insights between resume and job description. Return JSON with `semantic_similarity_score`,\n"
+            "`top_matching_segments`, and `gap_segments`.\n"
+            f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\nJob Description:\n{job_description}"
+        )
     return (
         f"{preamble}\n\n"
-        "Task: Explain semantic similarity insights between resume and job description. Return JSON with `semantic_similarity_score`,\n"
-        "`top_matching_segments`, and `gap_segments`.\n"
+        "Task: Explain the precomputed embedding similarity analysis below in plain language. Do not recompute the "
+        "score. Return JSON with `explanation` (string) and `recommendations` (array of strings).\n"
+        f"{PROMPT_INPUT_MARKER}SimilarityAnalysis:\n{json.dumps(similarity_report)}\n\n"
         f"Resume:\n{resume_text}\nJob Description:\n{job_description}"
     )
 
 
-def get_knowledge_graph_prompt(resume_text: str) -> str:
+def get_knowledge_graph_prompt(resume_text: str, *, resume_skills: Optional[Sequence[str]] = None) -> str:
     """Prompt to infer a skill knowledge graph blueprint."""
 
     preamble = _build_system_preamble()
@@ -249,6 +330,7 @@ def get_knowledge_graph_prompt(resume_text: str) -> str:
         f"{preamble}\n\n"
         "Task: Build a lightweight knowledge graph of skills and related roles. Return JSON with `nodes` (array) and\n"
         "`edges` (array with `source`, `target`, `strength`).\n"
+        f"{PROMPT_INPUT_MARKER}{_known_skills_block(resume_skills=resume_skills)}"
         f"Resume:\n{resume_text}"
     )
 
@@ -261,7 +343,7 @@ def get_ocr_prompt(resume_text: str) -> str:
         f"{preamble}\n\n"
         "Task: Describe OCR extraction confidence and detected sections from the provided raw OCR text. Provide JSON"
         " with `confidence`, `sections` (array of {title, content}), and `cleanup_recommendations`.\n"
-        f"OCRText:\n{resume_text}"
+        f"{PROMPT_INPUT_MARKER}OCRText:\n{resume_text}"
     )
 
 
@@ -273,7 +355,7 @@ def get_portfolio_prompt(resume_text: str) -> str:
         f"{preamble}\n\n"
         "Task: Outline a personal career portfolio structure based on resume achievements. Return JSON with "
         "`site_structure`, `highlight_projects`, and `call_to_actions`.\n"
-        f"Resume:\n{resume_text}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}"
     )
 
 
@@ -285,7 +367,7 @@ def get_interview_readiness_prompt(job_description: str, resume_text: str) -> st
         f"{preamble}\n\n"
         "Task: Generate likely interview questions and readiness plan. Return JSON with `behavioral_questions`, "
         "`technical_questions`, and `prep_tips`.\n"
-        f"Resume:\n{resume_text}\nJob Description:\n{job_description}"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\nJob Description:\n{job_description}"
     )
 
 
@@ -297,7 +379,7 @@ def get_salary_benchmark_prompt(role: str, location: str, experience_years: floa
         f"{preamble}\n\n"
         "Task: Provide salary benchmarking insights. Return JSON with `median_salary`, `percentile_25`, "
         "`percentile_75`, and `data_sources`.\n"
-        f"Role: {role}\nLocation: {location}\nExperienceYears: {experience_years}"
+        f"{PROMPT_INPUT_MARKER}Role: {role}\nLocation: {location}\nExperienceYears: {experience_years}"
     )
 
 
@@ -310,11 +392,16 @@ def get_linkedin_sync_prompt(profile_text: str) -> str:
         "Task: Transform the LinkedIn profile into a resume-ready structure with ATS-friendly formatting."
         " Return JSON with `resume_summary`, `experience_sections` (array of {title, bullets}),"
         " `skills_matrix` (array of {skill, proficiency}), and `optimization_tips`.\n"
-        f"LinkedInProfile:\n{profile_text}"
+        f"{PROMPT_INPUT_MARKER}LinkedInProfile:\n{profile_text}"
     )
 
 
-def get_chrome_extension_prompt(job_description: str, resume_text: str) -> str:
+def get_chrome_extension_prompt(
+    job_description: str,
+    resume_text: str,
+    *,
+    known_skills: Optional[Dict[str, Sequence[str]]] = None,
+) -> str:
     """Prompt powering the Chrome extension keyword highlighter."""
 
     preamble = _build_system_preamble()
@@ -323,6 +410,7 @@ def get_chrome_extension_prompt(job_description: str, resume_text: str) -> str:
         "Task: Compare the job description with the resume and highlight missing or low-frequency keywords."
         " Return JSON with `missing_keywords`, `highlight_sections` (array of {section, keywords}),"
         " and `action_items`.\n"
+        f"{PROMPT_INPUT_MARKER}{_known_skills_block(**(known_skills or {}))}"
         f"JobDescription:\n{job_description}\n\nResume:\n{resume_text}"
     )
 
@@ -339,7 +427,7 @@ def get_multi_resume_manager_prompt(resume_variants: Sequence[str], job_descript
         "Task: Compare the provided resume variants against the job description."
         " Return JSON with `best_variant_id`, `variant_scores` (array of {variant_id, score}),"
         " and `improvement_notes` (array of strings).\n"
-        f"JobDescription:\n{job_description}\n\nResumes:\n{variants_block}"
+        f"{PROMPT_INPUT_MARKER}JobDescription:\n{job_description}\n\nResumes:\n{variants_block}"
     )
 
 
@@ -364,7 +452,7 @@ def get_career_progress_tracker_prompt(
         "Task: Analyze career progress and provide actionable insights. Return JSON with `progress_score` "
         "(percentage string), `milestones_achieved` (array of strings), `next_milestones` (array of strings), "
         "`skill_development_plan` (array of {skill, priority, timeline}), and `career_trajectory_summary` (string).\n"
-        f"Resume:\n{resume_text}\n\n"
+        f"{PROMPT_INPUT_MARKER}Resume:\n{resume_text}\n\n"
         f"Certifications:\n{certs_block}\n\n"
         f"Skills Acquired:\n{skills_block}\n\n"
         f"Job Applications:\n{apps_block}"
@@ -0,0 +1,51 @@
+"""Single-flight deduplication for concurrent identical async calls."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call between every caller that asks for the same key.
+
+    The first caller for a key starts the work as a task; callers arriving while it runs await the
+    same task. The entry is dropped as soon as the task settles, so failures are never remembered and
+    the next caller retries. Each caller waits through ``asyncio.shield`` so a cancelled waiter (even
+    the one that started the call) does not cancel the work for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Task[T]"] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run ``fn`` once per key at a time; return ``(result, shared)``."""
+
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: str, task: "asyncio.Task[T]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every waiter was cancelled.
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
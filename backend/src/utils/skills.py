@@ -0,0 +1,195 @@
+"""Skill taxonomy and local skill extraction.
+
+The taxonomy maps canonical skill names to a category and their aliases. It is compiled once into
+a token-level Aho-Corasick automaton (a trie with failure links), so extracting every known skill
+from a document is a single pass over its tokens regardless of taxonomy size.
+
+A custom taxonomy can be supplied as JSON shaped like :data:`DEFAULT_TAXONOMY`:
+``{"category": {"canonical skill": ["alias", ...]}}``.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from src.utils.keywords import AhoCorasick, normalize_tokens
+
+DEFAULT_TAXONOMY: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "programming_languages": {
+        "python": ("py",),
+        "java": (),
+        "javascript": ("js", "ecmascript"),
+        "typescript": ("ts",),
+        "golang": ("go lang",),
+        "rust": (),
+        "c++": ("cpp",),
+        "c#": ("csharp", "c sharp"),
+        "ruby": (),
+        "php": (),
+        "kotlin": (),
+        "swift": (),
+        "scala": (),
+        "r programming": ("rstats",),
+        "sql": (),
+        "bash": ("shell scripting",),
+    },
+    "frameworks": {
+        "react": ("react.js", "reactjs"),
+        "angular": ("angularjs",),
+        "vue": ("vue.js", "vuejs"),
+        "next.js": ("nextjs",),
+        "node.js": ("node", "nodejs"),
+        "express": ("express.js", "expressjs"),
+        "django": (),
+        "flask": (),
+        "fastapi": (),
+        "spring boot": (),
+        "ruby on rails": ("rails",),
+        ".net": ("dotnet", "asp.net"),
+        "pytorch": (),
+        "tensorflow": (),
+        "scikit-learn": ("sklearn", "scikit learn"),
+        "pandas": (),
+        "numpy": (),
+        "graphql": (),
+    },
+    "data": {
+        "postgresql": ("postgres", "psql"),
+        "mysql": (),
+        "mongodb": ("mongo",),
+        "redis": (),
+        "elasticsearch": ("elastic search",),
+        "apache kafka": ("kafka",),
+        "apache spark": ("spark", "pyspark"),
+        "apache airflow": ("airflow",),
+        "snowflake": (),
+        "bigquery": (),
+        "dbt": (),
+        "tableau": (),
+        "power bi": ("powerbi",),
+        "excel": ("microsoft excel",),
+        "data modeling": ("data modelling",),
+        "etl": ("elt",),
+    },
+    "cloud_devops": {
+        "amazon web services": ("aws",),
+        "google cloud platform": ("gcp", "google cloud"),
+        "microsoft azure": ("azure",),
+        "docker": (),
+        "kubernetes": ("k8s",),
+        "terraform": (),
+        "ansible": (),
+        "continuous integration": ("ci", "ci/cd", "cicd"),
+        "github actions": (),
+        "jenkins": (),
+        "linux": (),
+        "amazon s3": ("s3",),
+        "serverless": ("aws lambda", "lambda functions"),
+        "prometheus": (),
+        "grafana": (),
+        "microservices": ("microservice architecture",),
+    },
+    "ai_ml": {
+        "machine learning": ("ml",),
+        "deep learning": (),
+        "artificial intelligence": ("ai",),
+        "natural language processing": ("nlp",),
+        "computer vision": (),
+        "large language models": ("llm", "llms"),
+        "mlops": (),
+        "statistics": ("statistical analysis",),
+        "data analysis": ("data analytics",),
+    },
+    "design_product": {
+        "user experience": ("ux",),
+        "user interface": ("ui",),
+        "figma": (),
+        "product management": (),
+        "a/b testing": ("ab testing", "split testing"),
+        "agile": ("scrum", "kanban"),
+        "jira": (),
+    },
+    "soft_skills": {
+        "leadership": ("team lead", "led a team"),
+        "communication": ("communication skills",),
+        "mentoring": ("mentorship", "coaching"),
+        "stakeholder management": (),
+        "project management": (),
+        "problem solving": ("problem-solving",),
+        "collaboration": ("cross-functional collaboration",),
+    },
+}
+
+
+class SkillTaxonomy:
+    """A compiled skill taxonomy that extracts canonical skills from free text."""
+
+    def __init__(self, taxonomy: Mapping[str, Mapping[str, Iterable[str]]]) -> None:
+        self.categories: Dict[str, str] = {}
+        # Canonical skill -> aliases; also the synonym table of the keyword matcher.
+        self.aliases: Dict[str, Tuple[str, ...]] = {}
+        self._automaton = AhoCorasick()
+        for category, skills in taxonomy.items():
+            for canonical, aliases in skills.items():
+                self.categories[canonical] = category
+                self.aliases[canonical] = tuple(aliases)
+                for surface in {canonical, *aliases}:
+                    tokens = tuple(normalize_tokens(surface))
+                    if tokens:
+                        self._automaton.add(tokens, canonical)
+        self._automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillTaxonomy":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls(json.load(handle))
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in ``text``, most frequent first (ties by first mention)."""
+
+        counts: Dict[str, int] = {}
+        for _, _, canonical in self._automaton.longest_matches(normalize_tokens(text)):
+            counts[canonical] = counts.get(canonical, 0) + 1
+        return sorted(counts, key=lambda skill: -counts[skill])
+
+    def extract_by_category(self, text: str) -> Dict[str, List[str]]:
+        grouped: Dict[str, List[str]] = {}
+        for skill in self.extract(text):
+            grouped.setdefault(self.categories[skill], []).append(skill)
+        return grouped
+
+    def compare(self, resume_text: str, job_description: str) -> Dict[str, List[str]]:
+        """Skills found in each document plus the job skills absent from the resume."""
+
+        resume_skills = self.extract(resume_text)
+        job_skills = self.extract(job_description)
+        present = set(resume_skills)
+        return {
+            "resume_skills": resume_skills,
+            "job_skills": job_skills,
+            "missing_skills": [skill for skill in job_skills if skill not in present],
+        }
+
+
+_default_taxonomy: Optional[SkillTaxonomy] = None
+
+
+def load_skill_taxonomy(path: Optional[str] = None) -> SkillTaxonomy:
+    """Compile the taxonomy at ``path`` (or the built-in one) and make it the process default."""
+
+    global _default_taxonomy
+    _default_taxonomy = SkillTaxonomy.from_file(path) if path else SkillTaxonomy(DEFAULT_TAXONOMY)
+    return _default_taxonomy
+
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy, compiled from the built-in table on first use if not yet loaded."""
+
+    if _default_taxonomy is None:
+        return load_skill_taxonomy()
+    return _default_taxonomy
+
@@ -0,0 +1,27 @@
+"""Wire formats for streaming endpoint responses."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, Tuple
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def format_ndjson(event: str, data: Any) -> str:
+    """Encode one event as a newline-delimited JSON record."""
+
+    return json.dumps({"event": event, "data": data}, separators=(",", ":")) + "\n"
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one event as a Server-Sent Events frame."""
+
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+STREAM_FORMATS: Dict[str, Tuple[Callable[[str, Any], str], str]] = {
+    "ndjson": (format_ndjson, NDJSON_MEDIA_TYPE),
+    "sse": (format_sse, SSE_MEDIA_TYPE),
+}
@@ -0,0 +1,220 @@
+"""Decoding of model JSON output: response schemas, local repair and parse-failure accounting.
+
+Models asked for JSON still occasionally wrap it in markdown fences, add trailing commas or stop
+mid-object when they hit the output limit. :func:`parse_model_json` first tries a strict parse and
+then a cheap single-pass repair, so only genuinely unusable output costs another model call. Output
+rebuilt from a cut-off response is reported as ``truncated``: it is usable but incomplete, so callers
+should not cache it.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+_FENCED_BLOCK = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?(.*?)```", re.DOTALL)
+_OPENING_FENCE = re.compile(r"^\s*```[a-zA-Z0-9_-]*\s*\n?")
+_CLOSERS = {"{": "}", "[": "]"}
+_MAX_TRUNCATION_ATTEMPTS = 16
+
+CLEAN = "clean"
+REPAIRED = "repaired"
+TRUNCATED = "truncated"
+
+
+class JSONRepairError(ValueError):
+    """Raised when model output cannot be parsed as JSON even after local repair."""
+
+
+def strip_code_fences(text: str) -> str:
+    """Return the body of the first fenced block, or ``text`` minus an unterminated opening fence."""
+
+    match = _FENCED_BLOCK.search(text)
+    if match:
+        return match.group(1)
+    return _OPENING_FENCE.sub("", text, count=1)
+
+
+def _close(chars: List[str], stack: List[str]) -> str:
+    text = "".join(chars).rstrip()
+    if text.endswith(","):
+        text = text[:-1].rstrip()
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """Best-effort repair of almost-JSON text.
+
+    Strips code fences and surrounding prose, removes trailing commas, terminates an unfinished
+    string and closes open objects/arrays. When the output was cut off mid-value, the incomplete
+    trailing member is dropped.
+    """
+
+    return _repair(text)[0]
+
+
+def _repair(text: str) -> Tuple[str, bool]:
+    """:func:`repair_json`, also reporting whether the text was cut off (had to be closed)."""
+
+    text = strip_code_fences(text)
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise JSONRepairError("No JSON object or array found in model output")
+    text = text[min(starts) :]
+
+    chars: List[str] = []
+    stack: List[str] = []
+    # (length of ``chars`` just before a separating comma, open structures at that point)
+    cut_points: List[Tuple[int, List[str]]] = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            chars.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            while chars and chars[-1] in " \t\r\n,":
+                chars.pop()
+            while stack and stack[-1] != char:
+                chars.append(stack.pop())
+            if stack:
+                stack.pop()
+            chars.append(char)
+            if not stack:
+                break
+            continue
+        elif char == ",":
+            cut_points.append((len(chars), list(stack)))
+        chars.append(char)
+
+    truncated = in_string or bool(stack)
+    if in_string:
+        if escaped:
+            chars.pop()
+        chars.append('"')
+    if not stack:
+        return "".join(chars), truncated
+
+    candidate = _close(chars, stack)
+    try:
+        json.loads(candidate)
+        return candidate, truncated
+    except json.JSONDecodeError:
+        pass
+    # The cut-off left a partial member (``"key"`` without a value, ``tru``...): fall back to
+    # the last complete member.
+    for length, open_stack in reversed(cut_points[-_MAX_TRUNCATION_ATTEMPTS:]):
+        candidate = _close(chars[:length], open_stack)
+        try:
+            json.loads(candidate)
+            return candidate, truncated
+        except json.JSONDecodeError:
+            continue
+    return candidate, truncated
+
+
+def parse_model_json(raw: str) -> Tuple[Any, str]:
+    """Parse model output, repairing it locally if needed.
+
+    Returns ``(value, outcome)`` where ``outcome`` is :data:`CLEAN`, :data:`REPAIRED` (cosmetic
+    fixes such as fences or trailing commas) or :data:`TRUNCATED` (the output was cut off and the
+    value holds only its complete part). Raises :class:`JSONRepairError` when the output is unusable.
+    """
+
+    try:
+        return json.loads(raw), CLEAN
+    except (TypeError, json.JSONDecodeError):
+        pass
+    if not isinstance(raw, str):
+        raise JSONRepairError("Model output is not text")
+    repaired, truncated = _repair(raw)
+    try:
+        return json.loads(repaired), TRUNCATED if truncated else REPAIRED
+    except json.JSONDecodeError as exc:
+        raise JSONRepairError("Model output is not valid JSON") from exc
+
+
+@functools.lru_cache(maxsize=None)
+def response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Convert a Pydantic model's JSON schema into the OpenAPI subset Gemini accepts (memoised)."""
+
+    schema = model.model_json_schema()
+    definitions = schema.get("$defs", {})
+
+    def convert(node: Dict[str, Any]) -> Dict[str, Any]:
+        if "$ref" in node:
+            node = definitions[node["$ref"].rsplit("/", 1)[-1]]
+        if "anyOf" in node:
+            options = [option for option in node["anyOf"] if option.get("type") != "null"]
+            converted = convert(options[0]) if options else {"type": "string"}
+            if len(options) < len(node["anyOf"]):
+                converted["nullable"] = True
+            return converted
+        converted: Dict[str, Any] = {"type": node.get("type", "string")}
+        for key in ("description", "enum", "format"):
+            if key in node:
+                converted[key] = node[key]
+        if converted["type"] == "object":
+            properties = node.get("properties", {})
+            if properties:
+                converted["properties"] = {name: convert(child) for name, child in properties.items()}
+                converted["required"] = list(node.get("required", properties))
+        elif converted["type"] == "array":
+            converted["items"] = convert(node.get("items", {"type": "string"}))
+        return converted
+
+    return convert(schema)
+
+
+class ParseStats:
+    """Per-endpoint counts of how model output was decoded.
+
+    ``clean`` parsed as-is, ``repaired`` needed the local repair pass (each one a model call that
+    would otherwise have been wasted), ``truncated`` was rebuilt from a cut-off response,
+    ``retried`` triggered a second model call and ``failed`` could not be decoded at all.
+    """
+
+    OUTCOMES = (CLEAN, REPAIRED, TRUNCATED, "retried", "failed")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: Optional[str], outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(endpoint or "unknown", dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report: Dict[str, Dict[str, Any]] = {}
+            for endpoint, counts in sorted(self._counts.items()):
+                responses = sum(counts.values())
+                raw_failures = responses - counts[CLEAN]
+                report[endpoint] = {
+                    **counts,
+                    "raw_parse_failure_rate": round(raw_failures / responses, 4) if responses else 0.0,
+                    "model_calls_saved": counts[REPAIRED] + counts[TRUNCATED],
+                }
+            return report
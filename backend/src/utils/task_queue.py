@@ -0,0 +1,588 @@
+"""Persistent background task queue for long-running analyses.
+
+Tasks are rows in a SQLite database (WAL mode), so several API worker processes can share one file.
+A worker claims a task by taking a time-limited lease on it. It renews the lease while the handler
+runs, and the renewal also picks up cancellation requests made through another process. If a
+process dies, its lease lapses and the task is claimed again, up to ``max_attempts`` times before it
+is marked failed so a task that crashes its worker cannot loop forever. Every claim is numbered by
+the task's ``attempts`` counter, and a worker may only renew, update or finish the task for the
+attempt it claimed; one whose lease lapsed cannot touch the new owner's run. Finished tasks keep their result for
+``result_ttl`` seconds and can notify a webhook. A submission may carry an idempotency key; while
+the task it created is retained, resubmitting the key from any process returns that same task.
+
+Webhook URLs are caller-supplied, so delivery guards against server-side request forgery: unless
+the host is on the configured allowlist, every address it resolves to, and the address actually
+connected to, must be public. Proxies from the environment are ignored and redirects are not
+followed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import http.client
+import ipaddress
+import json
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, TypeVar
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = frozenset({SUCCEEDED, FAILED, CANCELLED})
+
+T = TypeVar("T")
+
+_COLUMNS = (
+    "id, kind, payload, status, progress, message, result, error, webhook_url, webhook_status, "
+    "cancel_requested, attempts, created_at, started_at, finished_at, lease_expires_at, expires_at, idempotency_key"
+)
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for a different task kind or payload."""
+
+
+class LeaseLost(Exception):
+    """The lease on a task lapsed and the task was claimed again or finished elsewhere."""
+
+
+class WebhookRejected(ValueError):
+    """A webhook URL is malformed, not allowlisted or points at a non-public address."""
+
+
+class TaskStore:
+    """SQLite-backed task table with lease-based claiming."""
+
+    def __init__(
+        self, path: str, *, result_ttl: float = 86400.0, lease_seconds: float = 30.0, max_attempts: int = 3
+    ) -> None:
+        self.path = path
+        self.result_ttl = result_ttl
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "progress REAL NOT NULL DEFAULT 0, message TEXT, result TEXT, error TEXT, webhook_url TEXT, "
+            "webhook_status TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, started_at REAL, "
+            "finished_at REAL, lease_expires_at REAL, expires_at REAL, idempotency_key TEXT)"
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "idempotency_key" not in columns:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN idempotency_key TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, created_at)")
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS tasks_by_idempotency_key ON tasks (idempotency_key) "
+            "WHERE idempotency_key IS NOT NULL"
+        )
+        self._conn.commit()
+
+    def _row(self, task_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        webhook_url: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue a task, or return the retained task already submitted under ``idempotency_key``.
+
+        Raises :class:`IdempotencyConflict` when the key was used for a different kind or payload.
+        """
+
+        task_id = uuid.uuid4().hex
+        body = json.dumps(payload, sort_keys=True)
+        now = time.time()
+        with self._lock:
+            if idempotency_key is not None:
+                # An expired task frees its key; the unique index arbitrates races between processes.
+                self._conn.execute(
+                    "DELETE FROM tasks WHERE idempotency_key = ? AND expires_at < ?", (idempotency_key, now)
+                )
+            try:
+                self._conn.execute(
+                    "INSERT INTO tasks (id, kind, payload, status, webhook_url, created_at, idempotency_key) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (task_id, kind, body, QUEUED, webhook_url, now, idempotency_key),
+                )
+            except sqlite3.IntegrityError:
+                self._conn.commit()
+                row = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM tasks WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if row is None:
+                    raise
+                if row["kind"] != kind or row["payload"] != body:
+                    raise IdempotencyConflict(f"Idempotency key {idempotency_key!r} was used for a different request")
+                return dict(row)
+            self._conn.commit()
+            return self._row(task_id)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the task, or ``None`` if it never existed or its result has expired."""
+
+        with self._lock:
+            record = self._row(task_id)
+        if record is None or (record["expires_at"] is not None and record["expires_at"] < time.time()):
+            return None
+        return record
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the oldest queued task (or one whose previous lease lapsed) to the caller.
+
+        A task whose lease lapsed on its last allowed attempt is marked failed instead.
+        """
+
+        with self._lock:
+            while True:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT id, attempts FROM tasks WHERE status = ? OR (status = ? AND lease_expires_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["attempts"] >= self.max_attempts:
+                    self._conn.execute(
+                        "UPDATE tasks SET status = ?, error = ?, finished_at = ?, expires_at = ?, "
+                        "lease_expires_at = NULL WHERE id = ? AND attempts = ? AND (status = ? OR (status = ? AND lease_expires_at < ?))",
+                        (
+                            FAILED,
+                            f"Abandoned after {row['attempts']} attempts",
+                            now,
+                            now + self.result_ttl,
+                            row["id"],
+                            row["attempts"],
+                            QUEUED,
+                            RUNNING,
+                            now,
+                        ),
+                    )
+                    self._conn.commit()
+                    continue
+                # The status/lease condition is re-checked so only one process wins a race.
+                cursor = self._conn.execute(
+                    "UPDATE tasks SET status = ?, started_at = COALESCE(started_at, ?), lease_expires_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ? AND (status = ? OR (status = ? AND lease_expires_at < ?))",
+                    (RUNNING, now, now + self.lease_seconds, row["id"], QUEUED, RUNNING, now),
+                )
+                self._conn.commit()
+                if cursor.rowcount == 1:
+                    return self._row(row["id"])
+
+    def renew(self, task_id: str, attempt: int) -> bool:
+        """Extend the lease held for ``attempt``; returns whether cancellation was requested.
+
+        Raises :class:`LeaseLost` if the task is no longer running under that attempt.
+        """
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET lease_expires_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time() + self.lease_seconds, task_id, RUNNING, attempt),
+            )
+            self._conn.commit()
+            if cursor.rowcount != 1:
+                raise LeaseLost(task_id)
+            row = self._conn.execute("SELECT cancel_requested FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def set_progress(self, task_id: str, attempt: int, fraction: float, message: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET progress = ?, message = COALESCE(?, message) "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (max(0.0, min(1.0, fraction)), message, task_id, RUNNING, attempt),
+            )
+            self._conn.commit()
+
+    def finish(
+        self, task_id: str, attempt: int, status: str, *, result: Any = None, error: Optional[str] = None
+    ) -> bool:
+        """Record the outcome of ``attempt``; returns ``False`` (changing nothing) if that lease was lost."""
+
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ?, "
+                "lease_expires_at = NULL, progress = CASE WHEN ? = ? THEN 1.0 ELSE progress END "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    now,
+                    now + self.result_ttl,
+                    status,
+                    SUCCEEDED,
+                    task_id,
+                    RUNNING,
+                    attempt,
+                ),
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def requeue(self, task_id: str, attempt: int) -> None:
+        """Hand a running task back to the queue (used when a worker shuts down mid-task).
+
+        The interrupted attempt is not counted against ``max_attempts``.
+        """
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, lease_expires_at = NULL, attempts = attempts - 1 "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (QUEUED, task_id, RUNNING, attempt),
+            )
+            self._conn.commit()
+
+    def request_cancel(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued task immediately or flag a running one; finished tasks are unchanged."""
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, finished_at = ?, expires_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, now, now + self.result_ttl, task_id, QUEUED),
+            )
+            self._conn.execute(
+                "UPDATE tasks SET cancel_requested = 1 WHERE id = ? AND status = ?", (task_id, RUNNING)
+            )
+            self._conn.commit()
+        return self.get(task_id)
+
+    def set_webhook_status(self, task_id: str, status: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE tasks SET webhook_status = ? WHERE id = ?", (status, task_id))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM tasks WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS count FROM tasks GROUP BY status").fetchall()
+        counts = dict.fromkeys((QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED), 0)
+        counts.update({row["status"]: row["count"] for row in rows})
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def public_view(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Client-facing task status (without the payload and result bodies)."""
+
+    return {
+        "task_id": record["id"],
+        "kind": record["kind"],
+        "status": record["status"],
+        "progress": round(record["progress"], 4),
+        "message": record["message"],
+        "error": record["error"],
+        "attempts": record["attempts"],
+        "cancel_requested": bool(record["cancel_requested"]),
+        "webhook_status": record["webhook_status"],
+        "created_at": record["created_at"],
+        "started_at": record["started_at"],
+        "finished_at": record["finished_at"],
+        "expires_at": record["expires_at"],
+    }
+
+
+class TaskContext:
+    """Handed to task handlers so they can report progress."""
+
+    def __init__(self, store: TaskStore, task_id: str, attempt: int) -> None:
+        self.store = store
+        self.task_id = task_id
+        self.attempt = attempt
+
+    async def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        await _in_thread(self.store.set_progress, self.task_id, self.attempt, fraction, message)
+
+
+async def _in_thread(function: Callable[..., T], *args: Any) -> T:
+    """Run a blocking :class:`TaskStore` call in the default executor.
+
+    Every store call may wait on the SQLite write lock held by another process, so none of them
+    runs on the event loop.
+    """
+
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+TaskHandler = Callable[[Dict[str, Any], TaskContext], Awaitable[Any]]
+
+
+def _host_allowed(host: str, allowed_hosts: Iterable[str]) -> bool:
+    """``host`` equals an entry, or is a subdomain of an entry written with a leading dot."""
+
+    host = host.lower().rstrip(".")
+    for entry in allowed_hosts:
+        entry = entry.lower().rstrip(".")
+        if host == entry.lstrip(".") or (entry.startswith(".") and host.endswith(entry)):
+            return True
+    return False
+
+
+def _check_public_address(address: str) -> None:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if getattr(ip, "ipv4_mapped", None) is not None:
+        ip = ip.ipv4_mapped
+    if not ip.is_global or ip.is_multicast:
+        raise WebhookRejected(f"webhook_url resolves to a non-public address ({ip})")
+
+
+def check_webhook_url(url: str, allowed_hosts: Iterable[str] = ()) -> None:
+    """Validate a webhook URL, resolving its host; raises :class:`WebhookRejected`.
+
+    With an allowlist, only listed hosts are accepted and they may be internal. Without one, any
+    host is accepted as long as all of its addresses are public.
+    """
+
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise WebhookRejected("webhook_url must be an http(s) URL")
+    allowed_hosts = list(allowed_hosts)
+    if allowed_hosts:
+        if not _host_allowed(parsed.hostname, allowed_hosts):
+            raise WebhookRejected(f"webhook host {parsed.hostname!r} is not allowed")
+        return
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = socket.getaddrinfo(parsed.hostname, port, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError) as exc:
+        raise WebhookRejected(f"webhook host {parsed.hostname!r} cannot be resolved") from exc
+    for _, _, _, _, sockaddr in addresses:
+        _check_public_address(sockaddr[0])
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    """Refuses to talk to a non-public peer, whatever DNS answered when the URL was checked."""
+
+    def connect(self) -> None:
+        super().connect()
+        _check_public_address(self.sock.getpeername()[0])
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def connect(self) -> None:
+        super().connect()
+        _check_public_address(self.sock.getpeername()[0])
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):  # type: ignore[no-untyped-def]
+        return None  # the 3xx surfaces as an HTTPError
+
+
+def _post_json(url: str, body: Dict[str, Any], timeout: float, allowed_hosts: Iterable[str] = ()) -> int:
+    allowed_hosts = list(allowed_hosts)
+    check_webhook_url(url, allowed_hosts)
+    handlers: List[urllib.request.BaseHandler] = [urllib.request.ProxyHandler({}), _NoRedirectHandler()]
+    if not allowed_hosts:
+        handlers += [_PublicHTTPHandler(), _PublicHTTPSHandler()]
+    opener = urllib.request.build_opener(*handlers)
+    request = urllib.request.Request(
+        url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with opener.open(request, timeout=timeout) as response:
+        return response.status
+
+
+class TaskQueue:
+    """Pool of asyncio workers executing tasks from a :class:`TaskStore`.
+
+    Submissions in this process wake an idle worker immediately. Tasks submitted by other processes
+    sharing the database are picked up within ``poll_interval`` seconds. Store calls run in the
+    default executor.
+    """
+
+    def __init__(
+        self,
+        store: TaskStore,
+        handlers: Dict[str, TaskHandler],
+        *,
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        webhook_timeout: float = 10.0,
+        webhook_attempts: int = 3,
+        webhook_allowed_hosts: Iterable[str] = (),
+    ) -> None:
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self.webhook_attempts = webhook_attempts
+        self.webhook_allowed_hosts = list(webhook_allowed_hosts)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List["asyncio.Task[None]"] = []
+        self._running: Dict[str, "asyncio.Future[Any]"] = {}
+        self._notifications: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        webhook_url: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown task kind: {kind}")
+        record = await _in_thread(self.store.submit, kind, payload, webhook_url, idempotency_key)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return record
+
+    async def cancel(self, task_id: str) -> Optional[Dict[str, Any]]:
+        record = await _in_thread(self.store.request_cancel, task_id)
+        running = self._running.get(task_id)
+        if running is not None:
+            running.cancel()
+        return record
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; tasks they were running go back to the queue."""
+
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self._notifications:
+            await asyncio.wait(set(self._notifications), timeout=self.webhook_timeout)
+        self._wakeup = None
+
+    async def _worker(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            self._wakeup.clear()
+            record = await self._claim()
+            if record is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    await _in_thread(self.store.purge_expired)
+                continue
+            await self._run(record)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        claiming = asyncio.ensure_future(_in_thread(self.store.claim))
+        try:
+            return await asyncio.shield(claiming)
+        except asyncio.CancelledError:
+            # The claim commits in its thread regardless; hand a claimed task back before stopping.
+            record = await claiming
+            if record is not None:
+                await _in_thread(self.store.requeue, record["id"], record["attempts"])
+            raise
+
+    async def _run(self, record: Dict[str, Any]) -> None:
+        task_id, attempt = record["id"], record["attempts"]
+        context = TaskContext(self.store, task_id, attempt)
+        handler = asyncio.ensure_future(self.handlers[record["kind"]](json.loads(record["payload"]), context))
+        self._running[task_id] = handler
+        try:
+            while True:
+                done, _ = await asyncio.wait({handler}, timeout=self.store.lease_seconds / 3)
+                if done:
+                    break
+                if await _in_thread(self.store.renew, task_id, attempt):
+                    handler.cancel()
+            result = handler.result()
+        except LeaseLost:
+            # Another worker owns the task now; drop this run without recording anything.
+            handler.cancel()
+            finished = False
+        except asyncio.CancelledError:
+            if not handler.done():
+                # The worker itself is shutting down: give the task back instead of losing it.
+                handler.cancel()
+                await _in_thread(self.store.requeue, task_id, attempt)
+                raise
+            finished = await self._finish(task_id, attempt, CANCELLED, error="Cancelled")
+        except Exception as exc:
+            finished = await self._finish(task_id, attempt, FAILED, error=str(getattr(exc, "detail", None) or exc))
+        else:
+            finished = await self._finish(task_id, attempt, SUCCEEDED, result=result)
+        finally:
+            self._running.pop(task_id, None)
+        if finished and record["webhook_url"]:
+            notification = asyncio.ensure_future(self._notify(task_id))
+            self._notifications.add(notification)
+            notification.add_done_callback(self._notifications.discard)
+
+    async def _finish(self, task_id: str, attempt: int, status: str, **outcome: Any) -> bool:
+        return await _in_thread(functools.partial(self.store.finish, task_id, attempt, status, **outcome))
+
+    async def _notify(self, task_id: str) -> None:
+        record = await _in_thread(self.store.get, task_id)
+        if record is None:
+            return
+        body = public_view(record)
+        body["result"] = json.loads(record["result"]) if record["result"] is not None else None
+        loop = asyncio.get_running_loop()
+        outcome = "failed"
+        for attempt in range(self.webhook_attempts):
+            try:
+                status = await loop.run_in_executor(
+                    None, _post_json, record["webhook_url"], body, self.webhook_timeout, self.webhook_allowed_hosts
+                )
+            except WebhookRejected as exc:
+                outcome = f"failed: {exc}"
+                break
+            except Exception as exc:
+                outcome = f"failed: {exc}"
+            else:
+                outcome = "delivered" if 200 <= status < 300 else f"failed: HTTP {status}"
+                if outcome == "delivered":
+                    break
+            if attempt + 1 < self.webhook_attempts:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        await _in_thread(self.store.set_webhook_status, task_id, outcome)
@@ -0,0 +1,201 @@
+"""Upload size enforcement and chunked spooling so large files never sit fully in worker memory.
+
+Starlette parses a multipart body completely before the endpoint runs, so a size check in the
+endpoint comes too late to protect the server. :class:`RequestSizeLimitMiddleware` rejects oversized
+multipart requests from their ``Content-Length``, or while the raw body is being received when
+the client streams it chunked. :func:`spool_upload` then hashes the parsed file and moves large
+ones to a temporary file for the PDF extractor.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, MutableMapping, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Allowance on top of the file limit for the other form fields and multipart framing.
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class UploadTooLargeError(ValueError):
+    """Raised while streaming an upload that exceeds the configured maximum size."""
+
+
+class RequestSizeLimitMiddleware:
+    """ASGI middleware answering 413 to multipart requests whose body exceeds ``max_bytes``.
+
+    A declared ``Content-Length`` is checked before any of the body is read; otherwise the body is
+    counted as it is received and the request is cut off once it passes the limit.
+    """
+
+    def __init__(self, app: Callable[[Dict[str, Any], Receive, Send], Awaitable[None]], max_bytes: int) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        try:
+            declared = int(headers.get(b"content-length", b""))
+        except ValueError:
+            declared = None
+        if declared is not None and declared > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    if response_started:
+                        raise UploadTooLargeError(self._detail())
+                    # Answer here rather than raising: the form parser would turn any error raised
+                    # from ``receive`` into a 400. The application sees a disconnect and its own
+                    # response is dropped.
+                    rejected = True
+                    await self._reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if rejected:
+                return
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        await self.app(scope, limited_receive, tracking_send)
+
+    @staticmethod
+    def _is_multipart(scope: Dict[str, Any]) -> bool:
+        for name, value in scope.get("headers") or []:
+            if name == b"content-type":
+                return value.lower().startswith(b"multipart/")
+        return False
+
+    def _detail(self) -> str:
+        return f"Request body exceeds the {self.max_bytes} byte limit"
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": self._detail()}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+class SpooledUpload:
+    """An upload held in memory when small, or in a temporary file once it crosses a threshold.
+
+    ``source`` is what PDF extraction should read from: the bytes for small uploads, or the temp
+    file path (which the extractor memory-maps) for large ones. Call :meth:`close` to remove the
+    temp file.
+    """
+
+    def __init__(self, digest: str, size: int, data: Optional[bytes] = None, path: Optional[str] = None) -> None:
+        self.digest = digest
+        self.size = size
+        self.data = data
+        self.path = path
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.path if self.path is not None else (self.data or b"")
+
+    @property
+    def spooled_to_disk(self) -> bool:
+        return self.path is not None
+
+    def close(self) -> None:
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+async def spool_upload(
+    upload: Any,
+    *,
+    max_bytes: int,
+    memory_threshold: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SpooledUpload:
+    """Read ``upload`` (anything with an async ``read(size)``) in chunks.
+
+    The content hash is computed while streaming. Uploads larger than ``memory_threshold`` are
+    written to a temporary file (in the thread pool, so disk writes never block the event loop)
+    instead of being accumulated in memory, and reading stops with :class:`UploadTooLargeError` as
+    soon as ``max_bytes`` is exceeded.
+    """
+
+    hasher = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+            hasher.update(chunk)
+            if spool is None and len(buffer) + len(chunk) > memory_threshold:
+                spool = await run_in_threadpool(_open_spool_file)
+                buffer.extend(chunk)
+                await run_in_threadpool(spool.write, bytes(buffer))
+                buffer = bytearray()
+            elif spool is not None:
+                await run_in_threadpool(spool.write, chunk)
+            else:
+                buffer.extend(chunk)
+    except BaseException:
+        if spool is not None:
+            await run_in_threadpool(_discard_spool_file, spool)
+        raise
+
+    if spool is None:
+        return SpooledUpload(hasher.hexdigest(), size, data=bytes(buffer))
+    await run_in_threadpool(spool.close)
+    return SpooledUpload(hasher.hexdigest(), size, path=spool.name)
+
+
+def _open_spool_file() -> Any:
+    return tempfile.NamedTemporaryFile(prefix="upload-", suffix=".pdf", delete=False)
+
+
+def _discard_spool_file(spool: Any) -> None:
+    spool.close()
+    os.unlink(spool.name)
@@ -0,0 +1,423 @@
+"""Persistent, incrementally updatable vector index for recruiter resume search.
+
+Vectors live in a memory-mapped float32 file that grows by doubling; ids, texts and inverted-list
+assignments live in SQLite next to it. Small indexes are searched exhaustively. Once enough
+resumes are stored, an IVF (inverted file) layer is trained with k-means so a query only scans
+the ``n_probe`` closest lists.
+
+Several processes (API workers) may open the same directory. Every mutation runs inside a SQLite
+``BEGIN IMMEDIATE`` transaction that first reloads the shared state when another process changed
+it (a version counter in the ``meta`` table), so row ids are allocated under the database write
+lock. Searches run in a read transaction against a consistent snapshot. Tombstoned rows are
+compacted into a new vectors file once they outnumber the live ones; processes still mapping the
+previous file keep reading it until they notice the new generation.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_INITIAL_CAPACITY = 1024
+_COMPACT_MIN_TOMBSTONES = 1024
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int = 12, seed: int = 0) -> np.ndarray:
+    """Spherical k-means over L2-normalised rows; returns ``(k, dim)`` unit centroids."""
+
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = (vectors @ centroids.T).argmax(axis=1)
+        for cluster in range(k):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+            else:
+                centroids[cluster] = vectors[rng.integers(len(vectors))]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+    return centroids.astype(np.float32)
+
+
+def _capacity_for(rows: int) -> int:
+    capacity = _INITIAL_CAPACITY
+    while capacity < rows:
+        capacity *= 2
+    return capacity
+
+
+class ResumeIndex:
+    """Approximate nearest-neighbour index over resume embeddings, persisted under ``directory``."""
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int,
+        *,
+        n_lists: int = 64,
+        n_probe: int = 8,
+        train_threshold: int = 2048,
+        compact_min_tombstones: int = _COMPACT_MIN_TOMBSTONES,
+    ) -> None:
+        self.directory = directory
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_threshold = train_threshold
+        self.compact_min_tombstones = compact_min_tombstones
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Local view of the shared state; ``_sync`` reloads it whenever the stored version moves.
+        self._version: Optional[int] = None
+        self._generation: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+        self._count = 0
+        self._live = np.zeros(0, dtype=bool)
+        self._lists: Dict[int, List[int]] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._stale_files: List[str] = []
+
+        self._db = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"), check_same_thread=False, timeout=30.0, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            "row INTEGER PRIMARY KEY, resume_id TEXT NOT NULL, text TEXT NOT NULL, "
+            "list_id INTEGER, deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS resumes_by_id ON resumes (resume_id, deleted)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._init_meta()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            with self._transaction(write=False):
+                pass
+        except BaseException:
+            self._db.close()
+            raise
+
+    def _meta(self, key: str) -> Optional[object]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key: str, value: object) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _init_meta(self) -> None:
+        stored_dim = self._meta("dim")
+        if stored_dim is not None and int(stored_dim) != self.dim:
+            raise ValueError(f"Index in {self.directory} stores {stored_dim}-dim vectors, not {self.dim}")
+        if stored_dim is None:
+            self._set_meta("dim", self.dim)
+            self._set_meta("version", 0)
+            self._set_meta("generation", 0)
+        # Files only ever grow, and only under the write lock, so readers never resize them.
+        count = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM resumes").fetchone()[0]
+        self._grow_file(int(self._meta("generation")), count)
+
+    # -- storage -------------------------------------------------------------------------------
+
+    def _vectors_path(self, generation: int) -> str:
+        name = "vectors.f32" if generation == 0 else f"vectors.{generation}.f32"
+        return os.path.join(self.directory, name)
+
+    def _file_capacity(self, generation: int) -> int:
+        path = self._vectors_path(generation)
+        return os.path.getsize(path) // (self.dim * 4) if os.path.exists(path) else 0
+
+    def _grow_file(self, generation: int, needed: int) -> None:
+        """Extend the vectors file to hold ``needed`` rows; callers hold the database write lock."""
+
+        current = self._file_capacity(generation)
+        if current >= max(needed, 1):
+            return
+        with open(self._vectors_path(generation), "ab") as handle:
+            handle.truncate(_capacity_for(max(needed, current)) * self.dim * 4)
+
+    def _map(self, generation: int) -> None:
+        capacity = self._file_capacity(generation)
+        if self._vectors is not None and generation == self._generation and capacity == self._capacity:
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(
+            self._vectors_path(generation), dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+        live = np.zeros(capacity, dtype=bool)
+        kept = min(capacity, len(self._live))
+        live[:kept] = self._live[:kept]
+        self._live = live
+        self._generation = generation
+        self._capacity = capacity
+
+    def _sync(self) -> None:
+        """Reload count, live rows, lists and centroids if another process changed the index."""
+
+        version = int(self._meta("version"))
+        if version == self._version:
+            return
+        self._map(int(self._meta("generation")))
+        self._count = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM resumes").fetchone()[0]
+        self._live = np.zeros(self._capacity, dtype=bool)
+        self._lists = {}
+        for row, list_id in self._db.execute("SELECT row, list_id FROM resumes WHERE deleted = 0"):
+            self._live[row] = True
+            if list_id is not None:
+                self._lists.setdefault(list_id, []).append(row)
+        blob = self._meta("centroids")
+        self._centroids = None if blob is None else np.frombuffer(blob, dtype=np.float32).reshape(-1, self.dim).copy()
+        self._trained_size = int(self._meta("trained_size") or 0)
+        self._version = version
+
+    @contextlib.contextmanager
+    def _transaction(self, *, write: bool) -> Iterator[None]:
+        """Run a block against the current shared state; writes take the cross-process write lock."""
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            version = self._version
+            try:
+                self._sync()
+                yield
+                if write:
+                    version = int(self._meta("version")) + 1
+                    self._set_meta("version", version)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                # The local view may be half-updated; reload it on the next access.
+                self._version = None
+                self._stale_files = []
+                raise
+            if write:
+                self._version = version
+            for path in self._stale_files:
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+            self._stale_files = []
+
+    def _live_count(self) -> int:
+        return int(self._live[: self._count].sum())
+
+    def __len__(self) -> int:
+        with self._transaction(write=False):
+            return self._live_count()
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    # -- mutation ------------------------------------------------------------------------------
+
+    def add(self, items: Sequence[Tuple[str, str]], vectors: np.ndarray) -> None:
+        """Insert or replace ``(resume_id, text)`` items with their unit-norm embedding rows."""
+
+        if len(items) != len(vectors):
+            raise ValueError("items and vectors must have the same length")
+        with self._transaction(write=True):
+            self._delete_ids([resume_id for resume_id, _ in items])
+            self._maybe_compact()
+            start = self._count
+            assert self._generation is not None and self._vectors is not None
+            self._grow_file(self._generation, start + len(items))
+            self._map(self._generation)
+            self._vectors[start : start + len(items)] = vectors
+            self._vectors.flush()
+            list_ids = self._assign(vectors)
+            rows = []
+            for offset, (resume_id, text) in enumerate(items):
+                row = start + offset
+                list_id = None if list_ids is None else int(list_ids[offset])
+                rows.append((row, resume_id, text, list_id))
+                self._live[row] = True
+                if list_id is not None:
+                    self._lists.setdefault(list_id, []).append(row)
+            self._db.executemany(
+                "INSERT INTO resumes (row, resume_id, text, list_id) VALUES (?, ?, ?, ?)", rows
+            )
+            self._count = start + len(items)
+            self._maybe_train()
+
+    def delete(self, resume_id: str) -> bool:
+        """Tombstone a resume; returns whether it was present."""
+
+        with self._transaction(write=True):
+            removed = self._delete_ids([resume_id])
+            self._maybe_compact()
+            return removed > 0
+
+    def _delete_ids(self, resume_ids: Sequence[str]) -> int:
+        removed = 0
+        for resume_id in resume_ids:
+            for row, list_id in self._db.execute(
+                "SELECT row, list_id FROM resumes WHERE resume_id = ? AND deleted = 0", (resume_id,)
+            ).fetchall():
+                self._live[row] = False
+                if list_id is not None and row in self._lists.get(list_id, []):
+                    self._lists[list_id].remove(row)
+                removed += 1
+        if removed:
+            self._db.executemany(
+                "UPDATE resumes SET deleted = 1 WHERE resume_id = ?", [(resume_id,) for resume_id in resume_ids]
+            )
+        return removed
+
+    def compact(self) -> int:
+        """Drop tombstoned rows and pack the live vectors; returns the number of rows reclaimed."""
+
+        with self._transaction(write=True):
+            return self._compact()
+
+    def _maybe_compact(self) -> None:
+        tombstones = self._count - self._live_count()
+        if tombstones >= self.compact_min_tombstones and tombstones >= self._live_count():
+            self._compact()
+
+    def _compact(self) -> int:
+        assert self._generation is not None and self._vectors is not None
+        rows = np.flatnonzero(self._live[: self._count])
+        reclaimed = self._count - len(rows)
+        if reclaimed == 0:
+            return 0
+        # The packed vectors go to a new file so other processes mapping the old one keep a
+        # consistent view until their next read transaction sees the new generation.
+        generation = self._generation + 1
+        self._grow_file(generation, len(rows))
+        capacity = self._file_capacity(generation)
+        packed = np.memmap(
+            self._vectors_path(generation), dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+        packed[: len(rows)] = self._vectors[rows]
+        packed.flush()
+
+        self._db.execute("DELETE FROM resumes WHERE deleted = 1")
+        # Ascending order: every target slot belonged to a tombstone or to a row already moved down.
+        self._db.executemany(
+            "UPDATE resumes SET row = ? WHERE row = ?",
+            [(new, old) for new, old in enumerate(rows.tolist()) if new != old],
+        )
+        self._set_meta("generation", generation)
+        renumber = {old: new for new, old in enumerate(rows.tolist())}
+        self._lists = {list_id: [renumber[row] for row in members] for list_id, members in self._lists.items()}
+        self._stale_files.append(self._vectors_path(self._generation))
+        self._vectors = packed
+        self._generation = generation
+        self._capacity = capacity
+        self._count = len(rows)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._live[: self._count] = True
+        return reclaimed
+
+    def _assign(self, vectors: np.ndarray) -> Optional[np.ndarray]:
+        if self._centroids is None:
+            return None
+        return (vectors @ self._centroids.T).argmax(axis=1)
+
+    def _maybe_train(self) -> None:
+        live = self._live_count()
+        if live < self.train_threshold:
+            return
+        if self._centroids is not None and live < 4 * self._trained_size:
+            return
+        self._train()
+
+    def train(self) -> None:
+        """(Re)build IVF centroids and list assignments from the live vectors."""
+
+        with self._transaction(write=True):
+            self._train()
+
+    def _train(self) -> None:
+        assert self._vectors is not None
+        rows = np.flatnonzero(self._live[: self._count])
+        if len(rows) < self.n_lists:
+            return
+        vectors = np.asarray(self._vectors[rows])
+        self._centroids = _kmeans(vectors, self.n_lists)
+        assignment = self._assign(vectors)
+        self._lists = {}
+        for row, list_id in zip(rows.tolist(), assignment.tolist()):
+            self._lists.setdefault(list_id, []).append(row)
+        self._db.executemany(
+            "UPDATE resumes SET list_id = ? WHERE row = ?",
+            [(list_id, row) for row, list_id in zip(rows.tolist(), assignment.tolist())],
+        )
+        self._set_meta("centroids", self._centroids.tobytes())
+        self._set_meta("trained_size", len(rows))
+        self._trained_size = len(rows)
+
+    # -- queries -------------------------------------------------------------------------------
+
+    def search(self, query: np.ndarray, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to ``top_k`` ``(resume_id, cosine_similarity)`` pairs, best first."""
+
+        with self._transaction(write=False):
+            assert self._vectors is not None
+            if self._centroids is None:
+                rows = np.flatnonzero(self._live[: self._count])
+            else:
+                probes = np.argsort(-(self._centroids @ query))[: self.n_probe]
+                rows = np.fromiter(
+                    (row for list_id in probes.tolist() for row in self._lists.get(list_id, [])),
+                    dtype=np.int64,
+                )
+            if len(rows) == 0:
+                return []
+            scores = np.asarray(self._vectors[rows]) @ query
+            k = min(top_k, len(rows))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            chosen_rows = rows[best].tolist()
+            placeholders = ",".join("?" for _ in chosen_rows)
+            ids = dict(
+                self._db.execute(
+                    f"SELECT row, resume_id FROM resumes WHERE row IN ({placeholders})", chosen_rows
+                ).fetchall()
+            )
+            return [(ids[row], float(scores[idx])) for row, idx in zip(chosen_rows, best.tolist())]
+
+    def get_texts(self, resume_ids: Sequence[str]) -> Dict[str, str]:
+        """Fetch stored resume texts for the given ids."""
+
+        if not resume_ids:
+            return {}
+        placeholders = ",".join("?" for _ in resume_ids)
+        with self._lock:
+            return dict(
+                self._db.execute(
+                    f"SELECT resume_id, text FROM resumes WHERE deleted = 0 AND resume_id IN ({placeholders})",
+                    list(resume_ids),
+                ).fetchall()
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._transaction(write=False):
+            return {
+                "size": self._live_count(),
+                "rows": self._count,
+                "capacity": self._capacity,
+                "trained": int(self.trained),
+                "n_lists": len(self._lists),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._db.close()
@@ -18,6 +18,6 @@ fi
 echo "Checking for uvicorn:"
 which uvicorn || echo "uvicorn not found in PATH"
 
-# Start the FastAPI application
+# Start the FastAPI application (one worker per CPU unless WEB_CONCURRENCY is set)
 echo "Starting FastAPI application..."
-exec python -m uvicorn src.api.api:app --host 0.0.0.0 --port ${PORT:-8000}
+exec python -m src.serve --host 0.0.0.0 --port ${PORT:-8000}
@@ -1,13 +1,32 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 import io
 import json
 
-from src.api.api import app
+from src.api import api as api_module
+from src.api.api import app, pdf_text_cache, response_cache
+from src.utils.pdf_utils import PDFLimitError
 
 client = TestClient(app)
 
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    response_cache.clear()
+    pdf_text_cache.clear()
+    yield
+    response_cache.clear()
+    pdf_text_cache.clear()
+
 def test_root_endpoint():
     response = client.get("/")
     assert response.status_code == 200
@@ -98,3 +117,703 @@ def test_job_market_endpoint(mock_get_response, mock_prompt):
     assert body["demand_level"] == "High"
     mock_prompt.assert_called_once_with("ML Engineer", "Remote")
     mock_get_response.assert_called_once_with("prompt")
+
+
+def test_stats_endpoint_reports_model_pool(monkeypatch):
+    monkeypatch.setitem(api_module.config, "startup_warmup", "blocking")
+    monkeypatch.setitem(api_module.config, "task_workers", 0)
+
+    with TestClient(app) as warm_client:
+        response = warm_client.get("/stats")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_registry"]["pool_size"] >= 1
+    assert "in_flight" in body["model_client"]
+    assert body["startup"]["sdk_loaded"] is True
+    assert body["startup"]["warmup_seconds"] is not None
+
+
+@patch("src.api.api.get_gemini_response")
+def test_repeated_prompt_served_from_cache(mock_get_response):
+    mock_get_response.return_value = json.dumps({"median_salary": "$120k"})
+    payload = {"role": "Data Engineer", "location": "Berlin", "experience_years": 4}
+
+    first = client.post("/salary/benchmark", json=payload)
+    second = client.post("/salary/benchmark", json=payload)
+
+    assert first.json() == second.json() == {"median_salary": "$120k"}
+    mock_get_response.assert_called_once()
+    assert response_cache.stats()["memory_hits"] == 1
+
+
+@patch("src.api.api.get_gemini_response")
+def test_career_coach_bypasses_cache(mock_get_response):
+    mock_get_response.return_value = json.dumps({"reply": "Keep going", "suggested_next_questions": []})
+    payload = {"message_history": [{"role": "user", "content": "How do I move into ML?"}]}
+
+    client.post("/career/coach", json=payload)
+    client.post("/career/coach", json=payload)
+
+    assert mock_get_response.call_count == 2
+
+
+def test_identical_concurrent_requests_make_one_upstream_call():
+    calls = 0
+    lock = threading.Lock()
+
+    def stub_model(prompt, **options):
+        nonlocal calls
+        with lock:
+            calls += 1
+        time.sleep(0.1)
+        return json.dumps({"title": "Engineer", "keywords": ["python"]})
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            payload = {"resume_text": "Resume", "job_description": "Shared job link"}
+            return await asyncio.gather(*(async_client.post("/jobs/parse", json=payload) for _ in range(20)))
+
+    with patch("src.api.api.get_gemini_response", side_effect=stub_model):
+        responses = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.json()["title"] == "Engineer" for response in responses)
+
+
+def test_coalesced_callers_each_get_their_own_result(monkeypatch):
+    shared = {"insights": ["a"]}
+
+    async def slow_model(prompt, cache_key, response_model=None):
+        await asyncio.sleep(0.01)
+        return shared
+
+    async def caller():
+        result = await api_module._invoke_model("same prompt")
+        result["insights"].append("mutated")
+        return result
+
+    async def scenario():
+        return await asyncio.gather(caller(), caller(), caller())
+
+    monkeypatch.setattr(api_module, "_call_model", slow_model)
+    results = asyncio.run(scenario())
+
+    assert all(result == {"insights": ["a", "mutated"]} for result in results)
+    assert len({id(result) for result in results} | {id(shared)}) == 4
+    assert shared == {"insights": ["a"]}
+
+
+def test_recruiter_bulk_score_parallel_mode_returns_partial_results():
+    def stub_model(prompt, **options):
+        if "Resume_2:" in prompt:
+            return "not json"
+        label = "Resume_1" if "Resume_1:" in prompt else "Resume_3"
+        return json.dumps({
+            "candidate_rankings": [{"candidate_id": label, "overall_score": "70%" if label == "Resume_1" else "80%"}],
+            "skill_matrix": [{"skill": "Python", "coverage": "100%"}],
+        })
+
+    payload = {
+        "resumes": ["First resume", "Second resume", "Third resume"],
+        "job_description": "Python developer",
+        "mode": "parallel",
+        "max_concurrency": 2,
+    }
+    with patch("src.api.api.get_gemini_response", side_effect=stub_model) as mock_get_response:
+        response = client.post("/recruiter/bulk-score", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    # The unparseable chunk is retried once before being reported as an error.
+    assert mock_get_response.call_count == 4
+    assert [ranking["candidate_id"] for ranking in body["candidate_rankings"]] == ["Resume_3", "Resume_1"]
+    assert body["errors"] == [{"candidate_id": "Resume_2", "detail": "Failed to parse model response"}]
+    assert body["skill_matrix"] == [{"skill": "Python", "coverage": "100%"}]
+
+
+def test_recruiter_bulk_score_stream_emits_candidates_then_summary():
+    def stub_model(prompt, **options):
+        if "Resume_2:" in prompt:
+            return "not json"
+        return json.dumps({
+            "candidate_rankings": [{"candidate_id": "Resume_1", "overall_score": "70%", "strengths": ["Python"]}],
+            "skill_matrix": [],
+        })
+
+    payload = {"resumes": ["First resume", "Second resume"], "job_description": "Python developer"}
+    with patch("src.api.api.get_gemini_response", side_effect=stub_model):
+        response = client.post("/recruiter/bulk-score/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(event["event"] for event in events[:-1]) == ["candidate", "error"]
+    assert events[-1]["event"] == "summary"
+    assert events[-1]["data"]["candidate_rankings"] == [{"candidate_id": "Resume_1", "overall_score": "70%"}]
+    assert events[-1]["data"]["summary"] == {"total": 2, "scored": 1, "failed": 1}
+
+
+@patch("src.api.api.get_gemini_response")
+def test_recruiter_bulk_score_stream_supports_sse(mock_get_response):
+    mock_get_response.return_value = json.dumps({
+        "candidate_rankings": [{"candidate_id": "Resume_1", "overall_score": "70%"}],
+        "skill_matrix": [],
+    })
+
+    response = client.post(
+        "/recruiter/bulk-score/stream?format=sse",
+        json={"resumes": ["Only resume"], "job_description": "JD"},
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: candidate\ndata: ")
+    assert "event: summary\n" in response.text
+
+
+def test_resume_rewrite_stream_emits_field_deltas_and_final_result():
+    document = json.dumps({
+        "rewritten_resume": "# Updated\n- Added metrics",
+        "key_adjustments": ["Added metrics"],
+        "keyword_alignment_score": "92%",
+    })
+    fragments = [document[idx : idx + 9] for idx in range(0, len(document), 9)]
+    payload = {"resume_text": "Original", "job_description": "JD", "focus_role": "Data Scientist"}
+
+    with patch("src.api.api.stream_gemini_response", return_value=iter(fragments)):
+        response = client.post("/resume/rewrite/stream", json=payload)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    events = [(frame.split("\n")[0][len("event: "):], json.loads(frame.split("\n")[1][len("data: "):])) for frame in frames]
+    deltas = "".join(data["text"] for name, data in events if name == "delta")
+    assert deltas == "# Updated\n- Added metrics"
+    assert events[-1] == ("result", {
+        "rewritten_resume": "# Updated\n- Added metrics",
+        "key_adjustments": ["Added metrics"],
+        "keyword_alignment_score": "92%",
+    })
+
+    # The completed stream populates the cache used by the non-streaming endpoint.
+    with patch("src.api.api.get_gemini_response") as mock_get_response:
+        assert client.post("/resume/rewrite", json=payload).json()["keyword_alignment_score"] == "92%"
+        mock_get_response.assert_not_called()
+
+
+@patch("src.api.api.extract_text_from_pdf")
+def test_analyze_rejects_oversized_pdf(mock_extract_text, mock_pdf_file):
+    mock_extract_text.side_effect = PDFLimitError("PDF has 500 pages; the limit is 120 pages")
+
+    response = client.post(
+        "/analyze",
+        files={"resume": ("resume.pdf", mock_pdf_file, "application/pdf")},
+        data={"job_description": "JD"},
+    )
+
+    assert response.status_code == 413
+
+
+@patch("src.api.api.extract_text_from_pdf")
+@patch("src.api.api.get_gemini_response")
+def test_reuploaded_pdf_is_parsed_once(mock_get_response, mock_extract_text):
+    mock_extract_text.return_value = "Sample resume text"
+    mock_get_response.return_value = json.dumps({"jd_match": "70%", "missing_keywords": [], "profile_summary": ""})
+
+    for job_description in ("First JD", "Second JD"):
+        response = client.post(
+            "/analyze",
+            files={"resume": ("resume.pdf", io.BytesIO(b"same pdf bytes"), "application/pdf")},
+            data={"job_description": job_description},
+        )
+        assert response.status_code == 200
+
+    mock_extract_text.assert_called_once()
+    assert mock_get_response.call_count == 2
+    stats = client.get("/stats").json()["pdf_text_cache"]
+    assert stats["memory_hits"] == 1
+    assert stats["parses"] >= 1
+
+
+@patch("src.api.api.extract_text_from_pdf")
+@patch("src.api.api.get_gemini_response")
+def test_analyze_parses_large_upload_from_spooled_file(mock_get_response, mock_extract_text, monkeypatch):
+    monkeypatch.setitem(api_module.config, "upload_spool_threshold", 8)
+    seen = {}
+
+    def fake_extract(source, **kwargs):
+        seen["source"] = source
+        with open(source, "rb") as handle:
+            seen["content"] = handle.read()
+        return "Resume text"
+
+    mock_extract_text.side_effect = fake_extract
+    mock_get_response.return_value = json.dumps({"jd_match": "70%", "missing_keywords": [], "profile_summary": ""})
+
+    response = client.post(
+        "/analyze",
+        files={"resume": ("resume.pdf", io.BytesIO(b"pdf bytes beyond threshold"), "application/pdf")},
+        data={"job_description": "JD"},
+    )
+
+    assert response.status_code == 200
+    assert seen["content"] == b"pdf bytes beyond threshold"
+    assert not os.path.exists(seen["source"])
+
+
+def test_analyze_rejects_upload_over_max_size_while_streaming(monkeypatch):
+    monkeypatch.setitem(api_module.config, "pdf_max_bytes", 16)
+
+    response = client.post(
+        "/analyze",
+        files={"resume": ("resume.pdf", io.BytesIO(b"x" * 64), "application/pdf")},
+        data={"job_description": "JD"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_analyze_rejects_chunked_upload_over_max_size_with_413(monkeypatch):
+    from src.utils.uploads import RequestSizeLimitMiddleware
+
+    client.get("/")  # builds the middleware stack
+    layer = app.middleware_stack
+    while not isinstance(layer, RequestSizeLimitMiddleware):
+        layer = layer.app
+    monkeypatch.setattr(layer, "max_bytes", 1000)
+    boundary = "limit-test"
+
+    def body():
+        yield (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"job_description\"\r\n\r\nJD\r\n"
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"resume\"; filename=\"resume.pdf\"\r\n"
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode()
+        for _ in range(48):
+            yield b"x" * 65536
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/analyze", content=body(), headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Request body exceeds the 1000 byte limit"
+
+
+@patch("src.api.api.get_gemini_response")
+def test_embeddings_endpoint_scores_locally(mock_get_response):
+    payload = {
+        "resume_text": "Built FastAPI services with Docker and Kubernetes.",
+        "job_description": "Experience with Kubernetes and Docker required.",
+    }
+
+    response = client.post("/analytics/embeddings", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["semantic_similarity_score"].endswith("%")
+    assert body["top_matching_segments"]
+    mock_get_response.assert_not_called()
+
+
+@patch("src.api.api.get_gemini_response")
+def test_embeddings_endpoint_optionally_explains(mock_get_response):
+    mock_get_response.return_value = json.dumps({"explanation": "Strong overlap", "recommendations": []})
+    payload = {"resume_text": "Python engineer", "job_description": "Python developer wanted"}
+
+    response = client.post("/analytics/embeddings?explain=true", json=payload)
+
+    assert response.json()["explanation"] == "Strong overlap"
+    assert response.json()["recommendations"] == []
+    assert "SimilarityAnalysis" in mock_get_response.call_args[0][0]
+
+
+@patch("src.api.api.extract_text_from_pdf")
+@patch("src.api.api.get_gemini_response")
+def test_analyze_fast_mode_skips_model(mock_get_response, mock_extract_text, mock_pdf_file):
+    mock_extract_text.return_value = "Python developer running services on k8s"
+
+    response = client.post(
+        "/analyze",
+        files={"resume": ("resume.pdf", mock_pdf_file, "application/pdf")},
+        data={"job_description": "Python and Kubernetes required. Terraform preferred.", "mode": "fast"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["missing_keywords"] == ["terraform"]
+    assert body["jd_match"] != "0%"
+    mock_get_response.assert_not_called()
+
+
+@patch("src.api.api.get_gemini_response")
+def test_ats_check_hybrid_mode_merges_keyword_scores(mock_get_response):
+    mock_get_response.return_value = json.dumps({"scores": {"overall_ats_score": 80}, "formatting_issues": []})
+
+    response = client.post(
+        "/jobs/ats-check?mode=hybrid",
+        json={"resume_text": "Python engineer", "job_description": "Python and Kubernetes required."},
+    )
+
+    body = response.json()
+    assert body["scores"]["overall_ats_score"] == 80
+    assert "keyword_match" in body["scores"]
+    assert body["missing_keywords"] == ["kubernetes"]
+
+
+@pytest.fixture
+def temp_resume_index(tmp_path, monkeypatch):
+    monkeypatch.setitem(api_module.config, "resume_index_path", str(tmp_path / "index"))
+    monkeypatch.setattr(api_module, "resume_index", None)
+    yield
+    if api_module.resume_index is not None:
+        api_module.resume_index.close()
+
+
+@patch("src.api.api.get_gemini_response")
+def test_recruiter_search_shortlists_before_scoring(mock_get_response, temp_resume_index):
+    resumes = [
+        {"resume_id": "alice", "resume_text": "Python FastAPI Docker Kubernetes backend engineer"},
+        {"resume_id": "bob", "resume_text": "Figma UX researcher and product designer"},
+        {"resume_id": "carol", "resume_text": "Python data engineer with Spark and Kafka"},
+    ]
+    assert client.post("/recruiter/index", json={"resumes": resumes}).json()["indexed"] == 3
+
+    mock_get_response.return_value = json.dumps({
+        "candidate_rankings": [{"candidate_id": "Resume_1", "overall_score": "88%"}],
+        "skill_matrix": [],
+    })
+    response = client.post(
+        "/recruiter/search",
+        json={"job_description": "Backend Python engineer with Docker and Kubernetes", "top_k": 2, "score": True},
+    )
+
+    body = response.json()
+    assert [candidate["resume_id"] for candidate in body["candidates"]][0] == "alice"
+    assert len(body["candidates"]) == 2
+    assert mock_get_response.call_count == 2
+    assert body["scoring"]["candidate_rankings"][0]["candidate_id"] == "alice"
+
+    assert client.delete("/recruiter/index/alice").status_code == 200
+    assert client.delete("/recruiter/index/alice").status_code == 404
+
+
+@patch("src.api.api.get_gemini_response")
+def test_batch_runs_features_and_reports_errors_per_feature(mock_get_response):
+    def fake_response(prompt, **options):
+        if "role fit" in options.get("system_instruction", ""):
+            return "not json"
+        return json.dumps({"prompt_length": len(prompt)})
+
+    mock_get_response.side_effect = fake_response
+    payload = {
+        "resume_text": "Python engineer",
+        "job_description": "Python and Docker",
+        "features": ["skill_gap", "role_fit", "ats_check", "skill_gap"],
+    }
+
+    response = client.post("/batch", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["results"]) == {"skill_gap", "ats_check"}
+    assert body["errors"]["role_fit"]["status_code"] == 500
+    assert mock_get_response.call_count == 4
+
+    single = client.post(
+        "/resume/skill-gap", json={"resume_text": "Python engineer", "job_description": "Python and Docker"}
+    )
+    assert single.json() == body["results"]["skill_gap"]
+    assert mock_get_response.call_count == 4
+
+
+def test_batch_rejects_unknown_features():
+    response = client.post(
+        "/batch", json={"resume_text": "r", "job_description": "j", "features": ["skill_gap", "horoscope"]}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["unknown_features"] == ["horoscope"]
+
+
+@patch("src.api.api.get_gemini_response")
+def test_prompt_inputs_are_compacted_and_token_counts_reported(mock_get_response):
+    mock_get_response.return_value = json.dumps({"overall_fit": "80%"})
+    resume = "Jane Doe\nPage 1 of 2\nPython   engineer\n\nJane Doe\nPage 2 of 2\nKubernetes"
+
+    response = client.post("/resume/role-fit", json={"resume_text": resume, "job_description": "Python"})
+
+    assert response.status_code == 200
+    assert int(response.headers["X-Compacted-Tokens"]) < int(response.headers["X-Input-Tokens"])
+    prompt = mock_get_response.call_args[0][0]
+    assert "Page 1 of 2" not in prompt
+    assert "Jane Doe\nPython engineer\n\nKubernetes" in prompt
+
+
+@patch("src.api.api.get_gemini_response")
+def test_fenced_model_output_is_repaired_without_retry(mock_get_response):
+    api_module.parse_stats.clear()
+    mock_get_response.return_value = '```json\n{"overall_fit": "80%", "insights": ["a", "b",]}\n```'
+
+    response = client.post("/resume/role-fit", json={"resume_text": "R", "job_description": "J"})
+
+    assert response.status_code == 200
+    assert response.json() == {"overall_fit": "80%", "insights": ["a", "b"]}
+    mock_get_response.assert_called_once()
+    assert client.get("/stats").json()["model_output"]["/resume/role-fit"]["repaired"] == 1
+
+
+@patch("src.api.api.get_gemini_response")
+def test_unrepairable_model_output_is_retried_once(mock_get_response):
+    api_module.parse_stats.clear()
+    mock_get_response.side_effect = ["I cannot help with that.", json.dumps({"overall_fit": "60%"})]
+
+    response = client.post("/resume/role-fit", json={"resume_text": "R", "job_description": "J"})
+
+    assert response.json() == {"overall_fit": "60%"}
+    assert mock_get_response.call_count == 2
+    stats = client.get("/stats").json()["model_output"]["/resume/role-fit"]
+    assert (stats["retried"], stats["clean"], stats["raw_parse_failure_rate"]) == (1, 1, 0.5)
+
+
+@patch("src.api.api.get_gemini_response")
+def test_output_repaired_from_truncation_is_not_cached(mock_get_response):
+    api_module.parse_stats.clear()
+    mock_get_response.side_effect = ['{"overall_fit": "70%", "insights": ["a", "b', json.dumps({"overall_fit": "75%"})]
+    payload = {"resume_text": "R", "job_description": "J"}
+
+    first = client.post("/resume/role-fit", json=payload)
+    second = client.post("/resume/role-fit", json=payload)
+
+    assert first.json() == {"overall_fit": "70%", "insights": ["a", "b"]}
+    assert second.json() == {"overall_fit": "75%"}
+    assert mock_get_response.call_count == 2
+    assert client.get("/stats").json()["model_output"]["/resume/role-fit"]["truncated"] == 1
+
+
+class _RateLimited(Exception):
+    code = 429
+
+
+@patch("src.api.api.get_gemini_response")
+def test_upstream_rate_limit_maps_to_429_after_retries(mock_get_response, monkeypatch):
+    from src.models.resilience import CircuitBreaker, ResilientCaller
+
+    monkeypatch.setattr(api_module, "model_resilience", ResilientCaller(CircuitBreaker(), base_delay=0.001))
+    mock_get_response.side_effect = _RateLimited("quota")
+
+    response = client.post("/resume/role-fit", json={"resume_text": "R", "job_description": "J"})
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert mock_get_response.call_count == 3
+
+
+@patch("src.api.api.get_gemini_response")
+def test_open_circuit_fails_fast_with_503(mock_get_response, monkeypatch):
+    from src.models.resilience import CircuitBreaker, ResilientCaller
+
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    monkeypatch.setattr(api_module, "model_resilience", ResilientCaller(breaker))
+
+    response = client.post("/resume/role-fit", json={"resume_text": "R", "job_description": "J"})
+
+    assert response.status_code == 503
+    mock_get_response.assert_not_called()
+    assert client.get("/stats").json()["model_resilience"]["circuit_breaker"]["state"] == "open"
+
+
+@patch("src.api.api.get_gemini_response")
+def test_waiting_for_the_rate_limit_does_not_count_against_the_deadline(mock_get_response, monkeypatch):
+    from src.models.resilience import CircuitBreaker, ResilientCaller
+    from src.models.scheduler import ModelScheduler
+
+    scheduler = ModelScheduler(4, requests_per_minute=60)
+    scheduler._requests.take(60)  # empty: the next request is admitted about a second from now
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    monkeypatch.setattr(api_module, "model_scheduler", scheduler)
+    monkeypatch.setattr(api_module, "model_resilience", ResilientCaller(breaker))
+    monkeypatch.setitem(api_module.config, "model_deadline_seconds", 0.3)
+    mock_get_response.return_value = json.dumps({"overall_fit": "70%"})
+
+    started = time.monotonic()
+    response = client.post("/resume/role-fit", json={"resume_text": "R", "job_description": "J"})
+
+    assert response.status_code == 200
+    assert time.monotonic() - started > 0.3
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert api_module.model_resilience.stats()["deadline_exceeded"] == 0
+
+
+@patch("src.api.api.get_gemini_response")
+def test_model_calls_pass_through_the_scheduler(mock_get_response, monkeypatch):
+    from src.models.scheduler import ModelScheduler
+
+    scheduler = ModelScheduler(4, tokens_per_minute=100_000)
+    monkeypatch.setattr(api_module, "model_scheduler", scheduler)
+    mock_get_response.return_value = json.dumps({"overall_fit": "70%"})
+
+    response = client.post("/resume/role-fit", json={"resume_text": "R", "job_description": "J"})
+
+    assert response.status_code == 200
+    stats = client.get("/stats").json()["model_scheduler"]
+    assert stats["in_flight"] == 0
+    assert stats["endpoints"]["/resume/role-fit"]["admitted"] == 1
+    assert stats["token_budget_left"] < 100_000
+
+
+@patch("src.api.api.get_gemini_response")
+def test_metrics_endpoint_exports_route_stage_and_usage_metrics(mock_get_response):
+    mock_get_response.return_value = json.dumps({"overall_fit": "75%"})
+    client.post("/resume/role-fit", json={"resume_text": "Python resume", "job_description": "Python job"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_requests_total{method="POST",route="/resume/role-fit",status="200"}' in text
+    for stage in ("compaction", "prompt_build", "model_call", "json_decode"):
+        assert f'stage_duration_seconds_count{{route="/resume/role-fit",stage="{stage}"}}' in text
+    assert 'model_tokens_total{direction="prompt",route="/resume/role-fit"}' in text
+    assert 'response_cache_lookups_total{result="miss",route="/resume/role-fit"}' in text
+    assert "model_circuit_state 0" in text
+    assert "p95" in client.get("/stats").json()["latency"]["http"]["route=/resume/role-fit"]
+
+
+def test_stage_metrics_are_labelled_with_the_route_template(monkeypatch):
+    from src.utils.metrics import current_route
+
+    seen = []
+
+    class RecordingIndex:
+        def delete(self, resume_id):
+            seen.append(current_route.get())
+            return False
+
+    monkeypatch.setattr(api_module, "_get_resume_index", lambda: RecordingIndex())
+
+    assert client.delete("/recruiter/index/alice").status_code == 404
+    assert client.delete("/recruiter/index/bob").status_code == 404
+    assert seen == ["/recruiter/index/{resume_id}"] * 2
+    assert api_module._route_template({"type": "http", "path": "/nowhere", "method": "GET"}) == "unmatched"
+
+
+@patch("src.api.api.get_gemini_response")
+def test_model_usage_uses_provider_token_counts_when_reported(mock_get_response):
+    from src.models.gemini import ModelText
+    from src.utils.metrics import MODEL_TOKENS
+
+    route = "/resume/skill-gap"
+    before = {direction: MODEL_TOKENS.value(route=route, direction=direction) for direction in ("prompt", "response")}
+    mock_get_response.return_value = ModelText(
+        json.dumps({"missing_skills": []}), {"prompt_tokens": 1234, "response_tokens": 56}
+    )
+
+    assert client.post(route, json={"resume_text": "R", "job_description": "J"}).status_code == 200
+
+    assert MODEL_TOKENS.value(route=route, direction="prompt") - before["prompt"] == 1234
+    assert MODEL_TOKENS.value(route=route, direction="response") - before["response"] == 56
+
+
+@patch("src.api.api.get_gemini_response")
+def test_background_task_submit_poll_and_result(mock_get_response, monkeypatch, tmp_path):
+    from src.utils.task_queue import TaskQueue, TaskStore
+
+    queue = TaskQueue(TaskStore(str(tmp_path / "tasks.sqlite")), api_module.TASK_HANDLERS, poll_interval=0.05)
+    monkeypatch.setattr(api_module, "task_queue", queue)
+    mock_get_response.return_value = json.dumps(
+        {"candidate_rankings": [{"candidate_id": "Resume_1", "overall_score": 88}], "skill_matrix": []}
+    )
+
+    with TestClient(app) as task_client:
+        submitted = task_client.post(
+            "/tasks/recruiter/bulk-score",
+            json={"resumes": ["Only resume"], "job_description": "JD", "mode": "parallel"},
+        )
+        assert submitted.status_code == 202
+        task_id = submitted.json()["task_id"]
+        assert submitted.headers["Location"] == f"/tasks/{task_id}"
+
+        deadline = time.monotonic() + 5
+        while task_client.get(f"/tasks/{task_id}").json()["status"] != "succeeded":
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+
+        status = task_client.get(f"/tasks/{task_id}").json()
+        result = task_client.get(f"/tasks/{task_id}/result")
+
+    assert status["progress"] == 1.0
+    assert result.status_code == 200
+    assert result.json()["candidate_rankings"][0]["candidate_id"] == "Resume_1"
+
+
+def test_unknown_task_returns_404(monkeypatch, tmp_path):
+    from src.utils.task_queue import TaskQueue, TaskStore
+
+    queue = TaskQueue(TaskStore(str(tmp_path / "tasks.sqlite")), api_module.TASK_HANDLERS)
+    monkeypatch.setattr(api_module, "task_queue", queue)
+
+    assert client.get("/tasks/does-not-exist").status_code == 404
+    assert client.delete("/tasks/does-not-exist").status_code == 404
+
+
+def test_task_submission_honours_idempotency_keys(monkeypatch, tmp_path):
+    from src.utils.task_queue import TaskQueue, TaskStore
+
+    queue = TaskQueue(TaskStore(str(tmp_path / "tasks.sqlite")), api_module.TASK_HANDLERS)
+    monkeypatch.setattr(api_module, "task_queue", queue)
+    payload = {"resume_text": "Resume", "job_description": "JD", "focus_role": "Staff Engineer"}
+    headers = {"Idempotency-Key": "retry-me"}
+
+    first = client.post("/tasks/resume/rewrite", json=payload, headers=headers)
+    again = client.post("/tasks/resume/rewrite", json=payload, headers=headers)
+    conflict = client.post("/tasks/resume/rewrite", json={**payload, "job_description": "Other"}, headers=headers)
+
+    assert first.status_code == again.status_code == 202
+    assert again.json()["task_id"] == first.json()["task_id"]
+    assert conflict.status_code == 422
+
+
+def test_task_webhooks_to_internal_addresses_are_rejected(monkeypatch, tmp_path):
+    from src.utils.task_queue import TaskQueue, TaskStore
+
+    queue = TaskQueue(TaskStore(str(tmp_path / "tasks.sqlite")), api_module.TASK_HANDLERS)
+    monkeypatch.setattr(api_module, "task_queue", queue)
+    payload = {"resume_text": "Resume"}
+
+    response = client.post("/tasks/portfolio/generate?webhook_url=http://169.254.169.254/latest", json=payload)
+
+    assert response.status_code == 422
+    assert "non-public" in response.json()["detail"]
+    assert queue.store.stats()["queued"] == 0
+
+
+def test_importing_the_app_defers_the_model_sdk_pdf_library_and_embedder():
+    code = (
+        "import sys, src.api.api; print(sorted(m for m in ('google.generativeai', 'PyPDF2') if m in sys.modules), "
+        "src.api.api.embedder)"
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[] None"
+
+
+def test_stream_error_settles_a_half_open_probe(monkeypatch):
+    from src.models.resilience import CircuitBreaker, ResilientCaller
+
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setattr(api_module, "model_resilience", ResilientCaller(breaker))
+    payload = {"resume_text": "Probe", "job_description": "JD", "focus_role": "SRE"}
+
+    with patch("src.api.api.stream_gemini_response", side_effect=ValueError("blocked prompt")):
+        response = client.post("/resume/rewrite/stream", json=payload)
+
+    assert "blocked prompt" in response.text
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,58 @@
+from src.utils.bulk_scoring import BulkScoreAggregator, chunk_resumes, parse_score
+
+
+def test_chunk_resumes_keeps_global_offsets():
+    chunks = list(chunk_resumes(["a", "b", "c", "d", "e"], 2))
+
+    assert chunks == [(0, ["a", "b"]), (2, ["c", "d"]), (4, ["e"])]
+
+
+def test_parse_score_handles_common_formats():
+    assert parse_score("85%") == 85.0
+    assert parse_score(72) == 72.0
+    assert parse_score("8.5/10") == 85.0
+    assert parse_score("n/a") is None
+    assert parse_score(True) is None
+
+
+def test_aggregator_merges_chunks_and_reports_failures():
+    aggregator = BulkScoreAggregator(total=5)
+    aggregator.add_chunk(
+        0,
+        2,
+        {
+            "candidate_rankings": [
+                {"candidate_id": "Resume_1", "overall_score": "60%"},
+                {"candidate_id": "Resume_2", "overall_score": "90%"},
+            ],
+            "skill_matrix": [{"skill": "Python", "coverage": "100%"}],
+        },
+    )
+    aggregator.add_chunk(
+        2,
+        2,
+        {
+            # Second id is wrong and gets relabelled to the resume's position.
+            "candidate_rankings": [
+                {"candidate_id": "Resume_3", "overall_score": 75},
+                {"candidate_id": "Resume_1", "overall_score": 40},
+            ],
+            "skill_matrix": [{"skill": "Python", "coverage": "50%"}, {"SQL": "20%"}],
+        },
+    )
+    aggregator.add_error(4, 1, "Failed to parse model response")
+
+    result = aggregator.result()
+
+    assert [ranking["candidate_id"] for ranking in result["candidate_rankings"]] == [
+        "Resume_2",
+        "Resume_3",
+        "Resume_1",
+        "Resume_4",
+    ]
+    assert result["skill_matrix"] == [
+        {"skill": "Python", "coverage": "75%"},
+        {"skill": "SQL", "coverage": "20%"},
+    ]
+    assert result["errors"] == [{"candidate_id": "Resume_5", "detail": "Failed to parse model response"}]
+    assert result["summary"] == {"total": 5, "scored": 4, "failed": 1}
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+from src.utils.cache import LRUCache, SQLiteCache, TieredCache, make_cache_key
+
+
+def test_make_cache_key_is_stable_and_part_sensitive():
+    assert make_cache_key("gemini-pro", "prompt") == make_cache_key("gemini-pro", "prompt")
+    assert make_cache_key("gemini-pro", "prompt") != make_cache_key("gemini-pro-2", "prompt")
+    assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+
+def test_lru_cache_enforces_byte_budget_and_ttl():
+    cache = LRUCache(max_entries=10, max_bytes=10, ttl=0.05)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert cache.get("a") is None
+    assert cache.size_bytes == 6
+
+    time.sleep(0.06)
+    assert cache.get("b") is None
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    TieredCache(LRUCache(), SQLiteCache(path)).set("key", "value")
+
+    restarted = TieredCache(LRUCache(), SQLiteCache(path))
+    assert restarted.get("key") == "value"
+    assert restarted.get("key") == "value"
+    assert restarted.get("missing") is None
+
+    stats = restarted.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_sqlite_cache_evicts_oldest_rows_beyond_max_rows(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), max_rows=3)
+    for index in range(5):
+        cache.set(f"key{index}", str(index))
+        time.sleep(0.001)
+
+    assert len(cache) == 3
+    assert cache.evictions == 2
+    assert cache.get("key0") is None and cache.get("key1") is None
+    assert cache.get("key4") == "4"
+
+
+def test_tiered_cache_async_access_runs_disk_io_off_the_event_loop(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    threads = []
+    original_get, original_set = disk.get, disk.set
+    disk.get = lambda key: threads.append(threading.get_ident()) or original_get(key)
+    disk.set = lambda key, value: threads.append(threading.get_ident()) or original_set(key, value)
+
+    async def scenario():
+        cache = TieredCache(LRUCache(), disk)
+        await cache.aset("key", "value")
+        cache.memory.clear()
+        first = await cache.aget("key")
+        second = await cache.aget("key")
+        missing = await cache.aget("missing")
+        return cache, first, second, missing, threading.get_ident()
+
+    cache, first, second, missing, loop_thread = asyncio.run(scenario())
+
+    assert (first, second, missing) == ("value", "value", None)
+    assert len(threads) == 3 and loop_thread not in threads
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from src.models.client import AsyncModelClient
+
+
+def test_run_returns_result():
+    client = AsyncModelClient(max_concurrency=2)
+
+    result = asyncio.run(client.run(lambda prompt: prompt.upper(), "hello"))
+
+    assert result == "HELLO"
+    assert client.stats()["completed"] == 1
+    client.shutdown()
+
+
+def test_blocking_calls_overlap_without_stalling_the_loop():
+    client = AsyncModelClient(max_concurrency=8)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*(client.run(time.sleep, 0.1) for _ in range(8)))
+        elapsed = time.perf_counter() - start
+        beat.cancel()
+        return elapsed, ticks
+
+    elapsed, ticks = asyncio.run(scenario())
+
+    # Eight 100 ms calls finish together rather than serially, and the loop keeps ticking.
+    assert elapsed < 0.5
+    assert ticks >= 5
+    client.shutdown()
+
+
+def test_invalid_concurrency_rejected():
+    with pytest.raises(ValueError):
+        AsyncModelClient(max_concurrency=0)
+
+
+def test_stream_yields_items_from_blocking_iterator():
+    client = AsyncModelClient(max_concurrency=2)
+
+    def produce():
+        for token in ["a", "b", "c"]:
+            time.sleep(0.01)
+            yield token
+
+    async def scenario():
+        return [token async for token in client.stream(produce)]
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+    assert client.stats()["in_flight"] == 0
+    client.shutdown()
+
+
+def test_stream_reraises_producer_errors():
+    client = AsyncModelClient(max_concurrency=1)
+
+    def produce():
+        yield "a"
+        raise RuntimeError("upstream closed")
+
+    async def scenario():
+        seen = []
+        with pytest.raises(RuntimeError, match="upstream closed"):
+            async for token in client.stream(produce):
+                seen.append(token)
+        return seen
+
+    assert asyncio.run(scenario()) == ["a"]
+    client.shutdown()
@@ -0,0 +1,75 @@
+from src.utils.compaction import (
+    compact_inputs,
+    compact_text,
+    estimate_tokens,
+    input_token_budget,
+    split_sections,
+    trim_to_budget,
+)
+
+PAGED_RESUME = """Jane Doe  |  jane@example.com
+Page 1 of 2
+EXPERIENCE
+Built   Python\tservices on   Kubernetes.
+
+
+Jane Doe  |  jane@example.com
+Page 2 of 2
+EDUCATION
+BSc Computer Science
+- 2 -
+"""
+
+
+def test_compact_text_removes_page_furniture_and_repeated_headers():
+    assert compact_text(PAGED_RESUME) == (
+        "Jane Doe | jane@example.com\nEXPERIENCE\nBuilt Python services on Kubernetes.\n\nEDUCATION\n"
+        "BSc Computer Science"
+    )
+
+
+def test_split_sections_breaks_on_blank_lines_and_headings():
+    sections = split_sections("Jane Doe\nSKILLS\nPython\n\nHobbies:\nChess")
+
+    assert sections == ["Jane Doe", "SKILLS\nPython", "Hobbies:\nChess"]
+
+
+def test_trim_to_budget_keeps_header_and_most_relevant_sections():
+    resume = "\n\n".join(
+        [
+            "Jane Doe",
+            "Volunteered at the animal shelter walking dogs every weekend for years",
+            "Deployed Python services on Kubernetes with Docker",
+            "Enjoys chess, hiking, and amateur photography in the mountains",
+        ]
+    )
+
+    trimmed, dropped = trim_to_budget(resume, 18, "Python Kubernetes Docker engineer")
+
+    assert trimmed == "Jane Doe\n\nDeployed Python services on Kubernetes with Docker"
+    assert dropped == 2
+
+
+def test_compact_inputs_reports_token_counts_and_respects_budget():
+    resume = "Jane Doe\n\n" + "\n\n".join(f"Project {idx}: built python tooling" for idx in range(200))
+    job = "Python engineer\n" * 3
+
+    compact_resume, compact_job, report = compact_inputs(resume, job, budget_tokens=200)
+
+    assert compact_job == "Python engineer"
+    assert report["input_tokens"] == estimate_tokens(resume) + estimate_tokens(job)
+    assert report["compacted_tokens"] <= 200
+    assert report["trimmed_sections"] > 0
+    assert compact_resume.startswith("Jane Doe")
+
+
+def test_compact_inputs_accepts_single_text():
+    resume, job, report = compact_inputs("Python  developer", None, budget_tokens=100)
+
+    assert (resume, job) == ("Python developer", None)
+    assert report["compacted_tokens"] == estimate_tokens("Python developer")
+
+
+def test_input_token_budget_uses_model_window_unless_overridden():
+    assert input_token_budget("gemini-1.5-flash") > input_token_budget("gemini-pro")
+    assert input_token_budget("gemini-pro", override=500) == 500
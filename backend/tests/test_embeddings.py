@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.utils.embeddings import (
+    EmbedderUnavailable,
+    HashingEmbedder,
+    chunk_text,
+    get_embedder,
+    semantic_similarity,
+    tokenize,
+)
+
+RESUME = """Jane Doe
+Senior Python Engineer
+Built FastAPI microservices on AWS with Docker and Kubernetes. Led a team of 5 engineers.
+Designed PostgreSQL schemas and data pipelines in Apache Spark."""
+
+JOB = """We are hiring a backend engineer. Experience with Kubernetes and Docker required.
+Knowledge of embedded firmware and Verilog is a plus."""
+
+
+def test_tokenize_keeps_technical_tokens():
+    assert tokenize("Node.js, C++ and the C# stack.") == ["node.js", "c++", "c#", "stack"]
+
+
+def test_chunk_text_merges_short_fragments_and_caps_length():
+    segments = chunk_text("Jane Doe\n" + "word " * 130, max_words=60)
+
+    assert segments[0].startswith("Jane Doe word")
+    assert all(len(segment.split()) <= 60 for segment in segments)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dim=256)
+    first = embedder.embed(["python fastapi docker", ""])
+    second = embedder.embed(["python fastapi docker"])
+
+    assert np.allclose(first[0], second[0])
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+    assert not first[1].any()
+
+
+def test_semantic_similarity_reports_matches_and_gaps():
+    report = semantic_similarity(RESUME, JOB, get_embedder())
+
+    assert report["embedder"] == "hashing"
+    assert report["semantic_similarity_score"].endswith("%")
+    assert report["top_matching_segments"][0]["job_segment"] == "Experience with Kubernetes and Docker required."
+    assert "Docker and Kubernetes" in report["top_matching_segments"][0]["resume_segment"]
+    assert report["gap_segments"][0]["job_segment"].startswith("Knowledge of embedded firmware")
+
+
+def test_unloadable_model_raises_unless_fallback_is_enabled(caplog):
+    with pytest.raises(EmbedderUnavailable):
+        get_embedder("not-a-real/sentence-model")
+
+    assert get_embedder("not-a-real/sentence-model", fallback=True).name == "hashing"
+    assert "not-a-real/sentence-model" in caplog.text
@@ -1,6 +1,27 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.models.gemini import configure_gemini, get_gemini_response
+from src.models import gemini
+from src.models.gemini import (
+    ModelRegistry,
+    configure_gemini,
+    get_gemini_response,
+    json_generation_config,
+    model_registry,
+    stream_gemini_response,
+)
+
+# The pinned SDK (google-generativeai 0.3.1, the last line installable on Python 3.8) predates
+# system instructions, context caching and JSON mode; those paths are only exercised on newer SDKs.
+requires_system_instruction = pytest.mark.skipif(
+    not gemini.SDK_SUPPORTS_SYSTEM_INSTRUCTION, reason="SDK has no system_instruction support"
+)
+requires_context_cache = pytest.mark.skipif(
+    not (gemini.SDK_SUPPORTS_SYSTEM_INSTRUCTION and gemini.SDK_SUPPORTS_CONTEXT_CACHE),
+    reason="SDK has no genai.caching",
+)
+requires_json_mode = pytest.mark.skipif(
+    "response_mime_type" not in gemini._sdk_feature("generation_config_fields"), reason="SDK has no JSON mode"
+)
 
 def test_configure_gemini():
     # Mock the genai.configure function
@@ -11,6 +32,19 @@ def test_configure_gemini():
         # Assert that genai.configure was called with the correct API key
         mock_configure.assert_called_once_with(api_key="test_api_key")
 
+def test_deferred_configuration_is_applied_when_the_sdk_is_first_used(monkeypatch):
+    import google.generativeai as sdk
+
+    monkeypatch.setattr(gemini, "_sdk", None)
+    monkeypatch.setattr(gemini, "_deferred_api_key", None)
+    with patch.object(sdk, "configure") as mock_configure:
+        configure_gemini("late_key", defer=True)
+        assert not gemini.sdk_loaded()
+        mock_configure.assert_not_called()
+
+        assert gemini._genai() is sdk
+        mock_configure.assert_called_once_with(api_key="late_key")
+
 def test_get_gemini_response():
     # Create a mock response
     mock_response = MagicMock()
@@ -21,6 +55,7 @@ def test_get_gemini_response():
     mock_model.generate_content.return_value = mock_response
     
     # Patch the GenerativeModel to return our mock
+    model_registry.clear()
     with patch('src.models.gemini.genai.GenerativeModel', return_value=mock_model):
         # Call our function
         result = get_gemini_response("Test prompt")
@@ -30,3 +65,177 @@ def test_get_gemini_response():
         
         # Assert that generate_content was called with the correct prompt
         mock_model.generate_content.assert_called_once_with("Test prompt")
+
+def test_get_gemini_response_carries_reported_token_usage():
+    mock_response = MagicMock()
+    mock_response.text = "{}"
+    mock_response.usage_metadata.prompt_token_count = 812
+    mock_response.usage_metadata.candidates_token_count = 95
+    mock_model = MagicMock()
+    mock_model.generate_content.return_value = mock_response
+
+    model_registry.clear()
+    with patch('src.models.gemini.genai.GenerativeModel', return_value=mock_model):
+        result = get_gemini_response("Test prompt")
+
+    assert result == "{}"
+    assert result.usage == {"prompt_tokens": 812, "response_tokens": 95}
+
+def test_stream_gemini_response_yields_the_final_usage_chunk():
+    text_chunk = MagicMock()
+    text_chunk.text = "Hello"
+    usage_chunk = MagicMock()
+    type(usage_chunk).text = property(lambda self: (_ for _ in ()).throw(ValueError("no parts")))
+    usage_chunk.usage_metadata.prompt_token_count = 40
+    usage_chunk.usage_metadata.candidates_token_count = 3
+    mock_model = MagicMock()
+    mock_model.generate_content.return_value = iter([text_chunk, usage_chunk])
+
+    model_registry.clear()
+    with patch('src.models.gemini.genai.GenerativeModel', return_value=mock_model):
+        fragments = list(stream_gemini_response("Test prompt"))
+
+    assert fragments == ["Hello", ""]
+    assert fragments[0].usage is None
+    assert fragments[1].usage == {"prompt_tokens": 40, "response_tokens": 3}
+
+def test_model_registry_reuses_instances():
+    registry = ModelRegistry(default_model="gemini-test")
+
+    with patch('src.models.gemini.genai.GenerativeModel', side_effect=lambda *a, **k: MagicMock()) as mock_cls:
+        first = registry.get()
+        second = registry.get("gemini-test")
+        tuned = registry.get(generation_config={"temperature": 0.2})
+
+        assert first is second
+        assert tuned is not first
+        assert mock_cls.call_count == 2
+
+    stats = registry.stats()
+    assert stats["pool_size"] == 2
+    assert stats["builds"] == 2
+    assert stats["reuses"] == 1
+
+
+def test_stream_gemini_response_skips_empty_chunks():
+    text_chunk = MagicMock()
+    text_chunk.text = "Hello"
+    empty_chunk = MagicMock()
+    type(empty_chunk).text = property(lambda self: (_ for _ in ()).throw(ValueError("no parts")))
+
+    mock_model = MagicMock()
+    mock_model.generate_content.return_value = iter([text_chunk, empty_chunk])
+
+    model_registry.clear()
+    with patch('src.models.gemini.genai.GenerativeModel', return_value=mock_model):
+        assert list(stream_gemini_response("Test prompt")) == ["Hello"]
+        mock_model.generate_content.assert_called_once_with("Test prompt", stream=True)
+
+
+def test_registry_sends_static_prefix_inline_for_legacy_models():
+    registry = ModelRegistry(default_model="gemini-pro")
+
+    with patch('src.models.gemini.genai.GenerativeModel', side_effect=lambda *a, **k: MagicMock()) as mock_cls:
+        _, contents = registry.resolve("Resume: R", system_instruction="Task: score")
+
+    assert contents == "Task: score\n\nResume: R"
+    assert "system_instruction" not in mock_cls.call_args.kwargs
+    assert registry.stats()["prefix_strategies"]["inline"] == 1
+
+
+@requires_system_instruction
+def test_registry_uses_system_instruction_for_small_prefixes():
+    registry = ModelRegistry(default_model="gemini-2.5-flash")
+
+    with patch('src.models.gemini.genai.GenerativeModel', side_effect=lambda *a, **k: MagicMock()) as mock_cls:
+        first, contents = registry.resolve("Resume: R", system_instruction="Task: score")
+        second, _ = registry.resolve("Resume: S", system_instruction="Task: score")
+
+    assert contents == "Resume: R"
+    assert first is second
+    assert mock_cls.call_args.kwargs["system_instruction"] == "Task: score"
+    assert registry.stats()["prefix_strategies"]["system_instruction"] == 2
+
+
+@requires_context_cache
+def test_registry_caches_large_prefixes_as_provider_context():
+    registry = ModelRegistry(default_model="gemini-2.5-flash")
+    registry.context_cache_min_tokens = {"gemini-2.5-flash": 4}
+    cached_model = MagicMock()
+
+    with patch('src.models.gemini.genai.caching.CachedContent.create') as mock_create, patch(
+        'src.models.gemini.genai.GenerativeModel.from_cached_content', return_value=cached_model
+    ):
+        first, contents = registry.resolve("Resume: R", system_instruction="Task: score the resume carefully")
+        second, _ = registry.resolve("Resume: S", system_instruction="Task: score the resume carefully")
+
+    assert first is cached_model and second is cached_model
+    assert contents == "Resume: R"
+    mock_create.assert_called_once()
+    stats = registry.stats()
+    assert stats["prefix_strategies"]["cached_content"] == 2
+    assert stats["context_cache_creations"] == 1
+
+
+@requires_context_cache
+def test_registry_falls_back_to_system_instruction_when_cache_creation_fails():
+    registry = ModelRegistry(default_model="gemini-2.5-flash")
+    registry.context_cache_min_tokens = {"gemini-2.5-flash": 1}
+
+    with patch('src.models.gemini.genai.caching.CachedContent.create', side_effect=RuntimeError("quota")), patch(
+        'src.models.gemini.genai.GenerativeModel', side_effect=lambda *a, **k: MagicMock()
+    ):
+        _, contents = registry.resolve("Resume: R", system_instruction="Task: score")
+
+    assert contents == "Resume: R"
+    assert registry.stats()["prefix_strategies"]["system_instruction"] == 1
+
+
+@requires_json_mode
+def test_json_generation_config_requests_json_mode_on_capable_models():
+    schema = {"type": "object", "properties": {"score": {"type": "string"}}}
+
+    assert json_generation_config("gemini-pro") is None
+    assert json_generation_config("gemini-2.5-flash", schema) == {
+        "response_mime_type": "application/json",
+        "response_schema": schema,
+    }
+
+
+def test_old_sdks_get_the_prefix_inline_and_no_json_mode(monkeypatch):
+    monkeypatch.setattr(gemini, "_genai", lambda: MagicMock())
+    monkeypatch.setattr(
+        gemini,
+        "_sdk_features",
+        {"system_instruction": False, "context_cache": False, "generation_config_fields": frozenset()},
+    )
+    registry = ModelRegistry(default_model="gemini-2.5-flash")
+
+    _, contents = registry.resolve("Resume: R", system_instruction="Task: score")
+
+    assert contents == "Task: score\n\nResume: R"
+    assert json_generation_config("gemini-2.5-flash") is None
+
+
+@requires_context_cache
+def test_context_cache_creation_does_not_hold_the_registry_lock():
+    registry = ModelRegistry(default_model="gemini-2.5-flash")
+    registry.context_cache_min_tokens = {"gemini-2.5-flash": 1}
+    during_create = {}
+
+    def create(**kwargs):
+        during_create["locked"] = registry._lock.locked()
+        # A concurrent request for the same prefix is served without waiting for the cache.
+        during_create["other"] = registry.resolve("Resume: S", system_instruction="Task: score")
+        return MagicMock()
+
+    with patch('src.models.gemini.genai.caching.CachedContent.create', side_effect=create), patch(
+        'src.models.gemini.genai.GenerativeModel', side_effect=lambda *a, **k: MagicMock()
+    ), patch('src.models.gemini.genai.GenerativeModel.from_cached_content', return_value=MagicMock()):
+        registry.resolve("Resume: R", system_instruction="Task: score")
+
+    assert during_create["locked"] is False
+    assert during_create["other"][1] == "Resume: S"
+    stats = registry.stats()
+    assert stats["prefix_strategies"] == {"inline": 0, "system_instruction": 1, "cached_content": 1}
+    assert stats["context_cache_creations"] == 1
@@ -0,0 +1,34 @@
+import json
+
+from src.utils.json_stream import JsonFieldStreamer
+
+
+def _feed_in_pieces(streamer, text, size):
+    return "".join(streamer.feed(text[idx : idx + size]) for idx in range(0, len(text), size))
+
+
+def test_streams_target_field_across_arbitrary_splits():
+    document = json.dumps({
+        "key_adjustments": ["Led \"migration\""],
+        "rewritten_resume": "# Jane Doe\n\n- Shipped *3* products — \U0001F680 fast\n\t\"quoted\"",
+        "keyword_alignment_score": "91%",
+    })
+
+    for size in (1, 3, 7, len(document)):
+        streamer = JsonFieldStreamer("rewritten_resume")
+        assert _feed_in_pieces(streamer, document, size) == json.loads(document)["rewritten_resume"]
+        assert streamer.done
+
+
+def test_ignores_nested_keys_with_the_same_name_and_markdown_fences():
+    document = '```json\n{"meta": {"cover_letter": "nested"}, "cover_letter": "Dear team,"}\n```'
+    streamer = JsonFieldStreamer("cover_letter")
+
+    assert _feed_in_pieces(streamer, document, 4) == "Dear team,"
+
+
+def test_yields_nothing_when_field_is_absent_or_not_a_string():
+    streamer = JsonFieldStreamer("cover_letter")
+
+    assert streamer.feed('{"cover_letter": {"body": "text"}, "other": "value"}') == ""
+    assert not streamer.done
@@ -0,0 +1,70 @@
+import json
+
+from src.utils.keywords import AhoCorasick, KeywordMatcher, get_keyword_matcher
+
+JOB = """Senior Backend Engineer.
+We need strong Python and Kubernetes experience. You will deploy services to AWS.
+Experience with PostgreSQL and Terraform is required. Kubernetes operators are a plus."""
+
+
+def test_aho_corasick_finds_overlapping_token_patterns():
+    automaton = AhoCorasick()
+    automaton.add(("machine", "learning"), "ml")
+    automaton.add(("learning",), "learning")
+    matches = list(automaton.build().iter_matches(["applied", "machine", "learning"]))
+
+    assert (1, 3, "ml") in matches
+    assert (2, 3, "learning") in matches
+
+
+def test_skills_in_prefers_longest_match():
+    matcher = KeywordMatcher({"google cloud platform": ("google cloud",), "google": ()})
+
+    skills = matcher.skills_in(["google", "cloud", "platform", "google"])
+
+    assert [skill for _, _, skill in skills] == ["google cloud platform", "google"]
+
+
+def test_job_terms_rank_skills_and_drop_boilerplate():
+    terms = KeywordMatcher().job_terms(JOB)
+
+    assert list(terms)[0] == "kubernetes"
+    assert {"python", "postgresql", "terraform", "amazon web services"} <= set(terms)
+    assert "experience" not in terms
+    assert "required" not in terms
+
+
+def test_job_terms_drop_numbers_seniority_and_role_titles():
+    job = "Senior Software Engineer. You have 5+ years with Python. You know Kafka; 2024 hires mentor others."
+
+    terms = KeywordMatcher().job_terms(job)
+
+    assert {"python", "apache kafka", "software", "mentor"} <= set(terms)
+    assert not {"5+", "2024", "know", "senior", "engineer", "others"} & set(terms)
+
+
+def test_default_matcher_follows_the_loaded_skill_taxonomy(tmp_path):
+    from src.utils.skills import load_skill_taxonomy
+
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps({"data": {"dbt": ["data build tool"]}}))
+    try:
+        assert get_keyword_matcher().synonyms["apache spark"] == ("spark", "pyspark")
+        load_skill_taxonomy(str(path))
+        assert get_keyword_matcher().synonyms == {"dbt": ("data build tool",)}
+    finally:
+        load_skill_taxonomy()
+
+
+def test_score_recognises_synonyms_and_reports_missing_terms():
+    resume = "Built Python services on k8s, deployed to Amazon Web Services with Postgres."
+
+    result = get_keyword_matcher().score(resume, JOB)
+
+    assert {"python", "kubernetes", "amazon web services", "postgresql"} <= set(result["matched_keywords"])
+    assert "terraform" in result["missing_keywords"]
+    assert 0 < int(result["jd_match"].rstrip("%")) < 100
+
+
+def test_score_handles_empty_job_description():
+    assert KeywordMatcher().score("Python", "") == {"jd_match": "0%", "matched_keywords": [], "missing_keywords": []}
@@ -0,0 +1,76 @@
+import pytest
+
+from src.utils.metrics import MetricsRegistry, current_route
+
+
+def test_counter_exposition_includes_help_type_and_labels():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.")
+    requests.inc(route="/analyze", status=200)
+    requests.inc(2, route="/analyze", status=200)
+
+    text = registry.render()
+
+    assert "# HELP requests_total Requests.\n# TYPE requests_total counter\n" in text
+    assert 'requests_total{route="/analyze",status="200"} 3\n' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.observe(value, stage="model_call")
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{stage="model_call",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{stage="model_call",le="1"} 3' in text
+    assert 'latency_seconds_bucket{stage="model_call",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{stage="model_call"} 4' in text
+    assert 'latency_seconds_sum{stage="model_call"} 2.65' in text
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(1.0, 2.0, 4.0))
+    for _ in range(50):
+        latency.observe(0.5, route="/a")
+    for _ in range(50):
+        latency.observe(3.0, route="/a")
+
+    summary = latency.summary()["route=/a"]
+
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(1.0)
+    assert 2.0 < summary["p95"] <= 4.0
+    assert summary["p99"] <= 4.0
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("odd_total", "Odd labels.").inc(path='a"b\\c')
+
+    assert 'odd_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_collectors_are_read_at_scrape_time():
+    registry = MetricsRegistry()
+    state = {"value": 0}
+    registry.register_collector(lambda: [("circuit_state", "gauge", "State.", [({}, state["value"])])])
+
+    state["value"] = 2
+
+    assert "# TYPE circuit_state gauge\ncircuit_state 2\n" in registry.render()
+
+
+def test_span_uses_the_current_route():
+    from src.utils.metrics import STAGE_SECONDS, span
+
+    token = current_route.set("/test/span")
+    try:
+        with span("prompt_build"):
+            pass
+    finally:
+        current_route.reset(token)
+
+    assert STAGE_SECONDS.count(route="/test/span", stage="prompt_build") == 1
@@ -1,6 +1,9 @@
+import io
+import os
+
 import pytest
 from unittest.mock import MagicMock, patch
-from src.utils.pdf_utils import extract_text_from_pdf
+from src.utils.pdf_utils import PDFLimitError, extract_text_from_pdf, iter_pdf_pages
 
 def test_extract_text_from_pdf():
     # Create a mock PDF file
@@ -20,3 +23,87 @@ def test_extract_text_from_pdf():
         # Assert the result is as expected
         assert result == "Sample text from PDFSample text from PDF"
         assert len(result) > 0
+
+
+def _make_pdf(page_texts):
+    """Build a minimal uncompressed PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+def test_iter_pdf_pages_yields_each_page():
+    data = _make_pdf(["Page one", "Page two", "Page three"])
+
+    pages = list(iter_pdf_pages(io.BytesIO(data)))
+
+    assert [page.strip() for page in pages] == ["Page one", "Page two", "Page three"]
+
+
+def test_parallel_extraction_matches_sequential(tmp_path):
+    texts = [f"Portfolio page {idx}" for idx in range(20)]
+    data = _make_pdf(texts)
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(data)
+
+    sequential = extract_text_from_pdf(io.BytesIO(data), parallel_threshold=1000)
+    parallel_from_bytes = extract_text_from_pdf(io.BytesIO(data), parallel_threshold=1)
+    parallel_from_path = extract_text_from_pdf(str(path), parallel_threshold=1)
+
+    assert parallel_from_bytes == sequential == parallel_from_path
+    assert "Portfolio page 19" in sequential
+
+
+def test_in_memory_documents_reach_workers_as_one_temporary_file(monkeypatch):
+    from concurrent.futures import Future
+
+    from src.utils import pdf_utils
+
+    submitted = []
+
+    class InlinePool:
+        def submit(self, fn, source, start, stop):
+            submitted.append(source)
+            future = Future()
+            future.set_result(fn(source, start, stop))
+            return future
+
+    monkeypatch.setattr(pdf_utils, "_get_pool", lambda: InlinePool())
+    data = _make_pdf([f"Page {idx}" for idx in range(20)])
+
+    text = extract_text_from_pdf(data, parallel_threshold=1)
+
+    assert "Page 19" in text
+    assert len(submitted) == 3 and len(set(submitted)) == 1
+    assert isinstance(submitted[0], str) and not os.path.exists(submitted[0])
+
+
+def test_limits_are_enforced():
+    data = _make_pdf(["a", "b", "c"])
+
+    with pytest.raises(PDFLimitError):
+        extract_text_from_pdf(io.BytesIO(data), max_pages=2)
+    with pytest.raises(PDFLimitError):
+        extract_text_from_pdf(io.BytesIO(data), max_bytes=100)
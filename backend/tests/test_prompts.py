@@ -1,5 +1,5 @@
 import pytest
-from src.utils.prompts import get_ats_evaluation_prompt
+from src.utils.prompts import get_ats_evaluation_prompt, get_role_fit_prompt, get_skill_gap_prompt, split_prompt
 
 def test_get_ats_evaluation_prompt():
     # Test data
@@ -17,3 +17,25 @@ def test_get_ats_evaluation_prompt():
     assert "jd_match" in prompt or "JD Match" in prompt
     assert "missing_keywords" in prompt or "MissingKeywords" in prompt
     assert "profile_summary" in prompt or "Profile Summary" in prompt
+
+
+def test_split_prompt_separates_static_prefix_from_input():
+    first_prefix, first_input = split_prompt(get_role_fit_prompt("Resume A", "Job A"))
+    second_prefix, second_input = split_prompt(get_role_fit_prompt("Resume B", "Job B"))
+
+    assert first_prefix == second_prefix
+    assert first_prefix.startswith("You are AI Career Copilot")
+    assert "Resume A" not in first_prefix
+    assert first_input == "Resume:\nResume A\n\nJob Description:\nJob A"
+    assert second_input.startswith("Resume:\nResume B")
+
+
+def test_known_skills_stay_out_of_static_prefix():
+    prefix, model_input = split_prompt(get_skill_gap_prompt("R", "J", known_skills={"resume_skills": ["python"]}))
+
+    assert "python" not in prefix
+    assert "Resume skills: python" in model_input
+
+
+def test_split_prompt_without_marker_returns_whole_prompt():
+    assert split_prompt("plain prompt") == (None, "plain prompt")
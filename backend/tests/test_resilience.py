@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+from src.models.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ModelDeadlineExceeded,
+    ResilientCaller,
+    is_transient,
+)
+
+
+class UpstreamError(Exception):
+    def __init__(self, code):
+        super().__init__(f"upstream {code}")
+        self.code = code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _sequence(*outcomes):
+    calls = []
+
+    async def operation():
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(outcome)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if callable(outcome):
+            return await outcome()
+        return outcome
+
+    return operation, calls
+
+
+def test_is_transient_classifies_status_codes():
+    assert is_transient(UpstreamError(503))
+    assert is_transient(UpstreamError(429))
+    assert is_transient(ConnectionError())
+    assert not is_transient(UpstreamError(400))
+    assert not is_transient(ValueError("bad"))
+
+
+def test_transient_errors_are_retried_with_backoff():
+    caller = ResilientCaller(max_attempts=3, base_delay=0.001)
+    operation, calls = _sequence(UpstreamError(503), UpstreamError(429), "ok")
+
+    assert asyncio.run(caller.call(operation, deadline=1.0)) == "ok"
+    assert len(calls) == 3
+    assert caller.stats()["retries"] == 2
+
+
+def test_non_transient_errors_are_not_retried():
+    caller = ResilientCaller(max_attempts=3, base_delay=0.001)
+    operation, calls = _sequence(UpstreamError(400), "ok")
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(caller.call(operation, deadline=1.0))
+    assert len(calls) == 1
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_deadline_covers_the_whole_call():
+    async def slow():
+        await asyncio.sleep(1)
+
+    caller = ResilientCaller()
+    operation, _ = _sequence(slow)
+
+    with pytest.raises(ModelDeadlineExceeded):
+        asyncio.run(caller.call(operation, deadline=0.05))
+    assert caller.stats()["deadline_exceeded"] == 1
+
+
+def test_circuit_opens_fails_fast_and_recovers_after_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=clock)
+    caller = ResilientCaller(breaker, max_attempts=1)
+    failing, failing_calls = _sequence(UpstreamError(503))
+
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            asyncio.run(caller.call(failing, deadline=1.0))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(caller.call(failing, deadline=1.0))
+    assert len(failing_calls) == 2
+    assert breaker.stats()["state"] == "open"
+
+    clock.now = 11
+    healthy, _ = _sequence("ok")
+    assert asyncio.run(caller.call(healthy, deadline=1.0)) == "ok"
+    assert breaker.stats() == {
+        "state": "closed",
+        "state_value": 0,
+        "consecutive_failures": 0,
+        "opened_total": 1,
+        "rejected_total": 1,
+    }
+
+
+def test_failed_half_open_probe_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 6
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_slow_attempt_is_hedged_after_p95_latency():
+    caller = ResilientCaller(hedge=True, hedge_min_samples=3)
+    for _ in range(3):
+        caller.latency.record(0.01)
+    started = []
+
+    async def operation():
+        started.append(len(started))
+        await asyncio.sleep(0.5 if len(started) == 1 else 0.01)
+        return f"response-{len(started)}"
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        begin = loop.time()
+        result = await caller.call(operation, deadline=2.0)
+        return result, loop.time() - begin
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result == "response-2"
+    assert elapsed < 0.3
+    assert caller.stats()["hedges"] == 1
+    assert caller.stats()["hedge_wins"] == 1
+
+
+def test_cancelling_during_the_hedge_window_stops_the_primary_attempt():
+    caller = ResilientCaller(hedge=True, hedge_min_samples=3)
+    for _ in range(3):
+        caller.latency.record(0.2)
+    outcomes = []
+
+    async def operation():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            outcomes.append("cancelled")
+            raise
+
+    async def scenario():
+        call = asyncio.ensure_future(caller.call(operation, deadline=60))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    leftover = asyncio.run(scenario())
+
+    assert outcomes == ["cancelled"]
+    assert leftover == []
+    assert caller.stats()["hedges"] == 0
+
+
+def test_cancelled_half_open_probe_is_released():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    caller = ResilientCaller(breaker, max_attempts=1)
+    breaker.record_failure()
+    clock.now = 6
+
+    async def scenario():
+        probe = asyncio.ensure_future(caller.call(lambda: asyncio.sleep(30), deadline=60))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    asyncio.run(scenario())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
@@ -0,0 +1,217 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from src.models.scheduler import BULK, INTERACTIVE, STANDARD, ModelScheduler, SharedTokenBucket, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_continuously():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+
+    bucket.take(60)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    clock.now = 0.5
+    assert bucket.delay(1) == pytest.approx(0.5)
+    clock.now = 120
+    assert bucket.level == 60
+
+
+def test_unlimited_bucket_never_delays():
+    bucket = TokenBucket(0)
+    bucket.take(10_000)
+    assert bucket.delay(10_000) == 0.0
+    assert bucket.level is None
+
+
+def test_oversized_requests_wait_for_a_full_bucket_instead_of_forever():
+    clock = FakeClock()
+    bucket = TokenBucket(100, clock)
+
+    assert bucket.delay(500) == 0.0
+    bucket.take(500)
+    assert bucket.delay(500) == pytest.approx(60.0)
+
+
+def test_try_take_only_spends_available_budget():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)
+
+    assert bucket.try_take(50) == 0.0
+    assert bucket.try_take(20) == pytest.approx(10.0)
+    assert bucket.level == 10
+    bucket.refund(50)
+    assert bucket.level == 60
+
+
+def test_settle_tokens_refunds_or_charges_the_difference_to_real_usage(tmp_path):
+    clock = FakeClock()
+    scheduler = ModelScheduler(4, tokens_per_minute=1000, clock=clock)
+    scheduler._tokens.take(300)
+
+    scheduler.settle_tokens(reserved=300, used=100)
+    assert scheduler.stats()["token_budget_left"] == 900
+    scheduler.settle_tokens(reserved=100, used=400)
+    assert scheduler.stats()["token_budget_left"] == 600
+
+    shared = SharedTokenBucket(str(tmp_path / "limits.sqlite"), "tokens", 1000, clock, lease_fraction=0.1)
+    assert shared.refill(100) == 0
+    shared.take(250)
+    assert shared.level == 750
+    assert shared.try_take(1) is None
+    shared.close()
+
+
+def test_shared_buckets_draw_from_one_budget(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "limits.sqlite")
+    first = SharedTokenBucket(path, "requests", 60, clock, lease_fraction=0.5)
+    second = SharedTokenBucket(path, "requests", 60, clock, lease_fraction=0.5)
+
+    # Nothing is spent until a chunk has been leased from the file.
+    assert first.try_take(10) is None
+    assert first.refill(10) == 0.0
+    assert first.try_take(10) == 0.0
+    assert first.try_take(20) == 0.0
+    assert second.refill(40) == pytest.approx(10.0)
+    assert second.refill(30) == 0.0
+    assert second.try_take(30) == 0.0
+    assert second.try_take(1) is None
+    assert second.level == 0
+    clock.now = 30
+    assert second.level == 30
+    first.close()
+    second.close()
+
+
+def test_shared_bucket_close_returns_the_unspent_lease(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "limits.sqlite")
+    first = SharedTokenBucket(path, "requests", 60, clock, lease_fraction=0.5)
+    assert first.refill(1) == 0.0
+    assert first.try_take(1) == 0.0
+    first.close()
+
+    second = SharedTokenBucket(path, "requests", 60, clock)
+    assert second.refill(59) == 0.0
+    assert second.refill(60) == pytest.approx(1.0)
+    second.close()
+
+
+def test_shared_scheduler_leases_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "limits.sqlite")
+    refill_threads = []
+
+    async def scenario():
+        scheduler = ModelScheduler(8, requests_per_minute=6000, shared_state_path=path)
+        refill = scheduler._requests.refill
+
+        def spy(amount):
+            refill_threads.append(threading.get_ident())
+            return refill(amount)
+
+        scheduler._requests.refill = spy
+        for _ in range(5):
+            await scheduler.acquire("/analyze")
+        with sqlite3.connect(path) as conn:
+            before = conn.execute("SELECT level, updated FROM buckets").fetchall()
+            stats = scheduler.stats()
+            after = conn.execute("SELECT level, updated FROM buckets").fetchall()
+        return threading.get_ident(), stats, before == after
+
+    loop_thread, stats, unchanged = asyncio.run(scenario())
+
+    assert stats["endpoints"]["/analyze"]["admitted"] == 5
+    # 5% of 6000 rpm is a 300-request lease, so one refill covers every admission.
+    assert len(refill_threads) == 1 and loop_thread not in refill_threads
+    assert unchanged
+
+
+async def _admission_order(scheduler, requests):
+    """Occupy the only slot, queue ``requests`` and return the order they are admitted in."""
+
+    order = []
+    await scheduler.acquire("/busy")
+
+    async def worker(endpoint, priority):
+        async with scheduler.slot(endpoint, priority):
+            order.append(endpoint)
+            await asyncio.sleep(0)
+
+    tasks = [asyncio.ensure_future(worker(endpoint, priority)) for endpoint, priority in requests]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_interactive_calls_jump_ahead_of_queued_bulk_work():
+    scheduler = ModelScheduler(1)
+    requests = [("/recruiter/bulk-score", BULK)] * 3 + [("/jobs/parse", STANDARD), ("/career/coach", INTERACTIVE)]
+
+    order = asyncio.run(_admission_order(scheduler, requests))
+
+    assert order[:2] == ["/career/coach", "/jobs/parse"]
+    assert order[2:] == ["/recruiter/bulk-score"] * 3
+
+
+def test_endpoints_in_the_same_class_are_served_round_robin():
+    scheduler = ModelScheduler(1)
+    requests = [("/a", STANDARD)] * 3 + [("/b", STANDARD)] * 2
+
+    order = asyncio.run(_admission_order(scheduler, requests))
+
+    assert order == ["/a", "/b", "/a", "/b", "/a"]
+
+
+def test_request_rate_limit_spaces_out_admissions():
+    async def scenario():
+        scheduler = ModelScheduler(8, requests_per_minute=600)
+        scheduler._requests._level = 0.0
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await scheduler.acquire("/analyze")
+        await scheduler.acquire("/analyze")
+        return loop.time() - started, scheduler.stats()
+
+    elapsed, stats = asyncio.run(scenario())
+
+    # 600 rpm is one request per 100 ms.
+    assert elapsed >= 0.18
+    assert stats["endpoints"]["/analyze"]["admitted"] == 2
+    assert stats["endpoints"]["/analyze"]["max_wait_ms"] > 0
+
+
+def test_cancelled_waiters_leave_the_queue():
+    async def scenario():
+        scheduler = ModelScheduler(1)
+        await scheduler.acquire("/busy")
+        waiter = asyncio.ensure_future(scheduler.acquire("/recruiter/bulk-score", BULK))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"]["bulk"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release()
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["in_flight"] == 0
+    assert stats["queued"]["bulk"] == 0
+    assert stats["endpoints"]["/recruiter/bulk-score"] == {
+        "queue_depth": 0,
+        "admitted": 0,
+        "avg_wait_ms": 0.0,
+        "max_wait_ms": 0.0,
+    }
@@ -0,0 +1,23 @@
+import os
+
+from src.serve import SHARED_STATE_FILES, pdf_pool_size, shared_state_env, worker_count
+
+
+def test_worker_count_defaults_to_one_per_cpu():
+    assert worker_count(0, cpu_count=6) == 6
+    assert worker_count(3, cpu_count=6) == 3
+    assert worker_count(0, cpu_count=0) == 1
+
+
+def test_shared_state_env_keeps_explicit_paths():
+    env = shared_state_env("/srv/state", {"TASK_DB_PATH": "/data/tasks.sqlite"})
+
+    assert "TASK_DB_PATH" not in env
+    assert env["RATE_LIMIT_STATE_PATH"] == os.path.join("/srv/state", SHARED_STATE_FILES["RATE_LIMIT_STATE_PATH"])
+    assert set(env) == set(SHARED_STATE_FILES) - {"TASK_DB_PATH"}
+
+
+def test_pdf_pool_is_split_between_workers():
+    assert pdf_pool_size(4, cpu_count=8) == 2
+    assert pdf_pool_size(8, cpu_count=8) == 1
+    assert pdf_pool_size(3, cpu_count=2) == 1
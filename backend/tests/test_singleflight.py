@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result == {"value": 42} for result, _ in results)
+    assert sum(shared for _, shared in results) == 9
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "followers": 9}
+
+
+def test_failures_are_shared_but_not_remembered():
+    flights = SingleFlight()
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        if attempts == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    async def scenario():
+        first = await asyncio.gather(*(flights.do("key", flaky) for _ in range(3)), return_exceptions=True)
+        second = await flights.do("key", flaky)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in first)
+    assert second == ("ok", False)
+    assert attempts == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == ("done", True)
@@ -0,0 +1,47 @@
+import json
+
+from src.utils import prompts
+from src.utils.skills import SkillTaxonomy, get_skill_taxonomy
+
+RESUME = "Built React and Node.js apps, deployed on k8s in AWS. Mentorship of two juniors. React Native too."
+JOB = "Looking for React, TypeScript and Kubernetes experience on Google Cloud. Docker is a plus."
+
+
+def test_extract_normalizes_aliases_and_orders_by_frequency():
+    skills = get_skill_taxonomy().extract(RESUME)
+
+    assert skills[0] == "react"
+    assert {"node.js", "kubernetes", "amazon web services", "mentoring"} <= set(skills)
+
+
+def test_extract_prefers_longest_alias():
+    taxonomy = SkillTaxonomy({"cloud": {"google cloud platform": ("google cloud",), "cloud": ()}})
+
+    assert taxonomy.extract("Migrated to Google Cloud Platform") == ["google cloud platform"]
+
+
+def test_compare_reports_missing_job_skills():
+    result = get_skill_taxonomy().compare(RESUME, JOB)
+
+    assert result["missing_skills"] == ["typescript", "google cloud platform", "docker"]
+
+
+def test_extract_by_category_groups_skills():
+    grouped = get_skill_taxonomy().extract_by_category("Python, Docker and leadership")
+
+    assert grouped == {"programming_languages": ["python"], "cloud_devops": ["docker"], "soft_skills": ["leadership"]}
+
+
+def test_taxonomy_loads_from_json(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps({"tools": {"vim": ["neovim"]}}))
+
+    assert SkillTaxonomy.from_file(str(path)).extract("Neovim power user") == ["vim"]
+
+
+def test_known_skills_are_injected_into_prompts():
+    known = get_skill_taxonomy().compare(RESUME, JOB)
+    prompt = prompts.get_skill_gap_prompt(RESUME, JOB, known_skills=known)
+
+    assert "Missing skills: typescript, google cloud platform, docker" in prompt
+    assert "Skills already extracted" not in prompts.get_skill_gap_prompt(RESUME, JOB)
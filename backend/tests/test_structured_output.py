@@ -0,0 +1,77 @@
+import json
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from src.utils.structured_output import JSONRepairError, ParseStats, parse_model_json, repair_json, response_schema
+
+
+def test_parse_model_json_passes_valid_json_through():
+    assert parse_model_json('{"a": 1}') == ({"a": 1}, "clean")
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ('```json\n{"a": [1, 2]}\n```', {"a": [1, 2]}),
+        ('Here you go: {"a": 1,} Hope it helps!', {"a": 1}),
+        ('{"items": [1, 2,], "b": {"c": 3,},}', {"items": [1, 2], "b": {"c": 3}}),
+    ],
+)
+def test_parse_model_json_repairs_common_defects(raw, expected):
+    assert parse_model_json(raw) == (expected, "repaired")
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ('```json\n{"summary": "Strong candidate with', {"summary": "Strong candidate with"}),
+        ('{"a": 1, "b": [true, fal', {"a": 1, "b": [True]}),
+        ('{"a": 1, "b": ', {"a": 1, "b": None}),
+        ('{"a": "x", "b', {"a": "x"}),
+        ('[{"a": "brace } in string"}, {"b": 2', [{"a": "brace } in string"}, {"b": 2}]),
+    ],
+)
+def test_parse_model_json_reports_cut_off_output_as_truncated(raw, expected):
+    assert parse_model_json(raw) == (expected, "truncated")
+
+
+def test_repair_keeps_escaped_quotes_inside_strings():
+    assert json.loads(repair_json('{"quote": "she said \\"hi\\"", "n": 1,}')) == {"quote": 'she said "hi"', "n": 1}
+
+
+def test_parse_model_json_rejects_output_without_json():
+    with pytest.raises(JSONRepairError):
+        parse_model_json("I'm sorry, I can't do that.")
+
+
+class Skill(BaseModel):
+    name: str
+    level: Optional[int] = None
+
+
+class Report(BaseModel):
+    score: str
+    skills: List[Skill]
+
+
+def test_response_schema_inlines_references_and_nullable_fields():
+    schema = response_schema(Report)
+
+    assert schema["type"] == "object"
+    assert schema["required"] == ["score", "skills"]
+    skill = schema["properties"]["skills"]["items"]
+    assert skill["properties"]["level"] == {"type": "integer", "nullable": True}
+    assert "$ref" not in json.dumps(schema)
+
+
+def test_parse_stats_reports_failure_rate_per_endpoint():
+    stats = ParseStats()
+    for outcome in ("clean", "clean", "repaired", "retried", "truncated", "clean"):
+        stats.record("/resume/role-fit", outcome)
+
+    report = stats.stats()["/resume/role-fit"]
+
+    assert report["raw_parse_failure_rate"] == 0.5
+    assert report["model_calls_saved"] == 2
@@ -0,0 +1,347 @@
+import asyncio
+import http.server
+import json
+import threading
+import time
+import urllib.error
+
+import pytest
+
+from src.utils.task_queue import (
+    CANCELLED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    IdempotencyConflict,
+    LeaseLost,
+    TaskQueue,
+    TaskStore,
+    WebhookRejected,
+    _post_json,
+    check_webhook_url,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.sqlite"), result_ttl=60, lease_seconds=0.3)
+    yield store
+    store.close()
+
+
+async def _wait_for(store, task_id, statuses, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        record = store.get(task_id)
+        if record["status"] in statuses:
+            return record
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"task stayed {store.get(task_id)['status']}")
+
+
+def test_claim_leases_tasks_in_submission_order(store):
+    first = store.submit("echo", {"n": 1})
+    second = store.submit("echo", {"n": 2})
+
+    claimed = store.claim()
+    assert claimed["id"] == first["id"]
+    assert claimed["status"] == RUNNING
+    assert claimed["attempts"] == 1
+    assert store.claim()["id"] == second["id"]
+    assert store.claim() is None
+
+
+def test_expired_lease_is_claimed_again(store):
+    task = store.submit("echo", {})
+    store.claim()
+    assert store.claim() is None
+
+    time.sleep(0.35)
+
+    reclaimed = store.claim()
+    assert reclaimed["id"] == task["id"]
+    assert reclaimed["attempts"] == 2
+
+
+def test_task_is_failed_after_max_attempts(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.sqlite"), lease_seconds=0.05, max_attempts=2)
+    task = store.submit("echo", {})
+    assert store.claim()["attempts"] == 1
+    time.sleep(0.1)
+    assert store.claim()["attempts"] == 2
+    time.sleep(0.1)
+
+    assert store.claim() is None
+    record = store.get(task["id"])
+    assert record["status"] == FAILED
+    assert record["error"] == "Abandoned after 2 attempts"
+    store.close()
+
+
+def test_lapsed_lease_cannot_renew_or_finish_the_new_run(store):
+    task = store.submit("echo", {})
+    stale = store.claim()
+    time.sleep(0.35)
+    current = store.claim()
+
+    with pytest.raises(LeaseLost):
+        store.renew(task["id"], stale["attempts"])
+    assert store.finish(task["id"], stale["attempts"], FAILED, error="stale") is False
+    assert store.renew(task["id"], current["attempts"]) is False
+    assert store.finish(task["id"], current["attempts"], SUCCEEDED, result={}) is True
+    assert store.get(task["id"])["status"] == SUCCEEDED
+
+
+def test_requeued_attempt_does_not_count(store):
+    task = store.submit("echo", {})
+    store.requeue(task["id"], store.claim()["attempts"])
+
+    assert store.claim()["attempts"] == 1
+
+
+def test_finished_results_expire(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.sqlite"), result_ttl=0.05)
+    task = store.submit("echo", {})
+    store.claim()
+    store.finish(task["id"], 1, SUCCEEDED, result={"ok": True})
+    assert json.loads(store.get(task["id"])["result"]) == {"ok": True}
+
+    time.sleep(0.1)
+
+    assert store.get(task["id"]) is None
+    assert store.purge_expired() == 1
+
+
+def test_queued_task_cancels_immediately(store):
+    task = store.submit("echo", {})
+
+    assert store.request_cancel(task["id"])["status"] == CANCELLED
+    assert store.claim() is None
+
+
+def test_queue_runs_handlers_and_reports_progress(store):
+    async def echo(payload, context):
+        await context.progress(0.5, "halfway")
+        return {"echo": payload["n"]}
+
+    async def scenario():
+        queue = TaskQueue(store, {"echo": echo}, workers=2, poll_interval=0.05)
+        await queue.start()
+        task = await queue.submit("echo", {"n": 7})
+        record = await _wait_for(store, task["id"], {SUCCEEDED})
+        await queue.stop()
+        return record
+
+    record = asyncio.run(scenario())
+
+    assert json.loads(record["result"]) == {"echo": 7}
+    assert record["progress"] == 1.0
+    assert record["message"] == "halfway"
+
+
+def test_store_calls_run_off_the_event_loop(store, monkeypatch):
+    threads = {}
+    for name in ("submit", "claim", "set_progress", "finish"):
+        original = getattr(store, name)
+
+        def recording(*args, _name=name, _original=original, **kwargs):
+            threads.setdefault(_name, threading.get_ident())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(store, name, recording)
+
+    async def echo(payload, context):
+        await context.progress(0.5, "halfway")
+        return {}
+
+    async def scenario():
+        queue = TaskQueue(store, {"echo": echo}, poll_interval=0.05)
+        await queue.start()
+        task = await queue.submit("echo", {})
+        await _wait_for(store, task["id"], {SUCCEEDED})
+        await queue.stop()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert set(threads) == {"submit", "claim", "set_progress", "finish"}
+    assert loop_thread not in threads.values()
+
+
+def test_handler_errors_mark_the_task_failed(store):
+    async def boom(payload, context):
+        raise RuntimeError("model unavailable")
+
+    async def scenario():
+        queue = TaskQueue(store, {"boom": boom}, poll_interval=0.05)
+        await queue.start()
+        task = await queue.submit("boom", {})
+        record = await _wait_for(store, task["id"], {FAILED})
+        await queue.stop()
+        return record
+
+    assert asyncio.run(scenario())["error"] == "model unavailable"
+
+
+def test_running_task_can_be_cancelled(store):
+    started = []
+
+    async def slow(payload, context):
+        started.append(True)
+        await asyncio.sleep(30)
+
+    async def scenario():
+        queue = TaskQueue(store, {"slow": slow}, poll_interval=0.05)
+        await queue.start()
+        task = await queue.submit("slow", {})
+        await _wait_for(store, task["id"], {RUNNING})
+        while not started:
+            await asyncio.sleep(0.01)
+        await queue.cancel(task["id"])
+        record = await _wait_for(store, task["id"], {CANCELLED})
+        await queue.stop()
+        return record
+
+    assert asyncio.run(scenario())["status"] == CANCELLED
+
+
+def test_cancellation_from_another_process_is_seen_on_lease_renewal(store):
+    async def slow(payload, context):
+        await asyncio.sleep(30)
+
+    async def scenario():
+        queue = TaskQueue(store, {"slow": slow}, poll_interval=0.05)
+        await queue.start()
+        task = await queue.submit("slow", {})
+        await _wait_for(store, task["id"], {RUNNING})
+        # Only flag the row, as a process without the running handler would.
+        store.request_cancel(task["id"])
+        record = await _wait_for(store, task["id"], {CANCELLED})
+        await queue.stop()
+        return record
+
+    assert asyncio.run(scenario())["status"] == CANCELLED
+
+
+def test_stopping_workers_requeues_running_tasks(store):
+    async def slow(payload, context):
+        await asyncio.sleep(30)
+
+    async def scenario():
+        queue = TaskQueue(store, {"slow": slow}, poll_interval=0.05)
+        await queue.start()
+        task = await queue.submit("slow", {})
+        await _wait_for(store, task["id"], {RUNNING})
+        await queue.stop()
+        return store.get(task["id"])
+
+    assert asyncio.run(scenario())["status"] == QUEUED
+
+
+def test_webhook_receives_the_finished_task(store, monkeypatch):
+    delivered = []
+    monkeypatch.setattr(
+        "src.utils.task_queue._post_json", lambda url, body, timeout, hosts: delivered.append((url, body)) or 200
+    )
+
+    async def echo(payload, context):
+        return {"done": True}
+
+    async def scenario():
+        queue = TaskQueue(store, {"echo": echo}, poll_interval=0.05)
+        await queue.start()
+        task = await queue.submit("echo", {}, webhook_url="https://hooks.example.com/done")
+        await _wait_for(store, task["id"], {SUCCEEDED})
+        await queue.stop()
+        return store.get(task["id"])
+
+    record = asyncio.run(scenario())
+
+    assert record["webhook_status"] == "delivered"
+    url, body = delivered[0]
+    assert url == "https://hooks.example.com/done"
+    assert body["status"] == SUCCEEDED
+    assert body["result"] == {"done": True}
+
+
+def test_idempotency_key_returns_the_original_task(store, tmp_path):
+    first = store.submit("echo", {"n": 1, "m": 2}, idempotency_key="order-42")
+    # A second process sharing the file sees the same key.
+    other = TaskStore(str(tmp_path / "tasks.sqlite"))
+    again = other.submit("echo", {"m": 2, "n": 1}, idempotency_key="order-42")
+    other.close()
+
+    assert again["id"] == first["id"]
+    assert store.stats()[QUEUED] == 1
+    with pytest.raises(IdempotencyConflict):
+        store.submit("echo", {"n": 3}, idempotency_key="order-42")
+
+
+def test_expired_task_frees_its_idempotency_key(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.sqlite"), result_ttl=0.05)
+    first = store.submit("echo", {}, idempotency_key="k")
+    store.claim()
+    store.finish(first["id"], 1, SUCCEEDED, result={})
+    time.sleep(0.1)
+
+    assert store.submit("echo", {}, idempotency_key="k")["id"] != first["id"]
+    store.close()
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1:8000/hook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "http://[::ffff:192.168.1.1]/hook",
+        "ftp://hooks.example.com/hook",
+    ],
+)
+def test_webhooks_to_internal_addresses_are_rejected(url):
+    with pytest.raises(WebhookRejected):
+        check_webhook_url(url)
+
+
+def test_webhook_allowlist():
+    check_webhook_url("https://93.184.216.34/hook")
+    check_webhook_url("http://127.0.0.1/hook", ["127.0.0.1"])
+    check_webhook_url("https://ci.hooks.example.com/hook", [".example.com"])
+    with pytest.raises(WebhookRejected):
+        check_webhook_url("https://hooks.example.org/hook", [".example.com"])
+
+
+@pytest.fixture
+def redirecting_server():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.send_response(302)
+            self.send_header("Location", "http://169.254.169.254/")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/hook"
+    server.shutdown()
+    server.server_close()
+
+
+def test_webhook_delivery_refuses_loopback_and_redirects(redirecting_server):
+    with pytest.raises(WebhookRejected):
+        _post_json(redirecting_server, {}, timeout=5)
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _post_json(redirecting_server, {}, timeout=5, allowed_hosts=["127.0.0.1"])
+    assert error.value.code == 302
+
+
+def test_webhook_delivery_checks_the_connected_address(redirecting_server, monkeypatch):
+    # As if DNS answered with a public address at check time and a loopback one at connect time.
+    monkeypatch.setattr("src.utils.task_queue.check_webhook_url", lambda url, hosts: None)
+    with pytest.raises(WebhookRejected):
+        _post_json(redirecting_server, {}, timeout=5)
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+from src.utils.uploads import RequestSizeLimitMiddleware, UploadTooLargeError, spool_upload
+
+
+class _AsyncReader:
+    def __init__(self, data):
+        self._buffer = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self._buffer.read(size)
+
+
+def _spool(data, **kwargs):
+    return asyncio.run(spool_upload(_AsyncReader(data), **kwargs))
+
+
+def test_small_upload_stays_in_memory():
+    data = b"%PDF small"
+
+    with _spool(data, max_bytes=1024, memory_threshold=512) as upload:
+        assert not upload.spooled_to_disk
+        assert upload.source == data
+        assert upload.digest == hashlib.sha256(data).hexdigest()
+
+
+def test_large_upload_is_spooled_and_removed_on_close():
+    data = os.urandom(10_000)
+
+    with _spool(data, max_bytes=20_000, memory_threshold=4_096, chunk_size=1_000) as upload:
+        assert upload.spooled_to_disk
+        path = upload.source
+        with open(path, "rb") as handle:
+            assert handle.read() == data
+        assert upload.size == len(data)
+        assert upload.digest == hashlib.sha256(data).hexdigest()
+
+    assert not os.path.exists(path)
+
+
+def test_oversized_upload_rejected_while_streaming(tmp_path, monkeypatch):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+    with pytest.raises(UploadTooLargeError):
+        _spool(b"x" * 5_000, max_bytes=4_000, memory_threshold=1_000, chunk_size=500)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def _call_limited(app, headers, chunks, max_bytes=100):
+    middleware = RequestSizeLimitMiddleware(app, max_bytes=max_bytes)
+    incoming = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    incoming[-1]["more_body"] = False
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/analyze", "headers": headers}
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+async def _drain_and_reply(scope, receive, send):
+    while (await receive()).get("more_body"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_declared_oversized_multipart_body_is_rejected_before_reading():
+    async def app(scope, receive, send):
+        raise AssertionError("the application must not run")
+
+    headers = [(b"content-type", b"multipart/form-data; boundary=x"), (b"content-length", b"101")]
+    sent = _call_limited(app, headers, [b"x" * 101])
+
+    assert sent[0]["status"] == 413
+    assert json.loads(sent[1]["body"])["detail"] == "Request body exceeds the 100 byte limit"
+
+
+def test_streamed_multipart_body_is_cut_off_at_the_limit():
+    headers = [(b"content-type", b"multipart/form-data; boundary=x")]
+
+    assert _call_limited(_drain_and_reply, headers, [b"x" * 60, b"x" * 60])[0]["status"] == 413
+    assert _call_limited(_drain_and_reply, headers, [b"x" * 60, b"x" * 40])[0]["status"] == 200
+
+
+def test_non_multipart_bodies_are_not_limited():
+    headers = [(b"content-type", b"application/json"), (b"content-length", b"500")]
+
+    assert _call_limited(_drain_and_reply, headers, [b"x" * 500])[0]["status"] == 200
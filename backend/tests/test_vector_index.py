@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.utils.embeddings import HashingEmbedder
+from src.utils.vector_index import ResumeIndex
+
+SKILLS = "python java rust docker kubernetes aws react sql spark kafka pytorch terraform figma excel".split()
+
+
+def _corpus(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [(f"r{idx}", " ".join(rng.choice(SKILLS, 12))) for idx in range(count)]
+
+
+def test_exact_search_add_replace_delete_and_reload(tmp_path):
+    embedder = HashingEmbedder(dim=256)
+    index = ResumeIndex(str(tmp_path), dim=256)
+    items = [("a", "python fastapi docker"), ("b", "figma ux design"), ("c", "java spring sql")]
+    index.add(items, embedder.embed([text for _, text in items]))
+
+    query = embedder.embed(["python docker engineer"])[0]
+    assert index.search(query, top_k=1)[0][0] == "a"
+
+    index.add([("b", "python docker kubernetes")], embedder.embed(["python docker kubernetes"]))
+    assert len(index) == 3
+    assert index.get_texts(["b"]) == {"b": "python docker kubernetes"}
+
+    assert index.delete("a")
+    assert not index.delete("missing")
+    index.close()
+
+    reopened = ResumeIndex(str(tmp_path), dim=256)
+    assert len(reopened) == 2
+    assert reopened.search(query, top_k=5)[0][0] == "b"
+    assert {resume_id for resume_id, _ in reopened.search(query, top_k=5)} == {"b", "c"}
+
+
+def test_ivf_search_agrees_with_exact_search_on_top_hit(tmp_path):
+    embedder = HashingEmbedder(dim=256)
+    items = _corpus(600)
+    vectors = embedder.embed([text for _, text in items])
+    index = ResumeIndex(str(tmp_path), dim=256, n_lists=8, n_probe=3, train_threshold=500)
+    index.add(items, vectors)
+
+    assert index.trained
+    query = vectors[42]
+    assert index.search(query, top_k=1)[0][0] == "r42"
+    assert index.stats()["size"] == 600
+
+
+def test_instances_sharing_a_directory_allocate_distinct_rows(tmp_path):
+    embedder = HashingEmbedder(dim=64)
+    first = ResumeIndex(str(tmp_path), dim=64)
+    second = ResumeIndex(str(tmp_path), dim=64)
+
+    first.add([("a", "python docker")], embedder.embed(["python docker"]))
+    second.add([("b", "figma design")], embedder.embed(["figma design"]))
+    first.add([("c", "java sql")], embedder.embed(["java sql"]))
+    second.delete("a")
+
+    for index in (first, second):
+        assert len(index) == 2
+        assert index.search(embedder.embed(["figma design"])[0], top_k=1)[0][0] == "b"
+        assert index.search(embedder.embed(["java sql"])[0], top_k=1)[0][0] == "c"
+    first.close()
+    second.close()
+
+
+def test_reopening_with_a_different_dimension_is_rejected(tmp_path):
+    ResumeIndex(str(tmp_path), dim=256).close()
+
+    with pytest.raises(ValueError):
+        ResumeIndex(str(tmp_path), dim=128)
+
+
+def test_compaction_reclaims_tombstones_and_keeps_search_results(tmp_path):
+    embedder = HashingEmbedder(dim=64)
+    items = _corpus(40)
+    vectors = embedder.embed([text for _, text in items])
+    index = ResumeIndex(str(tmp_path), dim=64, compact_min_tombstones=10)
+    reader = ResumeIndex(str(tmp_path), dim=64)
+    index.add(items, vectors)
+
+    for resume_id, _ in items[:25]:
+        index.delete(resume_id)
+
+    # Compacted automatically once 20 tombstones matched 20 live rows; 5 tombstones remain.
+    assert index.stats() == {"size": 15, "rows": 20, "capacity": 1024, "trained": 0, "n_lists": 0}
+    assert index.compact() == 5
+    assert index.stats()["rows"] == 15
+    assert reader.search(vectors[30], top_k=1)[0][0] == "r30"
+    assert len(reader) == 15
+    assert [name for name in os.listdir(tmp_path) if name.startswith("vectors")] == ["vectors.2.f32"]
+    index.close()
+    reader.close()